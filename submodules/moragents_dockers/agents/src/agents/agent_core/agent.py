@@ -1,11 +1,16 @@
 import logging
-
+import time
 from abc import ABC, abstractmethod
-from enum import Enum
-from typing import Dict, Any, Optional
 from functools import wraps
+from typing import Any, Dict, List, Optional
 
-from src.models.core import ChatRequest, AgentResponse
+from langchain.schema import BaseMessage
+from src.agents.agent_core.concurrency import llm_limiter
+from src.agents.agent_core.context import context_builder
+from src.agents.agent_core.streaming import get_token_sink
+from src.models.core import AgentResponse, ChatRequest
+from src.services.metrics import record_llm_call
+from src.services.tracing import tracer
 
 
 def handle_exceptions(func):
@@ -22,7 +27,9 @@ def handle_exceptions(func):
         except Exception as e:
             # Handle unexpected errors - these are breaking errors
             self.logger.error(f"Unexpected error in {func.__name__}: {str(e)}", exc_info=True)
-            return AgentResponse.error(error_message="An unexpected error occurred. Please try again later.")
+            return AgentResponse.error(
+                error_message="An unexpected error occurred. Please try again later."
+            )
 
     return wrapper
 
@@ -43,14 +50,21 @@ class AgentCore(ABC):
     async def _validate_request(self, request: ChatRequest) -> Optional[AgentResponse]:
         """Validate common request parameters and return appropriate response type"""
         if not request.prompt:
-            return AgentResponse.error(error_message="Please provide a prompt to process your request")
+            return AgentResponse.error(
+                error_message="Please provide a prompt to process your request"
+            )
 
         return None
 
+    @tracer.traced("agent.chat")
     @handle_exceptions
     async def chat(self, request: ChatRequest) -> AgentResponse:
         """Main entry point for chat interactions"""
-        self.logger.info(f"Received chat request: {request}")
+        self.logger.info(
+            f"Received chat request for conversation {request.conversation_id}",
+            extra={"prompt": request.prompt.content},
+        )
+        tracer.set_attribute("agent", self.config.get("name"))
 
         # Validate request
         validation_result = await self._validate_request(request)
@@ -58,7 +72,9 @@ class AgentCore(ABC):
             return validation_result
 
         # Process the request
-        response = await self._process_request(request)
+        with tracer.span("agent.process_request"):
+            response = await self._process_request(request)
+        tracer.set_attribute("response_type", response.response_type.value)
 
         # Log response for monitoring
         if response.error_message:
@@ -66,6 +82,34 @@ class AgentCore(ABC):
 
         return response
 
+    async def _get_history(self, request: ChatRequest) -> List[BaseMessage]:
+        """
+        Get earlier turns of the request's conversation to include in the prompt.
+
+        Agents opt in with a `context_token_budget` in their config, and with `context_summary`
+        to have turns beyond the budget summarized instead of dropped.
+
+        Args:
+            request: Chat request being processed
+
+        Returns:
+            List[BaseMessage]: History messages to place between the system and user prompts
+        """
+        token_budget = self.config.get("context_token_budget", 0)
+        if not token_budget:
+            return []
+
+        async def summarize(messages: List[BaseMessage]) -> Any:
+            return await self._invoke_llm(self.llm, messages, stream=False)
+
+        with tracer.span("agent.build_context", token_budget=token_budget):
+            return await context_builder.build(
+                request.conversation_id,
+                token_budget,
+                before_sequence=request.prompt.sequence,
+                summarize=summarize if self.config.get("context_summary") else None,
+            )
+
     @abstractmethod
     async def _process_request(self, request: ChatRequest) -> AgentResponse:
         """
@@ -79,6 +123,40 @@ class AgentCore(ABC):
         """
         raise NotImplementedError("Subclasses must implement _process_request")
 
+    async def _invoke_llm(self, llm: Any, messages: Any, stream: bool = True, **kwargs) -> Any:
+        """
+        Invoke an LLM (or tool-bound LLM) with the given messages without blocking the event loop.
+
+        Calls are made through the model's async API and bounded by the per-backend
+        concurrency limit. When the current request is being streamed, content tokens are
+        forwarded to the request's token sink as they arrive and the chunks are aggregated
+        into a single message, so callers handle the result exactly like an invoke() result.
+
+        Args:
+            llm: Language model runnable to invoke
+            messages: Messages to send to the model
+            stream: Set to False for internal calls whose output should not reach the user
+            **kwargs: Extra model parameters (e.g. max_tokens, temperature)
+
+        Returns:
+            The model response message
+        """
+        sink = get_token_sink() if stream else None
+        model = getattr(getattr(llm, "bound", llm), "model", None)
+        with tracer.span("llm.invoke", model=model, streamed=sink is not None):
+            async with llm_limiter.acquire(llm):
+                started_at = time.perf_counter()
+                if sink is None:
+                    result = await llm.ainvoke(messages, **kwargs)
+                else:
+                    result = None
+                    async for chunk in llm.astream(messages, **kwargs):
+                        if chunk.content:
+                            sink(chunk.content)
+                        result = chunk if result is None else result + chunk
+                record_llm_call(model, time.perf_counter() - started_at, result)
+                return result
+
     async def _handle_llm_response(self, response: Any) -> AgentResponse:
         """Handle LLM response and convert to appropriate AgentResponse"""
         try:
@@ -92,15 +170,19 @@ class AgentCore(ABC):
             tool_calls = getattr(response, "tool_calls", [])
             if tool_calls:
                 # Handle tool calls
-                self.logger.info(f"Processing tool calls: {tool_calls}")
+                self.logger.info(
+                    f"Processing {len(tool_calls)} tool calls", extra={"tool_calls": tool_calls}
+                )
                 return await self._process_tool_calls(tool_calls)
             elif content:
                 # Direct response from LLM
-                self.logger.info(f"Received direct response from LLM: {content}")
+                self.logger.info("Received direct response from LLM", extra={"content": content})
                 return AgentResponse.success(content=content)
             else:
                 self.logger.warning("Received invalid response format from LLM")
-                return AgentResponse.error(error_message="Received invalid response format from LLM")
+                return AgentResponse.error(
+                    error_message="Received invalid response format from LLM"
+                )
 
         except Exception as e:
             self.logger.error(f"Error processing LLM response: {str(e)}", exc_info=True)
@@ -114,11 +196,14 @@ class AgentCore(ABC):
             args = tool_call.get("args", {})
 
             if not func_name:
-                return AgentResponse.error(error_message="Invalid tool call format - no function name provided")
+                return AgentResponse.error(
+                    error_message="Invalid tool call format - no function name provided"
+                )
 
             # Execute tool and handle response
             # This should be implemented by subclasses based on their specific tools
-            return await self._execute_tool(func_name, args)
+            with tracer.span("agent.execute_tool", tool=func_name):
+                return await self._execute_tool(func_name, args)
 
         except Exception as e:
             self.logger.error(f"Error processing tool calls: {str(e)}", exc_info=True)
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from src.config import Config
+from src.services.metrics import llm_requests_in_flight
+
+logger = logging.getLogger(__name__)
+
+
+class LLMConcurrencyLimiter:
+    """
+    Bounds the number of in-flight calls made to each LLM backend.
+
+    Backends are identified by their base URL, so every agent (and the delegator) sharing
+    an Ollama server also shares its limit, while separately configured backends are
+    throttled independently.
+
+    Attributes:
+        default_limit (int): Concurrent call limit for backends without an explicit override
+        backend_limits (Dict[str, int]): Per-backend limits keyed by base URL
+    """
+
+    def __init__(self, default_limit: int, backend_limits: Optional[Dict[str, int]] = None) -> None:
+        self.default_limit = default_limit
+        self.backend_limits = backend_limits or {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def get_backend_key(llm: Any) -> str:
+        """Get the backend identifier of an LLM, unwrapping tool-bound runnables"""
+        model = getattr(llm, "bound", llm)
+        return getattr(model, "base_url", None) or "default"
+
+    def get_limit(self, backend_key: str) -> int:
+        """Get the concurrent call limit for a backend"""
+        return self.backend_limits.get(backend_key, self.default_limit)
+
+    def _get_semaphore(self, backend_key: str) -> asyncio.Semaphore:
+        # Semaphores are bound to the event loop they are first awaited on
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._semaphores = {}
+            self._loop = loop
+
+        if backend_key not in self._semaphores:
+            self._semaphores[backend_key] = asyncio.Semaphore(self.get_limit(backend_key))
+        return self._semaphores[backend_key]
+
+    @asynccontextmanager
+    async def acquire(self, llm: Any) -> AsyncIterator[None]:
+        """
+        Wait for a free call slot on the LLM's backend.
+
+        Args:
+            llm: Language model (or tool-bound runnable) about to be called
+        """
+        backend_key = self.get_backend_key(llm)
+        semaphore = self._get_semaphore(backend_key)
+        if semaphore.locked():
+            logger.info(f"LLM backend {backend_key} saturated, waiting for a free slot")
+        async with semaphore:
+            with llm_requests_in_flight.track_in_progress(backend=backend_key):
+                yield
+
+
+# Create an instance shared by all agents and the delegator
+llm_limiter = LLMConcurrencyLimiter(Config.LLM_MAX_CONCURRENCY, Config.LLM_BACKEND_CONCURRENCY)
@@ -0,0 +1,175 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+from langchain.schema import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from src.config import Config
+from src.models.core import CHARS_PER_TOKEN, TOKENS_PER_MESSAGE
+from src.services.metrics import record_cache_lookup
+from src.stores import chat_manager_instance
+from src.stores.chat_records import MessageRecord
+
+logger = logging.getLogger(__name__)
+
+# Summarizes earlier turns; receives the messages to send and returns the model response
+SummarizeCall = Callable[[List[BaseMessage]], Awaitable[Any]]
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below in a few sentences. Keep the facts, names, numbers, "
+    "tokens, addresses and user preferences needed to answer follow-up questions. "
+    "If a previous summary is given, extend it with the new messages."
+)
+
+
+@dataclass(frozen=True)
+class RollingSummary:
+    """
+    Summary of the turns that slid out of a conversation's context window.
+
+    Attributes:
+        through_sequence (int): Sequence number of the newest summarized message
+        text (str): Summary text
+    """
+
+    through_sequence: int
+    text: str
+
+
+def to_langchain_messages(messages: Sequence[MessageRecord]) -> List[BaseMessage]:
+    """Convert stored chat messages to LangChain messages, skipping messages without content"""
+    converted: List[BaseMessage] = []
+    for message in messages:
+        if not message.content:
+            continue
+        if message.role == "user":
+            converted.append(HumanMessage(content=message.content))
+        else:
+            converted.append(AIMessage(content=message.content))
+    return converted
+
+
+class ConversationContextBuilder:
+    """
+    Assembles earlier turns of a conversation for agent prompts under a token budget.
+
+    The most recent turns that fit the budget are included verbatim. Optionally, older turns
+    collapse into a rolling summary, cached per conversation and extended only with the
+    turns that slid out of the window since it was last computed.
+
+    Attributes:
+        summary_ratio (float): Share of the token budget reserved for the summary
+        max_summaries (int): Maximum number of conversations whose summary is cached
+        max_input_tokens_factor (int): Maximum summarization input, as a multiple of the token
+            budget
+    """
+
+    def __init__(
+        self,
+        summary_ratio: float = 0.25,
+        max_summaries: int = 1000,
+        max_input_tokens_factor: int = 4,
+    ) -> None:
+        self.summary_ratio = summary_ratio
+        self.max_summaries = max_summaries
+        self.max_input_tokens_factor = max_input_tokens_factor
+        self._summaries: "OrderedDict[str, RollingSummary]" = OrderedDict()
+
+    async def build(
+        self,
+        conversation_id: str,
+        token_budget: int,
+        before_sequence: Optional[int] = None,
+        summarize: Optional[SummarizeCall] = None,
+    ) -> List[BaseMessage]:
+        """
+        Build the history to place between an agent's system prompt and the current prompt.
+
+        Args:
+            conversation_id (str): Conversation the request belongs to
+            token_budget (int): Maximum estimated tokens of the returned history
+            before_sequence (int, optional): Sequence number of the prompt being answered
+            summarize (SummarizeCall, optional): LLM call used to summarize older turns, None to
+                drop them
+
+        Returns:
+            List[BaseMessage]: History messages, oldest first
+        """
+        window, left_out_through = chat_manager_instance.get_recent_messages(
+            conversation_id, token_budget, before_sequence
+        )
+        if left_out_through is None or summarize is None:
+            return to_langchain_messages(window)
+
+        # Older turns did not fit: keep room for their summary and recompute the window
+        summary_budget = int(token_budget * self.summary_ratio)
+        window, left_out_through = chat_manager_instance.get_recent_messages(
+            conversation_id, token_budget - summary_budget, before_sequence
+        )
+        summary = await self._get_summary(
+            conversation_id, left_out_through, token_budget, summarize
+        )
+        history = to_langchain_messages(window)
+        if summary is None:
+            return history
+        return [
+            SystemMessage(content=f"Summary of the earlier conversation: {summary.text}"),
+            *history,
+        ]
+
+    async def _get_summary(
+        self,
+        conversation_id: str,
+        through_sequence: int,
+        token_budget: int,
+        summarize: SummarizeCall,
+    ) -> Optional[RollingSummary]:
+        cached = self._summaries.get(conversation_id)
+        cleared_sequence = chat_manager_instance.get_cleared_sequence(conversation_id)
+        if cached is not None and cached.through_sequence <= cleared_sequence:
+            cached = None
+
+        record_cache_lookup(
+            "context_summary",
+            hit=cached is not None and cached.through_sequence >= through_sequence,
+        )
+        if cached is not None and cached.through_sequence >= through_sequence:
+            # The window has not slid past the summarized turns since the summary was computed
+            self._summaries.move_to_end(conversation_id)
+            return cached
+
+        after_sequence = cached.through_sequence if cached else cleared_sequence
+        new_messages = await chat_manager_instance.get_messages_between(
+            conversation_id, after_sequence, through_sequence
+        )
+        transcript = "\n".join(
+            f"{message.role}: {message.content}" for message in new_messages if message.content
+        )
+        # Bound the summarization cost when many turns slid out at once, e.g. for a reloaded long
+        # conversation
+        transcript = transcript[-self.max_input_tokens_factor * token_budget * CHARS_PER_TOKEN :]
+        if cached:
+            transcript = f"Previous summary: {cached.text}\n\nNew messages:\n{transcript}"
+
+        try:
+            result = await summarize(
+                [SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=transcript)]
+            )
+        except Exception as e:
+            logger.error(f"Failed to summarize conversation {conversation_id}: {str(e)}")
+            return cached
+
+        text = result.content.strip()
+        # Keep the summary within its share of the budget even if the model ignored the instructions
+        summary_budget = int(token_budget * self.summary_ratio)
+        max_chars = max(0, summary_budget - TOKENS_PER_MESSAGE) * CHARS_PER_TOKEN
+        summary = RollingSummary(through_sequence=through_sequence, text=text[:max_chars])
+        self._summaries[conversation_id] = summary
+        self._summaries.move_to_end(conversation_id)
+        if len(self._summaries) > self.max_summaries:
+            self._summaries.popitem(last=False)
+        return summary
+
+
+# Create an instance shared by all agents
+context_builder = ConversationContextBuilder(max_summaries=Config.CHAT_MAX_CONVERSATIONS)
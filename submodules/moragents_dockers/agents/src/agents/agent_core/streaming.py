@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+# A token sink receives each content token produced by an LLM as it is generated
+TokenSink = Callable[[str], None]
+
+_token_sink: ContextVar[Optional[TokenSink]] = ContextVar("token_sink", default=None)
+
+
+def get_token_sink() -> Optional[TokenSink]:
+    """Get the token sink of the current request, or None when the request is not streamed"""
+    return _token_sink.get()
+
+
+@contextmanager
+def stream_tokens_to(sink: TokenSink) -> Iterator[None]:
+    """
+    Forward LLM tokens generated within this context to the given sink.
+
+    The sink is stored in a context variable, so it follows the request through the
+    delegator and agents (and any tasks they spawn) without changing their signatures.
+
+    Args:
+        sink (TokenSink): Callable invoked with every generated content token
+    """
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+
+@contextmanager
+def suppress_token_stream() -> Iterator[None]:
+    """Keep LLM tokens generated in this context and its tasks out of the request's stream"""
+    token = _token_sink.set(None)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
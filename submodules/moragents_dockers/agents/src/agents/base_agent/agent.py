@@ -1,11 +1,11 @@
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict
 
-from src.agents.base_agent import tools
-from src.models.core import ChatRequest, AgentResponse
-from src.agents.agent_core.agent import AgentCore
 from langchain.schema import HumanMessage, SystemMessage
+from src.agents.agent_core.agent import AgentCore
+from src.agents.base_agent import tools
 from src.agents.base_agent.config import Config
+from src.models.core import AgentResponse, ChatRequest
 from src.stores import wallet_manager_instance
 
 logger = logging.getLogger(__name__)
@@ -25,7 +25,10 @@ class BaseAgent(AgentCore):
         if not wallet_manager_instance.configure_cdp_client():
             # Return user-friendly error for missing credentials
             return AgentResponse.success(
-                content="I'm not able to help with transactions right now because the CDP client is not initialized. Please set up your API credentials first."
+                content=(
+                    "I'm not able to help with transactions right now because the CDP client is "
+                    "not initialized. Please set up your API credentials first."
+                )
             )
 
         # Check for active wallet
@@ -33,7 +36,10 @@ class BaseAgent(AgentCore):
         if not active_wallet:
             # Return user-friendly error for missing wallet
             return AgentResponse.success(
-                content="You'll need to select or create a wallet before I can help with transactions. Please set up a wallet first."
+                content=(
+                    "You'll need to select or create a wallet before I can help with transactions. "
+                    "Please set up a wallet first."
+                )
             )
 
         try:
@@ -41,13 +47,14 @@ class BaseAgent(AgentCore):
                 SystemMessage(
                     content=(
                         "You are an agent that can perform various financial transactions on Base. "
-                        "When you need to perform an action, use the appropriate function with the correct arguments."
+                        "When you need to perform an action, use the appropriate function with the "
+                        "correct arguments."
                     )
                 ),
                 HumanMessage(content=request.prompt.content),
             ]
 
-            result = self.tool_bound_llm.invoke(messages)
+            result = await self._invoke_llm(self.tool_bound_llm, messages)
             return await self._handle_llm_response(result)
 
         except Exception as e:
@@ -58,14 +65,21 @@ class BaseAgent(AgentCore):
         """Execute the appropriate Base transaction tool based on function name."""
         try:
             if func_name == "swap_assets":
-                return AgentResponse.action_required(content="Ready to perform swap", action_type="swap")
+                return AgentResponse.action_required(
+                    content="Ready to perform swap", action_type="swap"
+                )
             elif func_name == "transfer_asset":
-                return AgentResponse.action_required(content="Ready to perform transfer", action_type="transfer")
+                return AgentResponse.action_required(
+                    content="Ready to perform transfer", action_type="transfer"
+                )
             elif func_name == "get_balance":
                 wallet = wallet_manager_instance.get_active_wallet()
                 if not wallet:
                     return AgentResponse.success(
-                        content="I can't check the balance because no wallet is selected. Please select a wallet first."
+                        content=(
+                            "I can't check the balance because no wallet is selected. Please "
+                            "select a wallet first."
+                        )
                     )
 
                 asset_id = args.get("asset_id")
@@ -75,7 +89,10 @@ class BaseAgent(AgentCore):
                     )
 
                 tool_result = tools.get_balance(wallet, asset_id=asset_id.lower())
-                content = f"Your wallet {tool_result['address']} has a balance of {tool_result['balance']} {tool_result['asset']}"
+                content = (
+                    f"Your wallet {tool_result['address']} has a balance of "
+                    f"{tool_result['balance']} {tool_result['asset']}"
+                )
                 return AgentResponse.success(content=content)
             else:
                 return AgentResponse.needs_info(
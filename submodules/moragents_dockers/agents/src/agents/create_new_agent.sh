@@ -51,7 +51,7 @@ class ${agent_name^}Agent(AgentCore):
                 HumanMessage(content=request.prompt.content),
             ]
 
-            result = self.tool_bound_llm.invoke(messages)
+            result = await self._invoke_llm(self.tool_bound_llm, messages)
             return await self._handle_llm_response(result)
 
         except Exception as e:
@@ -1,11 +1,33 @@
 import logging
-from src.agents.crypto_data import tools
-from src.models.core import ChatRequest, AgentResponse
-from src.agents.agent_core.agent import AgentCore
+
 from langchain.schema import HumanMessage, SystemMessage
+from src.agents.agent_core.agent import AgentCore
+from src.agents.crypto_data import tools
+from src.models.core import AgentResponse, ChatRequest
 
 logger = logging.getLogger(__name__)
 
+# Required argument, tool function and what to ask for when the argument is missing, by tool name
+TOOL_CALLS = {
+    "get_price": ("coin_name", "get_coin_price_tool", "the coin to get its price"),
+    "get_floor_price": (
+        "nft_name",
+        "get_nft_floor_price_tool",
+        "the NFT collection to get its floor price",
+    ),
+    "get_fdv": (
+        "coin_name",
+        "get_fully_diluted_valuation_tool",
+        "the coin to get its fully diluted valuation",
+    ),
+    "get_tvl": (
+        "protocol_name",
+        "get_protocol_total_value_locked_tool",
+        "the protocol to get its total value locked",
+    ),
+    "get_market_cap": ("coin_name", "get_coin_market_cap_tool", "the coin to get its market cap"),
+}
+
 
 class CryptoDataAgent(AgentCore):
     """Agent for handling cryptocurrency-related queries and data retrieval."""
@@ -26,10 +48,11 @@ class CryptoDataAgent(AgentCore):
                         "Ask for clarification if a request is ambiguous."
                     )
                 ),
+                *await self._get_history(request),
                 HumanMessage(content=request.prompt.content),
             ]
 
-            result = self.tool_bound_llm.invoke(messages)
+            result = await self._invoke_llm(self.tool_bound_llm, messages)
             return await self._handle_llm_response(result)
 
         except Exception as e:
@@ -39,41 +62,26 @@ class CryptoDataAgent(AgentCore):
     async def _execute_tool(self, func_name: str, args: dict) -> AgentResponse:
         """Execute the appropriate crypto tool based on function name."""
         try:
-            metadata = {}
+            if func_name not in TOOL_CALLS:
+                return AgentResponse.needs_info(
+                    content=(
+                        "I don't know how to handle that type of request. Could you try asking "
+                        "about cryptocurrency news instead?"
+                    )
+                )
+
+            arg_name, tool_name, subject = TOOL_CALLS[func_name]
+            if arg_name not in args:
+                return AgentResponse.needs_info(content=f"Please provide the name of {subject}")
+            content = getattr(tools, tool_name)(args[arg_name])
 
+            metadata = {}
             if func_name == "get_price":
-                if "coin_name" not in args:
-                    return AgentResponse.needs_info(content="Please provide the name of the coin to get its price")
-                content = tools.get_coin_price_tool(args["coin_name"])
-                trading_symbol = tools.get_tradingview_symbol(tools.get_coingecko_id(args["coin_name"]))
+                trading_symbol = tools.get_tradingview_symbol(
+                    tools.get_coingecko_id(args[arg_name])
+                )
                 if trading_symbol:
                     metadata["coinId"] = trading_symbol
-            elif func_name == "get_floor_price":
-                if "nft_name" not in args:
-                    return AgentResponse.needs_info(
-                        content="Please provide the name of the NFT collection to get its floor price"
-                    )
-                content = tools.get_nft_floor_price_tool(args["nft_name"])
-            elif func_name == "get_fdv":
-                if "coin_name" not in args:
-                    return AgentResponse.needs_info(
-                        content="Please provide the name of the coin to get its fully diluted valuation"
-                    )
-                content = tools.get_fully_diluted_valuation_tool(args["coin_name"])
-            elif func_name == "get_tvl":
-                if "protocol_name" not in args:
-                    return AgentResponse.needs_info(
-                        content="Please provide the name of the protocol to get its total value locked"
-                    )
-                content = tools.get_protocol_total_value_locked_tool(args["protocol_name"])
-            elif func_name == "get_market_cap":
-                if "coin_name" not in args:
-                    return AgentResponse.needs_info(content="Please provide the name of the coin to get its market cap")
-                content = tools.get_coin_market_cap_tool(args["coin_name"])
-            else:
-                return AgentResponse.needs_info(
-                    content=f"I don't know how to handle that type of request. Could you try asking about cryptocurrency news instead?"
-                )
 
             if "error" in content.lower() or "not found" in content.lower():
                 return AgentResponse.needs_info(content=content)
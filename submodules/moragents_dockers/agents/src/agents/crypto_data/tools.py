@@ -4,6 +4,9 @@ import requests
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from src.agents.crypto_data.config import Config
+from src.services.upstream import InstrumentedSession
+
+http_session = InstrumentedSession()
 
 
 def get_most_similar(text, data):
@@ -22,7 +25,7 @@ def get_coingecko_id(text, type="coin"):
     url = f"{Config.COINGECKO_BASE_URL}/search"
     params = {"query": text}
     try:
-        response = requests.get(url, params=params)
+        response = http_session.get(url, params=params)
         response.raise_for_status()
         data = response.json()
         if type == "coin":
@@ -40,7 +43,7 @@ def get_tradingview_symbol(coingecko_id):
     """Convert a CoinGecko ID to a TradingView symbol."""
     url = f"{Config.COINGECKO_BASE_URL}/coins/{coingecko_id}"
     try:
-        response = requests.get(url)
+        response = http_session.get(url)
         response.raise_for_status()
         data = response.json()
         symbol = data.get("symbol", "").upper()
@@ -58,7 +61,7 @@ def get_price(coin):
     url = f"{Config.COINGECKO_BASE_URL}/simple/price"
     params = {"ids": coin_id, "vs_currencies": "USD"}
     try:
-        response = requests.get(url, params=params)
+        response = http_session.get(url, params=params)
         response.raise_for_status()
         return response.json()[coin_id]["usd"]
     except requests.exceptions.RequestException as e:
@@ -73,7 +76,7 @@ def get_floor_price(nft):
         return None
     url = f"{Config.COINGECKO_BASE_URL}/nfts/{nft_id}"
     try:
-        response = requests.get(url)
+        response = http_session.get(url)
         response.raise_for_status()
         return response.json()["floor_price"]["usd"]
     except requests.exceptions.RequestException as e:
@@ -88,7 +91,7 @@ def get_fdv(coin):
         return None
     url = f"{Config.COINGECKO_BASE_URL}/coins/{coin_id}"
     try:
-        response = requests.get(url)
+        response = http_session.get(url)
         response.raise_for_status()
         data = response.json()
         return data.get("market_data", {}).get("fully_diluted_valuation", {}).get("usd")
@@ -105,7 +108,7 @@ def get_market_cap(coin):
     url = f"{Config.COINGECKO_BASE_URL}/coins/markets"
     params = {"ids": coin_id, "vs_currency": "USD"}
     try:
-        response = requests.get(url, params=params)
+        response = http_session.get(url, params=params)
         response.raise_for_status()
         return response.json()[0]["market_cap"]
     except requests.exceptions.RequestException as e:
@@ -117,7 +120,7 @@ def get_protocols_list():
     """Get the list of protocols from DefiLlama API."""
     url = f"{Config.DEFILLAMA_BASE_URL}/protocols"
     try:
-        response = requests.get(url)
+        response = http_session.get(url)
         response.raise_for_status()
         data = response.json()
         return (
@@ -134,7 +137,7 @@ def get_tvl_value(protocol_id):
     """Gets the TVL value using the protocol ID from DefiLlama API."""
     url = f"{Config.DEFILLAMA_BASE_URL}/tvl/{protocol_id}"
     try:
-        response = requests.get(url)
+        response = http_session.get(url)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -194,7 +197,7 @@ def get_protocol_total_value_locked_tool(protocol_name):
         tvl = get_protocol_tvl(protocol_name)
         if tvl is None:
             return Config.TVL_FAILURE_MESSAGE
-        protocol, tvl_value = list(tvl.items())[0][0], list(tvl.items())[0][1]
+        tvl_value = list(tvl.values())[0]
         return Config.TVL_SUCCESS_MESSAGE.format(protocol_name=protocol_name, tvl=tvl_value)
     except requests.exceptions.RequestException:
         return Config.API_ERROR_MESSAGE
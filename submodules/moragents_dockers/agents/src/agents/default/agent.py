@@ -1,10 +1,10 @@
 import logging
-from typing import Dict, Any
+from typing import Any, Dict
 
-from src.models.core import ChatRequest, AgentResponse
+from langchain.schema import HumanMessage, SystemMessage
 from src.agents.agent_core.agent import AgentCore
+from src.models.core import AgentResponse, ChatRequest
 from src.stores import agent_manager_instance
-from langchain.schema import HumanMessage, SystemMessage
 
 logger = logging.getLogger(__name__)
 
@@ -30,19 +30,24 @@ class DefaultAgent(AgentCore):
                     selected_agents_info.append(f"- {human_name}: {agent['description']}")
 
             system_prompt = (
-                "You are a helpful assistant that can engage in general conversation and provide information about Morpheus agents when specifically asked.\n"
-                "For general questions, respond naturally without mentioning Morpheus or its agents.\n"
-                "Only when explicitly asked about Morpheus or its capabilities, use this list of available agents:\n"
+                "You are a helpful assistant that can engage in general conversation and provide "
+                "information about Morpheus agents when specifically asked.\n"
+                "For general questions, respond naturally without mentioning Morpheus or its "
+                "agents.\n"
+                "Only when explicitly asked about Morpheus or its capabilities, use this list of "
+                "available agents:\n"
                 f"{chr(10).join(selected_agents_info)}\n"
-                "Remember: Only mention Morpheus agents if directly asked about them. Otherwise, simply answer questions normally as a helpful assistant."
+                "Remember: Only mention Morpheus agents if directly asked about them. Otherwise, "
+                "simply answer questions normally as a helpful assistant."
             )
 
             messages = [
                 SystemMessage(content=system_prompt),
+                *await self._get_history(request),
                 HumanMessage(content=request.prompt.content),
             ]
 
-            result = self.llm.invoke(messages)
+            result = await self._invoke_llm(self.llm, messages)
             return AgentResponse.success(content=result.content.strip())
 
         except Exception as e:
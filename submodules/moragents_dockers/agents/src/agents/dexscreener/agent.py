@@ -1,11 +1,13 @@
 import logging
-from typing import Dict, Any, List, Union, Optional
-from src.agents.agent_core.agent import AgentCore
-from src.models.core import ChatRequest, AgentResponse
+from typing import Any, Dict, List, Optional, Union
+
 from langchain.schema import HumanMessage, SystemMessage
-from .config import Config
+from src.agents.agent_core.agent import AgentCore
+from src.models.core import AgentResponse, ChatRequest
+
 from . import tools
-from .models import TokenProfile, BoostedToken
+from .config import Config
+from .models import BoostedToken, TokenProfile
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +36,7 @@ class DexScreenerAgent(AgentCore):
                 HumanMessage(content=request.prompt.content),
             ]
 
-            result = self.tool_bound_llm.invoke(messages)
+            result = await self._invoke_llm(self.tool_bound_llm, messages)
             return await self._handle_llm_response(result)
 
         except Exception as e:
@@ -131,7 +133,10 @@ class DexScreenerAgent(AgentCore):
             base_token = pair.get("baseToken", {})
             quote_token = pair.get("quoteToken", {})
 
-            formatted += f"## {base_token.get('symbol', '')} / {quote_token.get('symbol', '')} on {pair.get('dexId', '').title()}\n"
+            formatted += (
+                f"## {base_token.get('symbol', '')} / {quote_token.get('symbol', '')} on "
+                f"{pair.get('dexId', '').title()}\n"
+            )
             formatted += f"Chain: {pair.get('chainId', '').upper()}\n\n"
 
             # Price information
@@ -158,7 +163,9 @@ class DexScreenerAgent(AgentCore):
             if txns:
                 buys = txns.get("buys", 0)
                 sells = txns.get("sells", 0)
-                formatted += f"24h Transactions: {buys + sells} (🟢 {buys} buys, 🔴 {sells} sells)\n"
+                formatted += (
+                    f"24h Transactions: {buys + sells} (🟢 {buys} buys, 🔴 {sells} sells)\n"
+                )
 
             # Add links
             formatted += "\n**Links**: "
@@ -1,13 +1,17 @@
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Any, Dict, List, Optional
+
 import aiohttp
-from src.agents.dexscreener.models import TokenProfile, BoostedToken
 from src.agents.dexscreener.config import Config
+from src.agents.dexscreener.models import BoostedToken, TokenProfile
+from src.services.upstream import get_aiohttp_trace_config
 
 logger = logging.getLogger(__name__)
 
 
-def filter_by_chain(tokens: List[Dict[str, Any]], chain_id: Optional[str] = None) -> List[Dict[str, Any]]:
+def filter_by_chain(
+    tokens: List[Dict[str, Any]], chain_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
     """Filter tokens by chain ID if provided."""
     if not chain_id:
         return tokens
@@ -18,7 +22,7 @@ async def _make_request(endpoint: str) -> Dict[str, Any]:
     """Make an API request to DexScreener."""
     url = f"{Config.BASE_URL}{endpoint}"
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(trace_configs=[get_aiohttp_trace_config()]) as session:
             async with session.get(url) as response:
                 if response.status != 200:
                     raise Exception(f"API request failed with status {response.status}")
@@ -56,7 +60,9 @@ async def get_top_boosted_tokens(chain_id: Optional[str] = None) -> List[Boosted
         filtered_tokens = filter_by_chain(tokens, chain_id)
 
         # Sort by total amount
-        return sorted(filtered_tokens, key=lambda x: float(x.get("totalAmount", 0) or 0), reverse=True)
+        return sorted(
+            filtered_tokens, key=lambda x: float(x.get("totalAmount", 0) or 0), reverse=True
+        )
     except Exception as e:
         raise Exception(f"Failed to get top boosted tokens: {str(e)}")
 
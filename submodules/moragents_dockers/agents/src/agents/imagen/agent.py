@@ -1,9 +1,8 @@
 import base64
 import logging
 from io import BytesIO
-from typing import Dict, Any, List, Optional
+from typing import Any, Dict, List, Optional
 
-import requests
 from PIL import Image
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -11,13 +10,14 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-
-from src.models.core import ChatRequest, AgentResponse
 from src.agents.agent_core.agent import AgentCore
-from langchain.schema import HumanMessage, SystemMessage
+from src.models.core import AgentResponse, ChatRequest
+from src.services.upstream import InstrumentedSession
 
 logger = logging.getLogger(__name__)
 
+http_session = InstrumentedSession()
+
 
 class ImagenAgent(AgentCore):
     """Agent for handling image generation requests."""
@@ -30,24 +30,17 @@ class ImagenAgent(AgentCore):
     async def _process_request(self, request: ChatRequest) -> AgentResponse:
         """Process the validated chat request for image generation."""
         try:
-            messages = [
-                SystemMessage(
-                    content=(
-                        "You are an image generation assistant. "
-                        "Help users create images by understanding their prompts "
-                        "and generating appropriate images."
-                    )
-                ),
-                HumanMessage(content=request.prompt.content),
-            ]
-
             # For image generation, we'll directly use the prompt content
             result = self.generate_image(request.prompt.content)
 
             if result["success"]:
                 return AgentResponse.success(
                     content="Image generated successfully",
-                    metadata={"success": True, "service": result["service"], "image": result["image"]},
+                    metadata={
+                        "success": True,
+                        "service": result["service"],
+                        "image": result["image"],
+                    },
                 )
             else:
                 return AgentResponse.error(error_message=result["error"])
@@ -113,7 +106,9 @@ class ImagenAgent(AgentCore):
 
             # Wait for the generated image
             img_element = WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.XPATH, "//img[@alt='Generated' and @loading='lazy']"))
+                EC.presence_of_element_located(
+                    (By.XPATH, "//img[@alt='Generated' and @loading='lazy']")
+                )
             )
 
             if img_element:
@@ -131,16 +126,22 @@ class ImagenAgent(AgentCore):
                         "https://fast-flux-demo.replicate.workers.dev/api/generate-image",
                     )
                 ):
-                    response = requests.get(img_src)
+                    response = http_session.get(img_src)
                     if response.status_code == 200:
                         img_data = response.content
                         return Image.open(BytesIO(img_data))
                     else:
-                        logger.error(f"Failed to download image. Status code: {response.status_code}")
+                        logger.error(
+                            f"Failed to download image. Status code: {response.status_code}"
+                        )
                 else:
-                    logger.warning("Image format not supported. Expected a valid imgproxy or replicate URL.")
+                    logger.warning(
+                        "Image format not supported. Expected a valid imgproxy or replicate URL."
+                    )
             else:
-                logger.warning("Image not found or still generating. You may need to increase the wait time.")
+                logger.warning(
+                    "Image not found or still generating. You may need to increase the wait time."
+                )
 
         except Exception as e:
             logger.error(f"Error in image generation: {str(e)}")
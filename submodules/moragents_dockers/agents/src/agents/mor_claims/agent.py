@@ -1,10 +1,10 @@
 import logging
-from typing import Dict, Any
+from typing import Any, Dict
 
-from src.agents.mor_claims import tools
-from src.models.core import ChatRequest, AgentResponse
-from src.agents.agent_core.agent import AgentCore
 from langchain.schema import HumanMessage, SystemMessage
+from src.agents.agent_core.agent import AgentCore
+from src.agents.mor_claims import tools
+from src.models.core import AgentResponse, ChatRequest
 from src.stores import agent_manager_instance
 
 logger = logging.getLogger(__name__)
@@ -30,8 +30,6 @@ class MorClaimsAgent(AgentCore):
             state = self.conversation_state[wallet_address]["state"]
 
             if state == "initial":
-                agent_manager_instance.set_active_agent("mor claims")
-
                 rewards = {
                     0: tools.get_current_user_reward(wallet_address, 0),
                     1: tools.get_current_user_reward(wallet_address, 1),
@@ -45,21 +43,39 @@ class MorClaimsAgent(AgentCore):
                     }
                     self.conversation_state[wallet_address]["receiver_address"] = wallet_address
                     self.conversation_state[wallet_address]["state"] = "awaiting_confirmation"
+                    # Keep the conversation with this agent until the user answers
+                    agent_manager_instance.set_active_agent(
+                        "mor claims", request.conversation_id, sticky=True
+                    )
                     return AgentResponse.success(
-                        content=f"You have {available_rewards[selected_pool]} MOR rewards available in pool {selected_pool}. Would you like to proceed with claiming these rewards?"
+                        content=(
+                            f"You have {available_rewards[selected_pool]} MOR rewards available in "
+                            f"pool {selected_pool}. Would you like to proceed with claiming these "
+                            "rewards?"
+                        )
                     )
                 else:
                     return AgentResponse.error(
-                        error_message=f"No rewards found for your wallet address {wallet_address} in either pool. Claim cannot be processed."
+                        error_message=(
+                            f"No rewards found for your wallet address {wallet_address} in either "
+                            "pool. Claim cannot be processed."
+                        )
                     )
 
             elif state == "awaiting_confirmation":
                 user_input = request.prompt.content.lower()
                 if any(word in user_input for word in ["yes", "proceed", "confirm", "claim"]):
+                    self._end_claim(wallet_address, request.conversation_id)
                     return await self._prepare_transactions(wallet_address)
+                elif set(user_input.split()) & {"no", "cancel", "stop"}:
+                    self._end_claim(wallet_address, request.conversation_id)
+                    return AgentResponse.success(content="Okay, your rewards will not be claimed.")
                 else:
                     return AgentResponse.success(
-                        content="Please confirm if you want to proceed with the claim by saying 'yes', 'proceed', 'confirm', or 'claim'."
+                        content=(
+                            "Please confirm if you want to proceed with the claim by saying 'yes', "
+                            "'proceed', 'confirm', or 'claim'."
+                        )
                     )
 
             messages = [
@@ -72,13 +88,18 @@ class MorClaimsAgent(AgentCore):
                 HumanMessage(content=request.prompt.content),
             ]
 
-            result = self.tool_bound_llm.invoke(messages)
+            result = await self._invoke_llm(self.tool_bound_llm, messages)
             return await self._handle_llm_response(result)
 
         except Exception as e:
             logger.error(f"Error processing request: {str(e)}", exc_info=True)
             return AgentResponse.error(error_message=str(e))
 
+    def _end_claim(self, wallet_address: str, conversation_id: str) -> None:
+        """Finish the claim flow of a wallet, releasing the conversation to other agents"""
+        self.conversation_state[wallet_address]["state"] = "initial"
+        agent_manager_instance.clear_active_agent(conversation_id)
+
     async def _prepare_transactions(self, wallet_address: str) -> AgentResponse:
         """Prepare claim transactions for the given wallet."""
         try:
@@ -1,9 +1,12 @@
 from src.agents.mor_rewards.config import Config
+from src.services.upstream import InstrumentedSession
 from web3 import Web3
 
+rpc_session = InstrumentedSession("rpc")
+
 
 def get_current_user_reward(wallet_address, pool_id):
-    web3 = Web3(Web3.HTTPProvider(Config.WEB3RPCURL["1"]))
+    web3 = Web3(Web3.HTTPProvider(Config.WEB3RPCURL["1"], session=rpc_session))
     distribution_contract = web3.eth.contract(
         address=web3.to_checksum_address(Config.DISTRIBUTION_PROXY_ADDRESS),
         abi=Config.DISTRIBUTION_ABI,
@@ -28,7 +31,10 @@ def get_tools():
             "type": "function",
             "function": {
                 "name": "get_current_user_reward",
-                "description": "Fetch the token amount of currently accrued MOR rewards for a user address from a specific pool",
+                "description": (
+                    "Fetch the token amount of currently accrued MOR rewards for a user address "
+                    "from a specific pool"
+                ),
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -1,12 +1,11 @@
 import logging
-import re
-import pyshorteners
 
+import pyshorteners
+from langchain.schema import HumanMessage, SystemMessage
+from src.agents.agent_core.agent import AgentCore
 from src.agents.news_agent.config import Config
 from src.agents.news_agent.tools import clean_html, fetch_rss_feed, is_within_time_window
-from src.models.core import ChatRequest, AgentResponse
-from src.agents.agent_core.agent import AgentCore
-from langchain.schema import HumanMessage, SystemMessage
+from src.models.core import AgentResponse, ChatRequest
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +25,9 @@ class NewsAgent(AgentCore):
                 "type": "function",
                 "function": {
                     "name": "fetch_crypto_news",
-                    "description": "Fetch and analyze cryptocurrency news for potential price impacts",
+                    "description": (
+                        "Fetch and analyze cryptocurrency news for potential price impacts"
+                    ),
                     "parameters": {
                         "type": "object",
                         "properties": {
@@ -48,14 +49,15 @@ class NewsAgent(AgentCore):
             messages = [
                 SystemMessage(
                     content=(
-                        "You are a news analysis agent that fetches and analyzes cryptocurrency news. "
+                        "You are a news analysis agent that fetches and analyzes "
+                        "cryptocurrency news. "
                         "Ask for clarification if a request is ambiguous."
                     )
                 ),
                 HumanMessage(content=request.prompt.content),
             ]
 
-            result = self.tool_bound_llm.invoke(messages)
+            result = await self._invoke_llm(self.tool_bound_llm, messages)
             return await self._handle_llm_response(result)
 
         except Exception as e:
@@ -74,13 +76,19 @@ class NewsAgent(AgentCore):
                         content="Could you specify which cryptocurrencies you'd like news about?"
                     )
 
-                news = self._fetch_crypto_news(coins)
+                news = await self._fetch_crypto_news(coins)
                 if not news:
                     return AgentResponse.success(
-                        content="No relevant news found for the specified cryptocurrencies in the last 24 hours."
+                        content=(
+                            "No relevant news found for the specified cryptocurrencies in the last "
+                            "24 hours."
+                        )
                     )
 
-                response = "Here are the latest news items relevant to changes in price movement of the mentioned tokens in the last 24 hours:\n\n"
+                response = (
+                    "Here are the latest news items relevant to changes in price movement of the "
+                    "mentioned tokens in the last 24 hours:\n\n"
+                )
                 for index, item in enumerate(news, start=1):
                     coin_name = Config.CRYPTO_DICT.get(item["Coin"], item["Coin"])
                     short_url = self.url_shortener.tinyurl.short(item["Link"])
@@ -92,25 +100,32 @@ class NewsAgent(AgentCore):
                 return AgentResponse.success(content=response)
             else:
                 return AgentResponse.needs_info(
-                    content=f"I don't know how to handle that type of request. Could you try asking about cryptocurrency news instead?"
+                    content=(
+                        "I don't know how to handle that type of request. Could you try asking "
+                        "about cryptocurrency news instead?"
+                    )
                 )
 
         except Exception as e:
             logger.error(f"Error executing tool {func_name}: {str(e)}", exc_info=True)
-            return AgentResponse.needs_info(content="I encountered an issue fetching the news. Could you try again?")
+            return AgentResponse.needs_info(
+                content="I encountered an issue fetching the news. Could you try again?"
+            )
 
-    def _check_relevance_and_summarize(self, title, content, coin):
+    async def _check_relevance_and_summarize(self, title, content, coin):
         """Check if news is relevant and generate summary."""
         logger.info(f"Checking relevance for {coin}: {title}")
         prompt = Config.RELEVANCE_PROMPT.format(coin=coin, title=title, content=content)
-        result = self.llm.invoke(
-            input=[{"role": "user", "content": prompt}],
+        result = await self._invoke_llm(
+            self.llm,
+            [{"role": "user", "content": prompt}],
+            stream=False,
             max_tokens=Config.LLM_MAX_TOKENS,
             temperature=Config.LLM_TEMPERATURE,
         )
         return result.content.strip()
 
-    def _process_rss_feed(self, feed_url, coin):
+    async def _process_rss_feed(self, feed_url, coin):
         """Process RSS feed and filter relevant articles."""
         logger.info(f"Processing RSS feed for {coin}: {feed_url}")
         feed = fetch_rss_feed(feed_url)
@@ -121,7 +136,7 @@ class NewsAgent(AgentCore):
                 title = clean_html(entry.title)
                 content = clean_html(entry.summary)
                 logger.info(f"Checking relevance for article: {title}")
-                result = self._check_relevance_and_summarize(title, content, coin)
+                result = await self._check_relevance_and_summarize(title, content, coin)
                 if not result.upper().startswith("NOT RELEVANT"):
                     results.append({"Title": title, "Summary": result, "Link": entry.link})
                 if len(results) >= Config.ARTICLES_PER_TOKEN:
@@ -131,7 +146,7 @@ class NewsAgent(AgentCore):
         logger.info(f"Found {len(results)} relevant articles for {coin}")
         return results
 
-    def _fetch_crypto_news(self, coins):
+    async def _fetch_crypto_news(self, coins):
         """Fetch and process news for specified coins."""
         logger.info(f"Fetching news for coins: {coins}")
         all_news = []
@@ -139,8 +154,10 @@ class NewsAgent(AgentCore):
             logger.info(f"Processing news for {coin}")
             coin_name = Config.CRYPTO_DICT.get(coin.upper(), coin)
             google_news_url = Config.GOOGLE_NEWS_BASE_URL.format(coin_name)
-            results = self._process_rss_feed(google_news_url, coin_name)
-            all_news.extend([{"Coin": coin, **result} for result in results[: Config.ARTICLES_PER_TOKEN]])
+            results = await self._process_rss_feed(google_news_url, coin_name)
+            all_news.extend(
+                [{"Coin": coin, **result} for result in results[: Config.ARTICLES_PER_TOKEN]]
+            )
 
         logger.info(f"Total news items fetched: {len(all_news)}")
         return all_news
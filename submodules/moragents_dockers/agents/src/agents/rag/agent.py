@@ -1,29 +1,51 @@
+import asyncio
 import logging
 import os
+import time
+import uuid
+from typing import List, Optional
 
+import fitz
 from fastapi import Request
-from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_text_splitters.character import RecursiveCharacterTextSplitter
-from werkzeug.utils import secure_filename
-
 from src.agents.agent_core.agent import AgentCore
-from src.models.core import ChatRequest, AgentResponse
+from src.agents.rag.documents import DocumentEntry, conversation_documents
+from src.agents.rag.embedding_cache import CachedDocumentEmbedder, embedding_cache
+from src.agents.rag.index_store import make_index_key, rag_index_store
+from src.agents.rag.ingestion import IngestionJob, ingestion_jobs
+from src.agents.rag.lexical import LexicalIndex
+from src.config import Config
+from src.models.core import AgentResponse, ChatRequest
 from src.stores import chat_manager_instance
+from werkzeug.utils import secure_filename
 
 logger = logging.getLogger(__name__)
 
 UPLOAD_FOLDER = os.path.join(os.getcwd(), "uploads")
 
 
+def load_pages(
+    document: fitz.Document, source: str, first_page: int, last_page: int
+) -> List[Document]:
+    """Extract the text of a range of PDF pages, tagged with the document name and page number"""
+    return [
+        Document(
+            page_content=document[number].get_text(),
+            metadata={"source": source, "page": number, "total_pages": document.page_count},
+        )
+        for number in range(first_page, last_page)
+    ]
+
+
 class RagAgent(AgentCore):
     """Agent for handling document Q&A using RAG."""
 
     def __init__(self, config, llm, embeddings):
         super().__init__(config, llm, embeddings)
-        self.prompt = ChatPromptTemplate.from_template(
-            """
+        self.prompt = ChatPromptTemplate.from_template("""
                 Answer the following question only based on the given context
 
                 <context>
@@ -31,38 +53,180 @@ class RagAgent(AgentCore):
                 </context>
 
                 Question: {input}
-            """
-        )
+            """)
         self.max_size = 5 * 1024 * 1024
-        self.retriever = None
+        self.document_embedder = CachedDocumentEmbedder(
+            embeddings,
+            model=self.embedding_model,
+            cache=embedding_cache,
+            batch_size=Config.RAG_EMBEDDING_BATCH_SIZE,
+            concurrency=Config.RAG_EMBEDDING_CONCURRENCY,
+        )
 
-    async def handle_file_upload(self, file):
-        if not os.path.exists(UPLOAD_FOLDER):
-            os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
+    @property
+    def embedding_model(self) -> str:
+        """Name of the embedding model, part of the key of saved document indexes"""
+        return getattr(self.embeddings, "model", None) or type(self.embeddings).__name__
 
-        # Save the file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+    async def ingest(self, job: IngestionJob, content: bytes) -> None:
+        """
+        Index a document uploaded to a conversation, a few pages at a time.
+
+        Pages become queryable as soon as they are embedded. The completed index is saved, and
+        an index of the same document, embedding model and chunking, in memory or saved, is
+        reused instead of embedding the document again; uploads of a document already being
+        ingested wait for it to finish. A BM25 index of the chunks is built alongside the vector
+        index and saved with it, for hybrid search.
+
+        Args:
+            job (IngestionJob): Job to report progress on
+            content (bytes): Uploaded file content
+        """
+        key = make_index_key(
+            content, self.embedding_model, Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP
+        )
+        async with conversation_documents.ingestion(key):
+            index = await conversation_documents.get_index(key, self.embeddings)
+            if index is None:
+                await self._ingest_document(job, key, content)
+                return
+            vector_store, lexical_index = index
+            pages = (rag_index_store.get_metadata(key) or {}).get("pages", 0)
+            job.reused_index = True
+            job.start(pages)
+            self._add_document(job, key, vector_store, lexical_index, saved=True)
+            job.advance(pages, vector_store.index.ntotal, cache_hits=vector_store.index.ntotal)
 
-        # DocumentToolsGenerator class instantiation
-        loader = PyMuPDFLoader(file_path)
-        docs = loader.load()
+    async def _ingest_document(self, job: IngestionJob, key: str, content: bytes) -> None:
+        """Embed a document, making it queryable as it goes, and save its index"""
+        vector_store = None
+        lexical_index = LexicalIndex()
+        try:
+            vector_store = await self._ingest_pages(job, key, content, lexical_index)
+            if vector_store is None:
+                raise ValueError("The document contains no text")
+            metadata = {
+                "filename": job.filename,
+                "pages": job.pages_total,
+                "model": self.embedding_model,
+                "chunk_size": Config.RAG_CHUNK_SIZE,
+                "chunk_overlap": Config.RAG_CHUNK_OVERLAP,
+            }
+            # Only this ingestion updates the index, so saving it needs no lock against searches
+            await asyncio.to_thread(
+                rag_index_store.save, key, vector_store, metadata, lexical_index
+            )
+        except Exception:
+            if vector_store is not None:
+                conversation_documents.discard_document(job.conversation_id, key)
+            raise
+        conversation_documents.mark_saved(key)
+
+    async def _ingest_pages(
+        self, job: IngestionJob, key: str, content: bytes, lexical_index: LexicalIndex
+    ) -> Optional[FAISS]:
+        """
+        Embed the pages of a PDF batch by batch, adding their chunks to lexical_index as well.
+
+        Returns:
+            Optional[FAISS]: The vector index, None if the document has no text
+        """
+        file_path = await asyncio.to_thread(
+            self._save_upload, f"{key[:16]}-{job.filename}", content
+        )
+        document = await asyncio.to_thread(fitz.open, file_path)
         text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1024,
-            chunk_overlap=20,
+            chunk_size=Config.RAG_CHUNK_SIZE,
+            chunk_overlap=Config.RAG_CHUNK_OVERLAP,
             length_function=len,
             is_separator_regex=False,
         )
-        split_documents = text_splitter.split_documents(docs)
-        vector_store = FAISS.from_documents(split_documents, self.embeddings)
-        self.retriever = vector_store.as_retriever(search_kwargs={"k": 7})
+        vector_store = None
+        lock = conversation_documents.lock_for(key)
+        try:
+            job.start(document.page_count)
+            for first_page in range(0, document.page_count, Config.RAG_INGEST_PAGE_BATCH):
+                last_page = min(first_page + Config.RAG_INGEST_PAGE_BATCH, document.page_count)
+                pages = await asyncio.to_thread(
+                    load_pages, document, job.filename, first_page, last_page
+                )
+                split_documents = await asyncio.to_thread(text_splitter.split_documents, pages)
+                texts = [chunk.page_content for chunk in split_documents]
+                if not texts:
+                    job.advance(last_page - first_page, 0)
+                    continue
+
+                vectors, stats = await self.document_embedder.embed(texts)
+                text_embeddings = list(zip(texts, vectors))
+                metadatas = [chunk.metadata for chunk in split_documents]
+                # Both indexes identify chunks by the same IDs, so their results can be fused
+                ids = [uuid.uuid4().hex for _ in texts]
+                if vector_store is None:
+                    # Queries against the index are embedded by the model directly
+                    vector_store = FAISS.from_embeddings(
+                        text_embeddings, self.embeddings, metadatas=metadatas, ids=ids
+                    )
+                    lexical_index.add(ids, texts)
+                    self._add_document(job, key, vector_store, lexical_index, saved=False)
+                else:
+                    async with lock:
+                        vector_store.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+                        lexical_index.add(ids, texts)
+                    conversation_documents.refresh_size(key)
+                job.advance(last_page - first_page, len(texts), stats.cache_hits)
+        finally:
+            document.close()
+        return vector_store
+
+    def _save_upload(self, filename: str, content: bytes) -> str:
+        """Save an uploaded file, returning its path"""
+        if not os.path.exists(UPLOAD_FOLDER):
+            os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+        file_path = os.path.join(UPLOAD_FOLDER, secure_filename(filename))
+        with open(file_path, "wb") as buffer:
+            buffer.write(content)
+        return file_path
+
+    def _add_document(
+        self,
+        job: IngestionJob,
+        key: str,
+        vector_store: FAISS,
+        lexical_index: LexicalIndex,
+        saved: bool,
+    ) -> None:
+        """Make a document queryable in the conversation it was uploaded to"""
+        entry = DocumentEntry(
+            key=key, filename=job.filename, pages=job.pages_total, uploaded_at=time.time()
+        )
+        conversation_documents.add_document(
+            job.conversation_id, entry, vector_store, lexical_index, saved
+        )
+        chat_manager_instance.set_uploaded_file(True, job.conversation_id)
+
+    async def _run_ingestion(self, job: IngestionJob, content: bytes) -> None:
+        """Ingest a document and report the outcome in the chat history"""
+        try:
+            await self.ingest(job, content)
+        except Exception as e:
+            response = AgentResponse.error(
+                error_message=(
+                    f"There was an issue uploading your file: {str(e)}. Please try again with a "
+                    "different file."
+                )
+            )
+            chat_manager_instance.add_response(response, "rag", job.conversation_id)
+            raise
+        response = AgentResponse.success(
+            content="You have successfully uploaded the text", metadata={"ingest": job.to_dict()}
+        )
+        chat_manager_instance.add_response(response, "rag", job.conversation_id)
 
     async def upload_file(self, request: Request):
+        """Validate an uploaded file and start indexing it in the background"""
         self.logger.info(f"Received upload request: {request}")
         file = request["file"]
+        conversation_id = request.get("conversation_id") or "default"
         if file.filename == "":
             return AgentResponse.needs_info(content="Please select a file to upload")
 
@@ -70,39 +234,75 @@ class RagAgent(AgentCore):
         content = await file.read()
         await file.seek(0)
         if len(content) > self.max_size:
-            return AgentResponse.needs_info(content="The file is too large. Please upload a file less than 5 MB")
+            return AgentResponse.needs_info(
+                content="The file is too large. Please upload a file less than 5 MB"
+            )
 
         try:
-            await self.handle_file_upload(file)
-            chat_manager_instance.set_uploaded_file(True)
-            return AgentResponse.success(content="You have successfully uploaded the text")
+            job = ingestion_jobs.submit(
+                file.filename, conversation_id, lambda job: self._run_ingestion(job, content)
+            )
+            return AgentResponse.success(
+                content=(
+                    f"Processing {file.filename}. You can ask about the pages indexed so far "
+                    "in the meantime."
+                ),
+                metadata={
+                    "job_id": job.job_id,
+                    "status_url": f"/rag/jobs/{job.job_id}",
+                    "events_url": f"/rag/jobs/{job.job_id}/events",
+                },
+            )
         except Exception as e:
             self.logger.error(f"Error during file upload: {str(e)}")
             return AgentResponse.error(
-                error_message=f"There was an issue uploading your file: {str(e)}. Please try again with a different file."
+                error_message=(
+                    f"There was an issue uploading your file: {str(e)}. Please try again with a "
+                    "different file."
+                )
             )
 
     async def _process_request(self, request: ChatRequest) -> AgentResponse:
         """Process the validated chat request for RAG."""
         try:
-            if not chat_manager_instance.get_uploaded_file_status():
+            conversation_id = request.conversation_id
+            # The document manifests outlive the chat history's upload flag, e.g. across restarts
+            if not conversation_documents.get_documents(conversation_id):
                 return AgentResponse.needs_info(content="Please upload a file first")
 
             prompt = request.prompt.content
-            response = await self._get_rag_response(prompt)
+            retrieved_docs = await conversation_documents.search(
+                conversation_id, prompt, self.embeddings, Config.RAG_RETRIEVER_K
+            )
+            if not retrieved_docs:
+                return AgentResponse.needs_info(content="Please upload your file again")
+
+            response = await self._get_rag_response(prompt, retrieved_docs)
             return AgentResponse.success(content=response)
 
         except Exception as e:
             self.logger.error(f"Error processing request: {str(e)}", exc_info=True)
             return AgentResponse.error(
-                error_message=f"I encountered an issue processing your request: {str(e)}. Please try rephrasing your question."
+                error_message=(
+                    f"I encountered an issue processing your request: {str(e)}. Please try "
+                    "rephrasing your question."
+                )
             )
 
-    async def _get_rag_response(self, prompt: str) -> str:
-        retrieved_docs = self.retriever.invoke(prompt)
-        formatted_context = "\n\n".join(doc.page_content for doc in retrieved_docs)
+    async def _get_rag_response(self, prompt: str, retrieved_docs: List[Document]) -> str:
+        # Name the source of each chunk, since a conversation may have several documents
+        formatted_context = "\n\n".join(
+            (
+                f"[{doc.metadata.get('source')}, page "
+                f"{doc.metadata.get('page', 0) + 1}]\n{doc.page_content}"
+            )
+            for doc in retrieved_docs
+        )
         formatted_prompt = f"Question: {prompt}\n\nContext: {formatted_context}"
-        system_prompt = "You are a helpful assistant. Use the provided context to respond to the following question."
+        system_prompt = (
+            "You are a helpful assistant. Use the provided context to respond to the following "
+            "question."
+        )
 
         messages = [
             {
@@ -111,11 +311,14 @@ class RagAgent(AgentCore):
             },
             {"role": "user", "content": formatted_prompt},
         ]
-        result = self.llm.invoke(messages)
+        result = await self._invoke_llm(self.llm, messages)
         return result.content.strip()
 
     async def _execute_tool(self, func_name: str, args: dict) -> AgentResponse:
         """Not used in RAG agent but required by AgentCore."""
         return AgentResponse.needs_info(
-            content="This operation is not supported. Please try asking a question about the uploaded document instead."
+            content=(
+                "This operation is not supported. Please try asking a question about the uploaded "
+                "document instead."
+            )
         )
@@ -0,0 +1,447 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import weakref
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from src.agents.rag.index_store import RagIndexStore, rag_index_store
+from src.agents.rag.lexical import LexicalIndex, reciprocal_rank_fusion
+from src.config import Config
+from src.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Lexical matches scoring below this fraction of a document's best match only share common terms;
+# fusing them would promote noise that happens to rank well in vector search too
+LEXICAL_MIN_SCORE_RATIO = 0.1
+
+MANIFEST_DIR = "conversations"
+
+# Chunks found in a document by (index key, chunk ID), with the vector and lexical results
+DocumentResults = Tuple[
+    Dict[Tuple[str, str], Document],
+    List[Tuple[float, Tuple[str, str]]],
+    List[Tuple[float, Tuple[str, str]]],
+]
+
+
+@dataclass
+class DocumentEntry:
+    """
+    A document uploaded to a conversation.
+
+    Attributes:
+        key (str): Key of the document's index in the index store
+        filename (str): Name of the uploaded file
+        pages (int): Number of pages
+        uploaded_at (float): Upload time
+    """
+
+    key: str
+    filename: str
+    pages: int = 0
+    uploaded_at: float = 0.0
+
+
+def vector_search(
+    vector_store: FAISS, query_vector: List[float], limit: int
+) -> List[Tuple[str, float]]:
+    """Find the docstore IDs and distances of the chunks closest to a query vector"""
+    distances, positions = vector_store.index.search(
+        np.asarray([query_vector], dtype=np.float32), limit
+    )
+    return [
+        (vector_store.index_to_docstore_id[position], float(distance))
+        for distance, position in zip(distances[0], positions[0])
+        if position != -1
+    ]
+
+
+def estimate_index_bytes(vector_store: FAISS) -> int:
+    """Estimate the memory held by an index: its float32 vectors plus the chunk texts"""
+    index = vector_store.index
+    # InMemoryDocstore keeps the chunks in a plain dict
+    texts = getattr(vector_store.docstore, "_dict", {}).values()
+    return index.ntotal * index.d * 4 + sum(len(document.page_content) for document in texts)
+
+
+class ConversationDocuments:
+    """
+    Document indexes of each conversation, with a bounded set of indexes kept in memory.
+
+    Every conversation has its own documents, and questions are answered from the union of
+    them. The indexes themselves are shared: the same file uploaded to several conversations
+    is loaded once. At most max_loaded indexes, and at most max_bytes of them, stay in memory;
+    beyond that the least recently used saved indexes are dropped from memory and reloaded
+    from the index store when needed again. Indexes still being ingested are never dropped.
+
+    Each conversation's document list is kept in a small manifest next to the saved indexes,
+    so documents survive restarts; the manifests of the max_manifests most recently used
+    conversations are cached in memory.
+
+    Attributes:
+        index_store (RagIndexStore): Store of the saved indexes
+        max_loaded (int): Maximum number of indexes in memory
+        max_bytes (int): Maximum estimated memory of the indexes in memory
+        max_documents (int): Maximum documents per conversation; uploading more replaces the oldest
+        max_manifests (int): Maximum conversation document lists cached in memory
+        hybrid (bool): Whether searches fuse BM25 matches with vector search results
+        hybrid_candidates (int): Results taken from each retriever before fusion
+        rrf_k (int): Reciprocal rank fusion damping constant
+    """
+
+    def __init__(
+        self,
+        index_store: RagIndexStore,
+        max_loaded: int,
+        max_bytes: int,
+        max_documents: int,
+        max_manifests: int = 1000,
+        hybrid: bool = True,
+        hybrid_candidates: int = 20,
+        rrf_k: int = 60,
+    ) -> None:
+        self.index_store = index_store
+        self.max_loaded = max_loaded
+        self.max_bytes = max_bytes
+        self.max_documents = max_documents
+        self.max_manifests = max_manifests
+        self.hybrid = hybrid
+        self.hybrid_candidates = hybrid_candidates
+        self.rrf_k = rrf_k
+        # Serialize the updates of an index being ingested with searches of the same index, which
+        # run in worker threads; a lock lives as long as someone holds it
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._documents: "OrderedDict[str, List[DocumentEntry]]" = OrderedDict()
+        self._loaded: "OrderedDict[str, Tuple[FAISS, LexicalIndex, int]]" = OrderedDict()
+        self._ingesting: Dict[str, int] = {}
+        self._ingestions: Dict[str, asyncio.Future] = {}
+        self._loaded_bytes = 0
+
+    def lock_for(self, key: str) -> asyncio.Lock:
+        """Get the lock serializing updates of an index with searches of it"""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    @contextlib.asynccontextmanager
+    async def ingestion(self, key: str) -> AsyncIterator[None]:
+        """
+        Ingest an index at most once at a time.
+
+        Uploads of a document already being ingested wait for that ingestion to finish, then reuse
+        its index instead of embedding the document again.
+
+        Args:
+            key (str): Key of the index to ingest
+        """
+        while key in self._ingestions:
+            # Waiting does not raise the other ingestion's error; a failed one is simply retried
+            await asyncio.wait([self._ingestions[key]])
+        done = asyncio.get_running_loop().create_future()
+        self._ingestions[key] = done
+        try:
+            yield
+        finally:
+            del self._ingestions[key]
+            done.set_result(None)
+
+    async def get_index(self, key: str, embeddings: Any) -> Optional[Tuple[FAISS, LexicalIndex]]:
+        """Get an index from memory, or load it from the index store; None if it is in neither"""
+        if key in self._loaded:
+            self._loaded.move_to_end(key)
+            return self._loaded[key][:2]
+        return await asyncio.to_thread(self._load, key, embeddings)
+
+    def _manifest_path(self, conversation_id: str) -> str:
+        name = hashlib.sha256(conversation_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.index_store.root, MANIFEST_DIR, f"{name}.json")
+
+    def get_documents(self, conversation_id: str) -> List[DocumentEntry]:
+        """Get the documents of a conversation, oldest first"""
+        documents = self._documents.get(conversation_id)
+        if documents is not None:
+            self._documents.move_to_end(conversation_id)
+            return documents
+        try:
+            with open(self._manifest_path(conversation_id), encoding="utf-8") as file:
+                documents = [DocumentEntry(**entry) for entry in json.load(file)]
+        except (OSError, ValueError, TypeError):
+            # Not cached: any conversation ID can be looked up
+            return []
+        self._cache_documents(conversation_id, documents)
+        return documents
+
+    def _cache_documents(self, conversation_id: str, documents: List[DocumentEntry]) -> None:
+        if not documents:
+            self._documents.pop(conversation_id, None)
+            return
+        self._documents[conversation_id] = documents
+        self._documents.move_to_end(conversation_id)
+        while len(self._documents) > self.max_manifests:
+            self._documents.popitem(last=False)
+
+    def _set_documents(self, conversation_id: str, documents: List[DocumentEntry]) -> None:
+        """Update the documents of a conversation in the cache and in its manifest"""
+        self._cache_documents(conversation_id, documents)
+        path = self._manifest_path(conversation_id)
+        try:
+            if not documents:
+                if os.path.exists(path):
+                    os.remove(path)
+                return
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as file:
+                json.dump([asdict(entry) for entry in documents], file)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            logger.warning(
+                f"Failed to save the document list of conversation {conversation_id}: {str(e)}"
+            )
+
+    def add_document(
+        self,
+        conversation_id: str,
+        entry: DocumentEntry,
+        vector_store: FAISS,
+        lexical_index: LexicalIndex,
+        saved: bool,
+    ) -> None:
+        """
+        Add a document to a conversation, replacing an earlier upload of the same document.
+
+        Args:
+            conversation_id (str): Conversation the document was uploaded to
+            entry (DocumentEntry): Document description
+            vector_store (FAISS): Index of the document, possibly still being ingested
+            lexical_index (LexicalIndex): Lexical index of the same chunks
+            saved (bool): Whether the index is saved in the index store; unsaved indexes stay in
+                memory until mark_saved is called
+        """
+        documents = [
+            document
+            for document in self.get_documents(conversation_id)
+            if document.key != entry.key
+        ]
+        documents.append(entry)
+        self._set_documents(conversation_id, documents[-self.max_documents :])
+
+        if not saved:
+            self._ingesting[entry.key] = self._ingesting.get(entry.key, 0) + 1
+        self._put(entry.key, vector_store, lexical_index)
+
+    def mark_saved(self, key: str) -> None:
+        """Allow an ingested index to leave memory now that it is saved"""
+        remaining = self._ingesting.get(key, 0) - 1
+        if remaining > 0:
+            self._ingesting[key] = remaining
+        else:
+            self._ingesting.pop(key, None)
+        self.refresh_size(key)
+
+    def discard_document(self, conversation_id: str, key: str) -> None:
+        """Remove a failed document from a conversation and its unsaved index from memory"""
+        self._set_documents(
+            conversation_id,
+            [document for document in self.get_documents(conversation_id) if document.key != key],
+        )
+        remaining = self._ingesting.pop(key, 0) - 1
+        if remaining > 0:
+            self._ingesting[key] = remaining
+        elif key in self._loaded and not self.index_store.contains(key):
+            self._loaded_bytes -= self._loaded.pop(key)[2]
+
+    def refresh_size(self, key: str) -> None:
+        """Update the memory estimate of a loaded index after adding chunks, evicting if needed"""
+        if key in self._loaded:
+            self._put(key, *self._loaded[key][:2])
+
+    def _put(self, key: str, vector_store: FAISS, lexical_index: LexicalIndex) -> None:
+        if key in self._loaded:
+            self._loaded_bytes -= self._loaded[key][2]
+        size = estimate_index_bytes(vector_store)
+        self._loaded[key] = (vector_store, lexical_index, size)
+        self._loaded.move_to_end(key)
+        self._loaded_bytes += size
+        self._evict()
+        metrics.rag_loaded_indexes.set(len(self._loaded))
+        metrics.rag_loaded_index_bytes.set(self._loaded_bytes)
+
+    def _evict(self) -> None:
+        for key in list(self._loaded):
+            if len(self._loaded) <= self.max_loaded and self._loaded_bytes <= self.max_bytes:
+                return
+            # Keep the most recently used index, and indexes that could not be reloaded
+            if (
+                key == next(reversed(self._loaded))
+                or key in self._ingesting
+                or not self.index_store.contains(key)
+            ):
+                continue
+            size = self._loaded.pop(key)[2]
+            self._loaded_bytes -= size
+            metrics.rag_index_spills.inc()
+            logger.info(f"Dropped document index {key} from memory ({size} bytes)")
+
+    def _load(self, key: str, embeddings: Any) -> Optional[Tuple[FAISS, LexicalIndex]]:
+        """Load a saved index and its lexical index, building the latter if it was not saved"""
+        vector_store = self.index_store.load(key, embeddings)
+        if vector_store is None:
+            return None
+        return vector_store, self.index_store.load_lexical(key) or LexicalIndex.from_vector_store(
+            vector_store
+        )
+
+    async def get_indexes(
+        self, conversation_id: str, embeddings: Any
+    ) -> List[Tuple[DocumentEntry, FAISS, LexicalIndex]]:
+        """
+        Get the indexes of a conversation's documents, loading indexes that left memory.
+
+        Args:
+            conversation_id (str): Conversation to get the indexes of
+            embeddings: Embeddings model used to embed queries against loaded indexes
+
+        Returns:
+            List[Tuple[DocumentEntry, FAISS, LexicalIndex]]: Documents with their vector and lexical
+                index; documents whose index was deleted from the index store are skipped
+        """
+        indexes = []
+        for entry in list(self.get_documents(conversation_id)):
+            if entry.key in self._loaded:
+                self._loaded.move_to_end(entry.key)
+                indexes.append((entry, *self._loaded[entry.key][:2]))
+                continue
+            loaded = await asyncio.to_thread(self._load, entry.key, embeddings)
+            if loaded is None:
+                logger.warning(
+                    f"Index of {entry.filename} in conversation {conversation_id} "
+                    "is no longer available"
+                )
+                continue
+            self._put(entry.key, *loaded)
+            indexes.append((entry, *loaded))
+        return indexes
+
+    async def search(
+        self, conversation_id: str, query: str, embeddings: Any, k: int
+    ) -> List[Document]:
+        """
+        Find the chunks most relevant to a query across all documents of a conversation.
+
+        With hybrid search, the closest chunks by embedding and the best BM25 matches of every
+        document are fused with reciprocal rank fusion, so exact terms such as contract
+        addresses, tickers and numbers are found even when embeddings miss them.
+
+        Args:
+            conversation_id (str): Conversation whose documents are searched
+            query (str): Question to answer
+            embeddings: Embeddings model used to embed the query
+            k (int): Number of chunks to return
+
+        Returns:
+            List[Document]: Most relevant chunks first
+        """
+        indexes = await self.get_indexes(conversation_id, embeddings)
+        if not indexes:
+            return []
+        query_vector = await embeddings.aembed_query(query)
+        candidates = max(k, self.hybrid_candidates) if self.hybrid else k
+        results = await asyncio.gather(
+            *(
+                self._search_document(
+                    entry, vector_store, lexical_index, query, query_vector, candidates
+                )
+                for entry, vector_store, lexical_index in indexes
+            )
+        )
+
+        chunks: Dict[Tuple[str, str], Document] = {}
+        vector_results: List[Tuple[float, Tuple[str, str]]] = []
+        lexical_results: List[Tuple[float, Tuple[str, str]]] = []
+        for document_chunks, document_vector_results, document_lexical_results in results:
+            chunks.update(document_chunks)
+            vector_results.extend(document_vector_results)
+            lexical_results.extend(document_lexical_results)
+
+        vector_ranking = [
+            chunk for _, chunk in sorted(vector_results, key=lambda result: result[0])
+        ][:candidates]
+        if not self.hybrid:
+            return [chunks[chunk] for chunk in vector_ranking[:k]]
+        lexical_ranking = [
+            chunk for _, chunk in sorted(lexical_results, key=lambda result: -result[0])
+        ][:candidates]
+        fused = reciprocal_rank_fusion([vector_ranking, lexical_ranking], k=self.rrf_k)
+        return [chunks[chunk] for chunk, _ in fused[:k]]
+
+    async def _search_document(
+        self,
+        entry: DocumentEntry,
+        vector_store: FAISS,
+        lexical_index: LexicalIndex,
+        query: str,
+        query_vector: List[float],
+        candidates: int,
+    ) -> DocumentResults:
+        """Search one document, waiting only for updates of its own index"""
+        async with self.lock_for(entry.key):
+            return await asyncio.to_thread(
+                self._search_index,
+                entry,
+                vector_store,
+                lexical_index,
+                query,
+                query_vector,
+                candidates,
+            )
+
+    def _search_index(
+        self,
+        entry: DocumentEntry,
+        vector_store: FAISS,
+        lexical_index: LexicalIndex,
+        query: str,
+        query_vector: List[float],
+        candidates: int,
+    ) -> DocumentResults:
+        chunks: Dict[Tuple[str, str], Document] = {}
+        vector_results: List[Tuple[float, Tuple[str, str]]] = []
+        lexical_results: List[Tuple[float, Tuple[str, str]]] = []
+        for chunk_id, distance in vector_search(vector_store, query_vector, candidates):
+            vector_results.append((distance, (entry.key, chunk_id)))
+            chunks[(entry.key, chunk_id)] = vector_store.docstore.search(chunk_id)
+        if self.hybrid:
+            for chunk_id, score in lexical_index.search(query, candidates, LEXICAL_MIN_SCORE_RATIO):
+                lexical_results.append((score, (entry.key, chunk_id)))
+                chunks[(entry.key, chunk_id)] = vector_store.docstore.search(chunk_id)
+        return chunks, vector_results, lexical_results
+
+    def remove_conversation(self, conversation_id: str) -> None:
+        """Forget the documents of a conversation; their saved indexes stay in the index store"""
+        self._set_documents(conversation_id, [])
+
+
+# Create an instance shared by the document agents
+conversation_documents = ConversationDocuments(
+    rag_index_store,
+    max_loaded=Config.RAG_MAX_LOADED_INDEXES,
+    max_bytes=Config.RAG_MAX_LOADED_BYTES,
+    max_documents=Config.RAG_MAX_DOCUMENTS_PER_CONVERSATION,
+    max_manifests=Config.RAG_MAX_CACHED_MANIFESTS,
+    hybrid=Config.RAG_HYBRID_SEARCH_ENABLED,
+    hybrid_candidates=Config.RAG_HYBRID_CANDIDATES,
+    rrf_k=Config.RAG_RRF_K,
+)
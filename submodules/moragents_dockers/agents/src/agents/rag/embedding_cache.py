@@ -0,0 +1,260 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from src.config import Config
+from src.services import metrics
+from src.services.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of parameters of a statement
+_LOOKUP_BATCH_SIZE = 500
+
+
+def hash_text(text: str) -> str:
+    """Hash a chunk of text for use as an embedding cache key"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite store of chunk embeddings, keyed by embedding model and chunk text hash.
+
+    Text that repeats across documents, such as headers, disclaimers and legal boilerplate,
+    is embedded once per model. Once the cache holds more than max_entries vectors, the
+    oldest are deleted.
+
+    Attributes:
+        path (str): Database file path
+        max_entries (int): Maximum number of cached embeddings
+    """
+
+    def __init__(self, path: str, max_entries: int = 500000) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            );
+            CREATE INDEX IF NOT EXISTS embeddings_created_at ON embeddings (created_at);
+            """)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection to the database"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, model: str, text_hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            model (str): Embedding model name
+            text_hashes (Sequence[str]): Hashes of the chunk texts
+
+        Returns:
+            Dict[str, List[float]]: Embeddings of the cached chunks, by text hash
+        """
+        connection = self._connection()
+        found: Dict[str, List[float]] = {}
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        for start in range(0, len(unique_hashes), _LOOKUP_BATCH_SIZE):
+            batch = unique_hashes[start : start + _LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                "SELECT text_hash, vector FROM embeddings "
+                f"WHERE model = ? AND text_hash IN ({placeholders})",
+                (model, *batch),
+            )
+            for text_hash, vector in rows:
+                found[text_hash] = np.frombuffer(vector, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, embeddings: Dict[str, List[float]]) -> None:
+        """
+        Store embeddings, then delete the oldest beyond max_entries.
+
+        Args:
+            model (str): Embedding model name
+            embeddings (Dict[str, List[float]]): Embeddings by text hash
+        """
+        now = time.time()
+        rows = [
+            (model, text_hash, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text_hash, vector in embeddings.items()
+        ]
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            (count,) = connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            if count > self.max_entries:
+                connection.execute(
+                    "DELETE FROM embeddings WHERE rowid IN "
+                    "(SELECT rowid FROM embeddings ORDER BY created_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+
+@dataclass
+class IngestStats:
+    """
+    Embedding statistics of one document ingestion.
+
+    Attributes:
+        chunks (int): Number of chunks embedded
+        cache_hits (int): Chunks whose embedding came from the cache, including repeats within the
+            document
+        seconds (float): Time spent embedding, cache lookups included
+    """
+
+    chunks: int = 0
+    cache_hits: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        return self.cache_hits / self.chunks if self.chunks else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the statistics for reporting"""
+        return {
+            "chunks": self.chunks,
+            "cache_hits": self.cache_hits,
+            "seconds": round(self.seconds, 3),
+            "chunks_per_second": round(self.chunks_per_second, 1),
+            "cache_hit_ratio": round(self.cache_hit_ratio, 3),
+        }
+
+
+class CachedDocumentEmbedder:
+    """
+    Embeds document chunks through an embedding cache, in batches with bounded concurrency.
+
+    Only chunks missing from the cache are sent to the embeddings model, each distinct text
+    once, grouped into batches of batch_size of which at most concurrency run at a time.
+
+    Attributes:
+        embeddings: Embeddings model used for cache misses
+        model (str): Embedding model name, part of the cache key
+        cache (Optional[EmbeddingCache]): Embedding cache, None to embed every chunk
+        batch_size (int): Maximum number of chunks per embeddings call
+        concurrency (int): Maximum number of embeddings calls in flight
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        model: str,
+        cache: Optional[EmbeddingCache],
+        batch_size: int,
+        concurrency: int,
+    ) -> None:
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    async def embed(self, texts: List[str]) -> Tuple[List[List[float]], IngestStats]:
+        """
+        Embed document chunks.
+
+        Args:
+            texts (List[str]): Chunk texts
+
+        Returns:
+            Tuple[List[List[float]], IngestStats]: One embedding per chunk, in order, and the
+                ingestion statistics
+        """
+        started_at = time.perf_counter()
+        text_hashes = [hash_text(text) for text in texts]
+        cached = (
+            await asyncio.to_thread(self.cache.get_many, self.model, text_hashes)
+            if self.cache
+            else {}
+        )
+
+        # Embed each distinct missing text once
+        missing = {
+            text_hash: text
+            for text_hash, text in zip(text_hashes, texts)
+            if text_hash not in cached
+        }
+        computed = await self._embed_missing(missing)
+        if self.cache and computed:
+            await asyncio.to_thread(self.cache.put_many, self.model, computed)
+
+        vectors = [
+            cached[text_hash] if text_hash in cached else computed[text_hash]
+            for text_hash in text_hashes
+        ]
+        stats = IngestStats(
+            chunks=len(texts),
+            cache_hits=len(texts) - len(missing),
+            seconds=time.perf_counter() - started_at,
+        )
+        record_cache_lookup("rag_embedding", hit=True, count=stats.cache_hits)
+        record_cache_lookup("rag_embedding", hit=False, count=len(missing))
+        metrics.rag_ingest_chunks.inc(stats.chunks)
+        metrics.rag_ingest_duration.observe(stats.seconds)
+        logger.info(
+            f"Embedded {stats.chunks} chunks in {stats.seconds:.2f}s "
+            f"({stats.chunks_per_second:.1f} chunks/s, cache hit ratio {stats.cache_hit_ratio:.2f})"
+        )
+        return vectors, stats
+
+    async def _embed_missing(self, missing: Dict[str, str]) -> Dict[str, List[float]]:
+        """Embed texts by hash in batches, running at most `concurrency` batches at once"""
+        items = list(missing.items())
+        batches = [
+            items[start : start + self.batch_size]
+            for start in range(0, len(items), self.batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def embed_batch(batch):
+            async with semaphore:
+                return await self.embeddings.aembed_documents([text for _, text in batch])
+
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return {
+            text_hash: vector
+            for batch, vectors in zip(batches, results)
+            for (text_hash, _), vector in zip(batch, vectors)
+        }
+
+
+# Create an instance shared by the document agents, when a cache location is configured
+embedding_cache = (
+    EmbeddingCache(Config.RAG_EMBEDDING_CACHE_PATH, Config.RAG_EMBEDDING_CACHE_MAX_ENTRIES)
+    if Config.RAG_EMBEDDING_CACHE_PATH
+    else None
+)
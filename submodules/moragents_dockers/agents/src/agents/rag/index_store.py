@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from langchain_community.vectorstores import FAISS
+from src.agents.rag.lexical import LexicalIndex
+from src.config import Config
+from src.services import metrics
+from src.services.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# Written last when saving an index, so only complete indexes are ever loaded; its mtime is the
+# entry's last use
+METADATA_FILE = "index.json"
+LEXICAL_FILE = "lexical.json"
+TEMP_PREFIX = ".tmp-"
+
+
+def make_index_key(content: bytes, model: str, chunk_size: int, chunk_overlap: int) -> str:
+    """
+    Build the key of a document index.
+
+    Args:
+        content (bytes): Uploaded file content
+        model (str): Name of the embedding model
+        chunk_size (int): Maximum chunk length used to split the document
+        chunk_overlap (int): Overlap between consecutive chunks
+
+    Returns:
+        str: SHA-256 of the content, followed by a hash of the parameters the index depends on
+    """
+    parameters = json.dumps([model, chunk_size, chunk_overlap]).encode("utf-8")
+    return f"{hashlib.sha256(content).hexdigest()}-{hashlib.sha256(parameters).hexdigest()[:16]}"
+
+
+@dataclass
+class IndexEntry:
+    """
+    A saved document index.
+
+    Attributes:
+        key (str): Index key
+        size (int): Size on disk in bytes
+        last_used (float): Time the index was last saved or loaded
+    """
+
+    key: str
+    size: int
+    last_used: float
+
+
+class RagIndexStore:
+    """
+    On-disk cache of the FAISS indexes of uploaded documents.
+
+    Indexes are keyed by the document's content hash, the embedding model and the chunking
+    parameters, so uploading the same file again, or after a restart, loads the saved index
+    instead of parsing and embedding the document again. Indexes are written to a temporary
+    directory and renamed into place, so concurrent uploads and crashes never leave a partial
+    index behind. The least recently used indexes are deleted once the store holds more than
+    max_entries indexes or max_bytes bytes.
+
+    Attributes:
+        root (str): Directory holding one subdirectory per index
+        max_bytes (int): Maximum total size of the saved indexes
+        max_entries (int): Maximum number of saved indexes
+    """
+
+    def __init__(self, root: str, max_bytes: int, max_entries: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def contains(self, key: str) -> bool:
+        """Check whether an index is saved"""
+        return os.path.exists(os.path.join(self._path(key), METADATA_FILE))
+
+    def load(self, key: str, embeddings: Any) -> Optional[FAISS]:
+        """
+        Load a saved index.
+
+        Args:
+            key (str): Index key
+            embeddings: Embeddings model used to embed queries against the index
+
+        Returns:
+            Optional[FAISS]: The index, None if it is not saved or cannot be read
+        """
+        path = self._path(key)
+        if not self.contains(key):
+            record_cache_lookup("rag_index", hit=False)
+            return None
+
+        try:
+            # The pickled docstore was written by this store, never taken from an upload
+            vector_store = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable document index {key}: {str(e)}")
+            shutil.rmtree(path, ignore_errors=True)
+            record_cache_lookup("rag_index", hit=False)
+            return None
+
+        os.utime(os.path.join(path, METADATA_FILE))
+        record_cache_lookup("rag_index", hit=True)
+        logger.info(f"Loaded document index {key}")
+        return vector_store
+
+    def load_lexical(self, key: str) -> Optional[LexicalIndex]:
+        """Load the lexical index saved with an index, None for indexes saved without one"""
+        try:
+            with open(os.path.join(self._path(key), LEXICAL_FILE), encoding="utf-8") as file:
+                return LexicalIndex.from_dict(json.load(file))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def get_metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the metadata saved with an index, None if it is not saved"""
+        try:
+            with open(os.path.join(self._path(key), METADATA_FILE), encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def save(
+        self,
+        key: str,
+        vector_store: FAISS,
+        metadata: Dict[str, Any],
+        lexical_index: Optional[LexicalIndex] = None,
+    ) -> None:
+        """
+        Save an index, then evict the least recently used indexes beyond the limits.
+
+        Args:
+            key (str): Index key
+            vector_store (FAISS): Index to save
+            metadata (Dict[str, Any]): Description of the indexed document, e.g. file name and chunk
+                count
+            lexical_index (LexicalIndex, optional): Lexical index of the same chunks, saved
+                alongside
+        """
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = tempfile.mkdtemp(prefix=TEMP_PREFIX, dir=self.root)
+        try:
+            vector_store.save_local(temp_path)
+            if lexical_index is not None:
+                with open(os.path.join(temp_path, LEXICAL_FILE), "w", encoding="utf-8") as file:
+                    json.dump(lexical_index.to_dict(), file)
+            with open(os.path.join(temp_path, METADATA_FILE), "w", encoding="utf-8") as file:
+                json.dump({**metadata, "created_at": time.time()}, file)
+            os.rename(temp_path, self._path(key))
+            logger.info(f"Saved document index {key}")
+        except OSError:
+            # Another upload of the same document saved it first
+            if not self.contains(key):
+                raise
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+        self.evict(keep=key)
+
+    def entries(self) -> List[IndexEntry]:
+        """Get the saved indexes, least recently used first"""
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for key in os.listdir(self.root):
+            path = self._path(key)
+            if key.startswith(TEMP_PREFIX) or not self.contains(key):
+                continue
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+                last_used = os.path.getmtime(os.path.join(path, METADATA_FILE))
+            except OSError:
+                # Deleted concurrently
+                continue
+            entries.append(IndexEntry(key=key, size=size, last_used=last_used))
+        return sorted(entries, key=lambda entry: entry.last_used)
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Delete the least recently used indexes until the store is within its limits.
+
+        Args:
+            keep (str, optional): Index never to delete, e.g. the one just saved
+
+        Returns:
+            int: Number of deleted indexes
+        """
+        entries = self.entries()
+        total_bytes = sum(entry.size for entry in entries)
+        count = len(entries)
+        evicted = 0
+        for entry in entries:
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            if entry.key == keep:
+                continue
+            shutil.rmtree(self._path(entry.key), ignore_errors=True)
+            count -= 1
+            total_bytes -= entry.size
+            evicted += 1
+            metrics.rag_index_evictions.inc()
+            logger.info(f"Evicted document index {entry.key} ({entry.size} bytes)")
+        return evicted
+
+
+# Create an instance shared by the document agents
+rag_index_store = RagIndexStore(
+    root=Config.RAG_INDEX_DIR,
+    max_bytes=Config.RAG_INDEX_MAX_BYTES,
+    max_entries=Config.RAG_INDEX_MAX_ENTRIES,
+)
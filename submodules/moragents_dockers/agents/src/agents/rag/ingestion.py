@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from src.config import Config
+from src.services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class IngestionJob:
+    """
+    Progress of a document ingestion running in the background.
+
+    Attributes:
+        job_id (str): Unique identifier of the job
+        filename (str): Name of the uploaded file
+        conversation_id (str): Conversation the document was uploaded to
+        status (JobStatus): Current state of the job
+        pages_total (int): Number of pages of the document, known once the job starts
+        pages_done (int): Pages parsed, embedded and queryable
+        chunks_done (int): Chunks embedded
+        cache_hits (int): Chunks whose embedding came from the embedding cache
+        reused_index (bool): Whether a saved index of the same document was loaded instead
+        error (Optional[str]): Failure reason of a failed job
+        version (int): Incremented on every change, for clients waiting on updates
+    """
+
+    job_id: str
+    filename: str
+    conversation_id: str = "default"
+    status: JobStatus = JobStatus.QUEUED
+    pages_total: int = 0
+    pages_done: int = 0
+    chunks_done: int = 0
+    cache_hits: int = 0
+    reused_index: bool = False
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    version: int = 0
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def _notify(self) -> None:
+        self.version += 1
+        # Wake everyone waiting on the previous version; later waiters get a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def start(self, pages_total: int) -> None:
+        """Mark the job as running on a document of pages_total pages"""
+        self.status = JobStatus.RUNNING
+        self.pages_total = pages_total
+        self.started_at = time.time()
+        self._notify()
+
+    def advance(self, pages: int, chunks: int, cache_hits: int = 0) -> None:
+        """Record pages that were embedded and became queryable"""
+        self.pages_done += pages
+        self.chunks_done += chunks
+        self.cache_hits += cache_hits
+        self._notify()
+
+    def complete(self) -> None:
+        """Mark the job as completed"""
+        self.status = JobStatus.COMPLETED
+        self.pages_done = max(self.pages_done, self.pages_total)
+        self.finished_at = time.time()
+        self._notify()
+
+    def fail(self, error: str) -> None:
+        """Mark the job as failed"""
+        self.status = JobStatus.FAILED
+        self.error = error
+        self.finished_at = time.time()
+        self._notify()
+
+    async def wait_for_update(self, version: int, timeout: float) -> bool:
+        """
+        Wait until the job changes after the given version.
+
+        Args:
+            version (int): Version the caller has already seen
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: Whether the job changed
+        """
+        if self.version != version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def get_eta(self) -> Optional[float]:
+        """Estimate the seconds left from the page throughput so far, None until a page is done"""
+        if self.status != JobStatus.RUNNING or not self.pages_done or self.started_at is None:
+            return None
+        seconds_per_page = (time.time() - self.started_at) / self.pages_done
+        return max(0, self.pages_total - self.pages_done) * seconds_per_page
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the job for status responses"""
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        eta = self.get_eta()
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "conversation_id": self.conversation_id,
+            "status": self.status.value,
+            "pages_total": self.pages_total,
+            "pages_done": self.pages_done,
+            "chunks_done": self.chunks_done,
+            "progress": (
+                self.pages_done / self.pages_total if self.pages_total else float(self.finished)
+            ),
+            "elapsed_seconds": round(elapsed, 3),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "chunks_per_second": round(self.chunks_done / elapsed, 1) if elapsed else 0.0,
+            "cache_hit_ratio": (
+                round(self.cache_hits / self.chunks_done, 3) if self.chunks_done else 0.0
+            ),
+            "reused_index": self.reused_index,
+            "error": self.error,
+        }
+
+
+class IngestionJobManager:
+    """
+    Runs document ingestions as background tasks and keeps track of their progress.
+
+    At most max_concurrent_jobs ingestions run at once; others wait in the queued state.
+    Only the newest max_jobs jobs are remembered, evicting finished jobs first.
+
+    Attributes:
+        max_concurrent_jobs (int): Maximum number of ingestions running at once
+        max_jobs (int): Maximum number of jobs kept for status queries
+    """
+
+    def __init__(self, max_concurrent_jobs: int = 2, max_jobs: int = 100) -> None:
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        """Get a job by ID, None if it is unknown or was forgotten"""
+        return self._jobs.get(job_id)
+
+    def submit(
+        self, filename: str, conversation_id: str, run: Callable[[IngestionJob], Awaitable[None]]
+    ) -> IngestionJob:
+        """
+        Start an ingestion in the background.
+
+        Args:
+            filename (str): Name of the uploaded file
+            conversation_id (str): Conversation the document was uploaded to
+            run (Callable[[IngestionJob], Awaitable[None]]): Ingestion, reporting its progress on
+                the job; the job fails if it raises
+
+        Returns:
+            IngestionJob: The queued job
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_jobs)
+        job = IngestionJob(
+            job_id=uuid.uuid4().hex, filename=filename, conversation_id=conversation_id
+        )
+        self._jobs[job.job_id] = job
+        self._forget_old_jobs()
+
+        request_span = tracer.current_span()
+        # The job outlives the upload request, so it is traced on its own
+        task = tracer.detached_context().run(
+            asyncio.create_task,
+            self._run(job, run, request_span.trace_id if request_span else None),
+        )
+        # Keep a reference so the task is not garbage collected while running
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info(f"Queued ingestion job {job.job_id} for {filename}")
+        return job
+
+    async def _run(
+        self,
+        job: IngestionJob,
+        run: Callable[[IngestionJob], Awaitable[None]],
+        request_trace_id: Optional[str],
+    ) -> None:
+        async with self._semaphore:
+            try:
+                with tracer.trace(
+                    "rag.ingest",
+                    job_id=job.job_id,
+                    filename=job.filename,
+                    request_trace_id=request_trace_id,
+                ):
+                    await run(job)
+                if not job.finished:
+                    job.complete()
+                logger.info(f"Ingestion job {job.job_id} completed", extra={"job": job.to_dict()})
+            except Exception as e:
+                logger.error(f"Ingestion job {job.job_id} failed: {str(e)}", exc_info=True)
+                job.fail(str(e))
+
+    def _forget_old_jobs(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][
+            : max(0, excess)
+        ]:
+            del self._jobs[job_id]
+
+
+# Create an instance shared by the document agents
+ingestion_jobs = IngestionJobManager(
+    max_concurrent_jobs=Config.RAG_INGEST_MAX_CONCURRENT_JOBS, max_jobs=Config.RAG_INGEST_MAX_JOBS
+)
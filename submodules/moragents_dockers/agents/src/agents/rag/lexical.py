@@ -0,0 +1,152 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Sequence, Tuple
+
+from langchain_community.vectorstores import FAISS
+from src.stores.chat_search import STOPWORDS
+
+# Keeps contract addresses and numbers such as 1,000,000 or 2.5 whole, so they match exactly
+_TOKEN_PATTERN = re.compile(r"0x[0-9a-f]+|\d+(?:[.,]\d+)+|\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split document text into lowercase terms, dropping stopwords"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over the chunks of a document, built once at ingest time.
+
+    Dense embeddings blur exact terms such as contract addresses, ticker symbols and numbers;
+    this index matches them literally. Chunks are identified by their docstore ID in the
+    document's FAISS index, so results can be fused with vector search results.
+
+    Attributes:
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 document length normalization
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.lengths: List[int] = []
+        # term -> (chunk number, term frequency) of every chunk containing the term
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]) -> None:
+        """
+        Index chunks.
+
+        Args:
+            ids (Sequence[str]): Docstore IDs of the chunks
+            texts (Sequence[str]): Chunk texts
+        """
+        for chunk_id, text in zip(ids, texts):
+            number = len(self.ids)
+            terms = Counter(tokenize(text))
+            self.ids.append(chunk_id)
+            self.lengths.append(sum(terms.values()))
+            self._total_length += self.lengths[-1]
+            for term, frequency in terms.items():
+                self.postings[term].append((number, frequency))
+
+    def search(
+        self, query: str, limit: int, min_score_ratio: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the chunks best matching a query.
+
+        Args:
+            query (str): Search terms
+            limit (int): Maximum number of results
+            min_score_ratio (float): Drop chunks scoring less than this fraction of the best chunk,
+                e.g. chunks only sharing terms that occur in nearly every chunk
+
+        Returns:
+            List[Tuple[str, float]]: Docstore IDs and BM25 scores of the matching chunks, best first
+        """
+        if not self.ids:
+            return []
+        count = len(self.ids)
+        average_length = self._total_length / count
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for number, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[number] / average_length)
+                scores[number] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        if not best:
+            return []
+        threshold = best[0][1] * min_score_ratio
+        return [(self.ids[number], score) for number, score in best if score >= threshold]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the index to a JSON-serializable dictionary"""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "ids": self.ids,
+            "lengths": self.lengths,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LexicalIndex":
+        """Restore an index saved with to_dict"""
+        index = cls(k1=data["k1"], b=data["b"])
+        index.ids = data["ids"]
+        index.lengths = data["lengths"]
+        index.postings.update(
+            {
+                term: [tuple(posting) for posting in postings]
+                for term, postings in data["postings"].items()
+            }
+        )
+        index._total_length = sum(index.lengths)
+        return index
+
+    @classmethod
+    def from_vector_store(cls, vector_store: FAISS) -> "LexicalIndex":
+        """Build the index of a FAISS index's chunks, e.g. one saved before lexical indexes"""
+        index = cls()
+        chunk_ids = list(vector_store.index_to_docstore_id.values())
+        index.add(
+            chunk_ids,
+            [vector_store.docstore.search(chunk_id).page_content for chunk_id in chunk_ids],
+        )
+        return index
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Any]], k: int = 60
+) -> List[Tuple[Any, float]]:
+    """
+    Fuse ranked result lists with reciprocal rank fusion.
+
+    Each item scores the sum of 1 / (k + rank) over the lists it appears in, so items ranked
+    well by several retrievers rise to the top without comparing their raw scores.
+
+    Args:
+        rankings (Sequence[Sequence[Any]]): Result lists, best first
+        k (int): Damping constant; larger values flatten the contribution of top ranks
+
+    Returns:
+        List[Tuple[Any, float]]: Items with their fused score, best first
+    """
+    scores: Dict[Any, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] += 1 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
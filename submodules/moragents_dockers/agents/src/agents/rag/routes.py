@@ -1,16 +1,30 @@
 import logging
-from fastapi import APIRouter, File, UploadFile
-from fastapi.responses import JSONResponse
-from src.stores import chat_manager_instance, agent_manager_instance
+from dataclasses import asdict
+from typing import AsyncIterator
+
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from src.agents.rag.documents import conversation_documents
+from src.agents.rag.ingestion import ingestion_jobs
+from src.services.responses import FastJSONResponse, format_sse
+from src.stores import agent_manager_instance, chat_manager_instance
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/rag", tags=["rag"])
 
+# Seconds between keep-alive events of the job progress stream when the job makes no progress
+JOB_EVENTS_KEEPALIVE = 15.0
+
 
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    """Upload a file for RAG processing"""
+async def upload_file(file: UploadFile = File(...), conversation_id: str = Form("default")):
+    """
+    Upload a file for RAG processing.
+
+    The file is indexed in the background: the response carries the ID of the ingestion job,
+    whose progress is available from /rag/jobs/{job_id} and /rag/jobs/{job_id}/events.
+    """
     logger.info("Received upload request")
     try:
         rag_agent = agent_manager_instance.get_agent("rag")
@@ -20,12 +34,60 @@ async def upload_file(file: UploadFile = File(...)):
                 content={"status": "error", "message": "RAG agent not found"},
             )
 
-        response = await rag_agent.upload_file({"file": file})
-        chat_manager_instance.add_response(response.dict(), "rag")
-        return response
+        response = await rag_agent.upload_file({"file": file, "conversation_id": conversation_id})
+        chat_manager_instance.add_response(response.dict(), "rag", conversation_id)
+        return FastJSONResponse(
+            response.dict(), status_code=202 if "job_id" in response.metadata else 200
+        )
     except Exception as e:
         logger.error(f"Failed to upload file: {str(e)}")
         return JSONResponse(
             status_code=500,
             content={"status": "error", "message": f"Failed to upload file: {str(e)}"},
         )
+
+
+@router.get("/documents")
+async def get_documents(conversation_id: str = Query(default="default")):
+    """List the documents uploaded to a conversation, oldest first"""
+    documents = conversation_documents.get_documents(conversation_id)
+    return FastJSONResponse({"documents": [asdict(document) for document in documents]})
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the progress of an ingestion job: pages and chunks processed, throughput and ETA"""
+    job = ingestion_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job {job_id} not found")
+    return FastJSONResponse(job.to_dict())
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str) -> StreamingResponse:
+    """
+    Stream the progress of a document ingestion job as server-sent events.
+
+    Emits a `progress` event with the job status on every change, and at least every
+    JOB_EVENTS_KEEPALIVE seconds with a refreshed ETA, then a final `completed` or `failed`
+    event once the job finishes.
+    """
+    job = ingestion_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job {job_id} not found")
+
+    async def event_stream() -> AsyncIterator[str]:
+        version = job.version
+        yield format_sse("progress", job.to_dict())
+        while not job.finished:
+            await job.wait_for_update(version, JOB_EVENTS_KEEPALIVE)
+            version = job.version
+            if not job.finished:
+                yield format_sse("progress", job.to_dict())
+        yield format_sse(job.status.value, job.to_dict())
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,20 +1,22 @@
 import logging
-from typing import Dict, Any
+from typing import Any, Dict
 
 import requests
 from bs4 import BeautifulSoup
+from langchain.schema import HumanMessage, SystemMessage
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-
-from src.models.core import ChatRequest, AgentResponse
 from src.agents.agent_core.agent import AgentCore
-from langchain.schema import HumanMessage, SystemMessage
 from src.agents.realtime_search.config import Config
+from src.models.core import AgentResponse, ChatRequest
+from src.services.upstream import InstrumentedSession
 
 logger = logging.getLogger(__name__)
 
+http_session = InstrumentedSession()
+
 
 class RealtimeSearchAgent(AgentCore):
     """Agent for performing real-time web searches."""
@@ -38,7 +40,7 @@ class RealtimeSearchAgent(AgentCore):
                 HumanMessage(content=request.prompt.content),
             ]
 
-            result = self.tool_bound_llm.invoke(messages)
+            result = await self._invoke_llm(self.tool_bound_llm, messages)
             return await self._handle_llm_response(result)
 
         except Exception as e:
@@ -51,13 +53,15 @@ class RealtimeSearchAgent(AgentCore):
             if func_name == "perform_web_search":
                 search_term = args.get("search_term")
                 if not search_term:
-                    return AgentResponse.needs_info(content="Could you please provide a search term?")
+                    return AgentResponse.needs_info(
+                        content="Could you please provide a search term?"
+                    )
 
                 search_results = self._perform_search_with_web_scraping(search_term)
                 if "Error performing web search" in search_results:
                     return AgentResponse.error(error_message=search_results)
 
-                synthesized_answer = self._synthesize_answer(search_term, search_results)
+                synthesized_answer = await self._synthesize_answer(search_term, search_results)
                 return AgentResponse.success(content=synthesized_answer)
             else:
                 return AgentResponse.error(error_message=f"Unknown tool: {func_name}")
@@ -73,7 +77,7 @@ class RealtimeSearchAgent(AgentCore):
         try:
             url = Config.SEARCH_URL.format(search_term)
             headers = {"User-Agent": Config.USER_AGENT}
-            response = requests.get(url, headers=headers)
+            response = http_session.get(url, headers=headers)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.text, "html.parser")
@@ -81,7 +85,9 @@ class RealtimeSearchAgent(AgentCore):
 
             if not search_results:
                 return AgentResponse.needs_info(
-                    content="I couldn't find any results for that search. Could you try rephrasing it?"
+                    content=(
+                        "I couldn't find any results for that search. Could you try rephrasing it?"
+                    )
                 )
 
             formatted_results = []
@@ -131,7 +137,7 @@ class RealtimeSearchAgent(AgentCore):
         finally:
             driver.quit()
 
-    def _synthesize_answer(self, search_term: str, search_results: str) -> str:
+    async def _synthesize_answer(self, search_term: str, search_results: str) -> str:
         """Synthesize search results into a coherent answer."""
         logger.info("Synthesizing answer from search results")
         messages = [
@@ -146,10 +152,15 @@ class RealtimeSearchAgent(AgentCore):
         ]
 
         try:
-            result = self.llm.invoke(messages, max_tokens=Config.MAX_TOKENS, temperature=Config.TEMPERATURE)
+            result = await self._invoke_llm(
+                self.llm, messages, max_tokens=Config.MAX_TOKENS, temperature=Config.TEMPERATURE
+            )
             if not result.content.strip():
                 return AgentResponse.needs_info(
-                    content="I found some results but couldn't understand them well. Could you rephrase your question?"
+                    content=(
+                        "I found some results but couldn't understand them well. Could you "
+                        "rephrase your question?"
+                    )
                 )
             return result.content.strip()
         except Exception as e:
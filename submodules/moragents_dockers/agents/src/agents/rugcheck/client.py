@@ -1,6 +1,8 @@
-import aiohttp
 import logging
-from typing import Dict, Any, Optional
+from typing import Any, Dict, Optional
+
+import aiohttp
+from src.services.upstream import get_aiohttp_trace_config
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +17,7 @@ class RugcheckClient:
     async def _ensure_session(self):
         """Ensure aiohttp session exists."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            self._session = aiohttp.ClientSession(trace_configs=[get_aiohttp_trace_config()])
 
     async def close(self):
         """Close the aiohttp session."""
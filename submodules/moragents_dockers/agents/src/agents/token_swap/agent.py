@@ -1,18 +1,24 @@
 import logging
-import requests
+from dataclasses import dataclass
 from typing import Optional
 
 from fastapi import Request
 from langchain.schema import HumanMessage, SystemMessage
-from dataclasses import dataclass
-
-from src.agents.token_swap import tools
-from src.models.core import ChatRequest, AgentResponse
 from src.agents.agent_core.agent import AgentCore
+from src.agents.token_swap import tools
+from src.models.core import AgentResponse, ChatRequest
 from src.stores.key_manager import key_manager_instance
 
 logger = logging.getLogger(__name__)
 
+# Message reported for each transaction status
+TX_STATUS_MESSAGES = {
+    "cancelled": "The {tx_type} transaction has been cancelled.",
+    "success": "The {tx_type} transaction was successful.",
+    "failed": "The {tx_type} transaction has failed.",
+    "initiated": "Transaction has been sent, please wait for it to be confirmed.",
+}
+
 
 @dataclass
 class TokenSwapContext:
@@ -31,7 +37,8 @@ class TokenSwapAgent(AgentCore):
 
     def _api_request_url(self, method_name, query_params, chain_id):
         base_url = self.config.APIBASEURL + str(chain_id)
-        return f"{base_url}{method_name}?{'&'.join([f'{key}={value}' for key, value in query_params.items()])}"
+        query_string = "&".join([f"{key}={value}" for key, value in query_params.items()])
+        return f"{base_url}{method_name}?{query_string}"
 
     def _check_allowance(self, token_address, wallet_address, chain_id):
         url = self._api_request_url(
@@ -39,18 +46,22 @@ class TokenSwapAgent(AgentCore):
             {"tokenAddress": token_address, "walletAddress": wallet_address},
             chain_id,
         )
-        response = requests.get(url, headers=tools.get_headers())
+        response = tools.http_session.get(url, headers=tools.get_headers())
         return response.json()
 
     def _approve_transaction(self, token_address, chain_id, amount=None):
-        query_params = {"tokenAddress": token_address, "amount": amount} if amount else {"tokenAddress": token_address}
+        query_params = (
+            {"tokenAddress": token_address, "amount": amount}
+            if amount
+            else {"tokenAddress": token_address}
+        )
         url = self._api_request_url("/approve/transaction", query_params, chain_id)
-        response = requests.get(url, headers=tools.get_headers())
+        response = tools.http_session.get(url, headers=tools.get_headers())
         return response.json()
 
     def _build_tx_for_swap(self, swap_params, chain_id):
         url = self._api_request_url("/swap", swap_params, chain_id)
-        response = requests.get(url, headers=tools.get_headers())
+        response = tools.http_session.get(url, headers=tools.get_headers())
         if response.status_code != 200:
             logger.error(f"1inch API error: {response.text}")
             raise ValueError(f"1inch API error: {response.text}")
@@ -61,7 +72,10 @@ class TokenSwapAgent(AgentCore):
         try:
             if not key_manager_instance.has_oneinch_keys():
                 return AgentResponse.needs_info(
-                    content="To help you with token swaps, I need your 1inch API key. Please set it up in Settings first."
+                    content=(
+                        "To help you with token swaps, I need your 1inch API key. Please set it up "
+                        "in Settings first."
+                    )
                 )
 
             # Store request context
@@ -72,18 +86,21 @@ class TokenSwapAgent(AgentCore):
                 SystemMessage(
                     content=(
                         "You are a helpful assistant that processes token swap requests. "
-                        "When a user wants to swap tokens, analyze their request and provide a SINGLE tool call with complete information. "
-                        "Always return a single 'swap_agent' tool call with all three required parameters: "
+                        "When a user wants to swap tokens, analyze their request and provide a "
+                        "SINGLE tool call with complete information. "
+                        "Always return a single 'swap_agent' tool call with all three "
+                        "required parameters: "
                         "- token1: the source token "
                         "- token2: the destination token "
                         "- value: the amount to swap "
-                        "If any information is missing from the user's request, do not make a tool call. Instead, respond asking for the missing information."
+                        "If any information is missing from the user's request, do not make a tool "
+                        "call. Instead, respond asking for the missing information."
                     )
                 ),
                 HumanMessage(content=request.prompt.content),
             ]
 
-            result = self.tool_bound_llm.invoke(messages)
+            result = await self._invoke_llm(self.tool_bound_llm, messages)
             return await self._handle_llm_response(result)
 
         except Exception as e:
@@ -97,11 +114,16 @@ class TokenSwapAgent(AgentCore):
                 required_args = ["token1", "token2", "value"]
                 if not all(arg in args for arg in required_args):
                     return AgentResponse.needs_info(
-                        content="Please provide all required parameters: source token (token1), destination token (token2), and amount to swap (value)."
+                        content=(
+                            "Please provide all required parameters: source token (token1), "
+                            "destination token (token2), and amount to swap (value)."
+                        )
                     )
 
                 if not args["value"]:
-                    return AgentResponse.needs_info(content="Please specify the amount you want to swap.")
+                    return AgentResponse.needs_info(
+                        content="Please specify the amount you want to swap."
+                    )
 
                 try:
                     swap_result, _ = tools.swap_coins(
@@ -118,11 +140,18 @@ class TokenSwapAgent(AgentCore):
                         action_type="swap",
                         metadata=swap_result,
                     )
-                except (tools.InsufficientFundsError, tools.TokenNotFoundError, tools.SwapNotPossibleError) as e:
+                except (
+                    tools.InsufficientFundsError,
+                    tools.TokenNotFoundError,
+                    tools.SwapNotPossibleError,
+                ) as e:
                     return AgentResponse.needs_info(content=str(e))
                 except ValueError:
                     return AgentResponse.needs_info(
-                        content="Something went wrong. Please try again and make sure your Metamask is connected."
+                        content=(
+                            "Something went wrong. Please try again and make sure your Metamask is "
+                            "connected."
+                        )
                     )
             else:
                 return AgentResponse.needs_info(
@@ -133,7 +162,9 @@ class TokenSwapAgent(AgentCore):
             logger.error(f"Error executing tool {func_name}: {str(e)}", exc_info=True)
             return AgentResponse.error(error_message=str(e))
 
-    async def get_allowance(self, token_address: str, wallet_address: str, chain_id: str) -> AgentResponse:
+    async def get_allowance(
+        self, token_address: str, wallet_address: str, chain_id: str
+    ) -> AgentResponse:
         """Check token allowance for a wallet."""
         try:
             result = self._check_allowance(token_address, wallet_address, chain_id)
@@ -152,9 +183,15 @@ class TokenSwapAgent(AgentCore):
     async def swap(self, request_data: dict) -> AgentResponse:
         """Build swap transaction."""
         try:
-            if not all(k in request_data for k in ["src", "dst", "walletAddress", "amount", "slippage", "chain_id"]):
+            if not all(
+                k in request_data
+                for k in ["src", "dst", "walletAddress", "amount", "slippage", "chain_id"]
+            ):
                 return AgentResponse.needs_info(
-                    content="Please provide all required parameters: source token, destination token, wallet address, amount, slippage, and chain ID."
+                    content=(
+                        "Please provide all required parameters: source token, destination token, "
+                        "wallet address, amount, slippage, and chain ID."
+                    )
                 )
 
             swap_params = {
@@ -180,15 +217,7 @@ class TokenSwapAgent(AgentCore):
             tx_hash = request_data.get("tx_hash", "")
             tx_type = request_data.get("tx_type", "")
 
-            response = ""
-            if status == "cancelled":
-                response = f"The {tx_type} transaction has been cancelled."
-            elif status == "success":
-                response = f"The {tx_type} transaction was successful."
-            elif status == "failed":
-                response = f"The {tx_type} transaction has failed."
-            elif status == "initiated":
-                response = "Transaction has been sent, please wait for it to be confirmed."
+            response = TX_STATUS_MESSAGES.get(status, "").format(tx_type=tx_type)
 
             if tx_hash:
                 response = response + f" The transaction hash is {tx_hash}."
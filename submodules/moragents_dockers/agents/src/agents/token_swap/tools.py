@@ -1,13 +1,16 @@
 import logging
 import time
 
-import requests
 from src.agents.token_swap.config import Config
+from src.services.upstream import InstrumentedSession
 from src.stores import key_manager_instance
 from web3 import Web3
 
 logger = logging.getLogger(__name__)
 
+http_session = InstrumentedSession()
+rpc_session = InstrumentedSession("rpc")
+
 
 class InsufficientFundsError(Exception):
     pass
@@ -41,20 +44,24 @@ def search_tokens(
     endpoint = f"/v1.2/{chain_id}/search"
     params = {"query": str(query), "limit": str(limit), "ignore_listed": str(ignore_listed)}
 
-    response = requests.get(Config.INCH_URL + endpoint, params=params, headers=get_headers())
+    response = http_session.get(Config.INCH_URL + endpoint, params=params, headers=get_headers())
     logger.info(f"Search tokens response status: {response.status_code}")
     if response.status_code == 200:
         result = response.json()
         logger.info(f"Found tokens: {result}")
         return result
     else:
-        logger.error(f"Failed to search tokens. Status code: {response.status_code}, Response: {response.text}")
+        logger.error(
+            f"Failed to search tokens. Status code: {response.status_code}, Response: "
+            f"{response.text}"
+        )
         return None
 
 
 def get_token_balance(web3: Web3, wallet_address: str, token_address: str, abi: list) -> int:
     """Get the balance of an ERC-20 token for a given wallet address."""
-    if not token_address:  # If no token address is provided, assume checking ETH or native token balance
+    # If no token address is provided, assume checking ETH or native token balance
+    if not token_address:
         return web3.eth.get_balance(web3.to_checksum_address(wallet_address))
     else:
         contract = web3.eth.contract(address=web3.to_checksum_address(token_address), abi=abi)
@@ -105,25 +112,30 @@ def validate_swap(web3: Web3, token1, token2, chain_id, amount, wallet_address):
 
     # Check if the user has sufficient balance for the swap
     if t1_bal < smallest_amount:
-        raise InsufficientFundsError(f"Insufficient funds to perform the swap.")
+        raise InsufficientFundsError("Insufficient funds to perform the swap.")
 
     return t1[0]["address"], t1[0]["symbol"], t2[0]["address"], t2[0]["symbol"]
 
 
 def get_quote(token1, token2, amount_in_wei, chain_id):
-    logger.info(f"Getting quote - Token1: {token1}, Token2: {token2}, Amount: {amount_in_wei}, Chain ID: {chain_id}")
+    logger.info(
+        f"Getting quote - Token1: {token1}, Token2: {token2}, Amount: {amount_in_wei}, Chain ID: "
+        f"{chain_id}"
+    )
     endpoint = f"/v6.0/{chain_id}/quote"
     params = {"src": token1, "dst": token2, "amount": int(amount_in_wei)}
     logger.debug(f"Quote request - URL: {Config.QUOTE_URL + endpoint}, Params: {params}")
 
-    response = requests.get(Config.QUOTE_URL + endpoint, params=params, headers=get_headers())
+    response = http_session.get(Config.QUOTE_URL + endpoint, params=params, headers=get_headers())
     logger.info(f"Quote response status: {response.status_code}")
     if response.status_code == 200:
         result = response.json()
         logger.info(f"Quote received: {result}")
         return result
     else:
-        logger.error(f"Failed to get quote. Status code: {response.status_code}, Response: {response.text}")
+        logger.error(
+            f"Failed to get quote. Status code: {response.status_code}, Response: {response.text}"
+        )
         return None
 
 
@@ -131,7 +143,9 @@ def get_token_decimals(web3: Web3, token_address: str) -> int:
     if not token_address:
         return 18  # Assuming 18 decimals for the native gas token
     else:
-        contract = web3.eth.contract(address=Web3.to_checksum_address(token_address), abi=Config.ERC20_ABI)
+        contract = web3.eth.contract(
+            address=Web3.to_checksum_address(token_address), abi=Config.ERC20_ABI
+        )
         return contract.functions.decimals().call()
 
 
@@ -147,7 +161,7 @@ def convert_to_readable_unit(web3: Web3, smallest_unit_amount: int, token_addres
 
 def swap_coins(token1, token2, amount, chain_id, wallet_address):
     """Swap two crypto coins with each other"""
-    web3 = Web3(Web3.HTTPProvider(Config.WEB3RPCURL[str(chain_id)]))
+    web3 = Web3(Web3.HTTPProvider(Config.WEB3RPCURL[str(chain_id)], session=rpc_session))
     t1_a, t1_id, t2_a, t2_id = validate_swap(web3, token1, token2, chain_id, amount, wallet_address)
 
     time.sleep(2)
@@ -160,7 +174,9 @@ def swap_coins(token1, token2, amount, chain_id, wallet_address):
         t2_address = "" if t2_a == Config.INCH_NATIVE_TOKEN_ADDRESS else t2_a
         t2_quote = convert_to_readable_unit(web3, int(price), t2_address)
     else:
-        raise SwapNotPossibleError("Failed to generate a quote. Please ensure you're on the correct network.")
+        raise SwapNotPossibleError(
+            "Failed to generate a quote. Please ensure you're on the correct network."
+        )
 
     return {
         "dst": t2_id,
@@ -3,10 +3,9 @@ from typing import Optional
 
 import tweepy
 from langchain.schema import HumanMessage, SystemMessage
-
-from src.agents.tweet_sizzler.config import Config
-from src.models.core import ChatRequest, AgentResponse
 from src.agents.agent_core.agent import AgentCore
+from src.agents.tweet_sizzler.config import Config
+from src.models.core import AgentResponse, ChatRequest
 from src.stores import key_manager_instance
 
 logger = logging.getLogger(__name__)
@@ -22,11 +21,6 @@ class TweetSizzlerAgent(AgentCore):
     async def _process_request(self, request: ChatRequest) -> AgentResponse:
         """Process the validated chat request for tweet generation and posting."""
         try:
-            messages = [
-                SystemMessage(content=Config.TWEET_GENERATION_PROMPT),
-                HumanMessage(content=request.prompt.content),
-            ]
-
             # Extract action from prompt content
             action = "generate"  # Default action
             if isinstance(request.prompt.content, dict):
@@ -36,7 +30,7 @@ class TweetSizzlerAgent(AgentCore):
                 content = request.prompt.content
 
             if action == "generate":
-                tweet = self.generate_tweet(content)
+                tweet = await self.generate_tweet(content)
                 return AgentResponse.success(content=tweet)
             elif action == "post":
                 if not key_manager_instance.has_x_keys():
@@ -47,7 +41,8 @@ class TweetSizzlerAgent(AgentCore):
                     return AgentResponse.error(error_message=result["error"])
 
                 return AgentResponse.success(
-                    content=f"Tweet posted successfully: {result['tweet']}", metadata={"tweet_id": result["tweet_id"]}
+                    content=f"Tweet posted successfully: {result['tweet']}",
+                    metadata={"tweet_id": result["tweet_id"]},
                 )
             else:
                 return AgentResponse.error(error_message=Config.ERROR_INVALID_ACTION)
@@ -56,7 +51,7 @@ class TweetSizzlerAgent(AgentCore):
             self.logger.error(f"Error processing request: {str(e)}", exc_info=True)
             return AgentResponse.error(error_message=str(e))
 
-    def generate_tweet(self, prompt_content: Optional[str] = None) -> str:
+    async def generate_tweet(self, prompt_content: Optional[str] = None) -> str:
         """Generate tweet content based on prompt."""
         if not prompt_content:
             if not self.last_prompt_content:
@@ -66,11 +61,12 @@ class TweetSizzlerAgent(AgentCore):
         self.last_prompt_content = prompt_content
         self.logger.info(f"Generating tweet for prompt_content: {prompt_content}")
 
-        result = self.llm.invoke(
+        result = await self._invoke_llm(
+            self.llm,
             [
                 SystemMessage(content=Config.TWEET_GENERATION_PROMPT),
                 HumanMessage(content=f"Generate a tweet for: {prompt_content}"),
-            ]
+            ],
         )
 
         tweet = result.content.strip()
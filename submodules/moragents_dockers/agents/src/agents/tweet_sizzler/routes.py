@@ -1,9 +1,9 @@
 import logging
+
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from src.models.core import AgentResponse
-from src.stores import chat_manager_instance, agent_manager_instance, key_manager_instance
-
+from src.stores import agent_manager_instance, chat_manager_instance
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +22,7 @@ async def regenerate_tweet():
                 content={"status": "error", "message": "Tweet sizzler agent not found"},
             )
 
-        response = tweet_agent.generate_tweet()
+        response = await tweet_agent.generate_tweet()
         chat_manager_instance.add_message(response)
         return response
     except Exception as e:
@@ -56,7 +56,11 @@ async def post_tweet(request: Request):
         chat_manager_instance.add_response(agent_response.dict(), "tweet sizzler")
         return JSONResponse(
             status_code=200,
-            content={"status": "success", "tweet": tweet_response["tweet"], "tweet_id": tweet_response["tweet_id"]},
+            content={
+                "status": "success",
+                "tweet": tweet_response["tweet"],
+                "tweet_id": tweet_response["tweet_id"],
+            },
         )
     except Exception as e:
         logger.error(f"Failed to post tweet: {str(e)}")
@@ -1,24 +1,29 @@
+import asyncio
+import json
 import logging
 import os
 import time
-from typing import Tuple, Dict, Any
+import uuid
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Tuple
 
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from langchain_community.embeddings import OllamaEmbeddings
 from langchain_ollama import ChatOllama
-
+from src.agents.agent_core.streaming import stream_tokens_to
+from src.agents.base_agent.routes import router as base_router
+from src.agents.crypto_data.routes import router as crypto_router
+from src.agents.dca_agent.routes import router as dca_router
+from src.agents.mor_claims.routes import router as claim_router
+from src.agents.rag.routes import router as rag_router
+from src.agents.token_swap.routes import router as swap_router
+from src.agents.tweet_sizzler.routes import router as tweet_router
 from src.config import Config
 from src.delegator import Delegator
-from src.models.core import AgentResponse, ChatRequest
-from src.stores import (
-    agent_manager_instance,
-    chat_manager_instance,
-    workflow_manager_instance,
-)
-
-# Configure routes
+from src.models.core import AgentResponse, ChatBatchRequest, ChatRequest
 from src.routes import (
     agent_manager_routes,
     chat_manager_routes,
@@ -26,27 +31,25 @@ from src.routes import (
     wallet_manager_routes,
     workflow_manager_routes,
 )
-
-# Configure agent routes
-from src.agents.crypto_data.routes import router as crypto_router
-from src.agents.rag.routes import router as rag_router
-from src.agents.mor_claims.routes import router as claim_router
-from src.agents.tweet_sizzler.routes import router as tweet_router
-from src.agents.token_swap.routes import router as swap_router
-from src.agents.dca_agent.routes import router as dca_router
-from src.agents.base_agent.routes import router as base_router
+from src.routing.context import RoutingContext
+from src.services import metrics
+from src.services.admission import AdmissionRejected, admission_controller
+from src.services.log_pipeline import log_pipeline
+from src.services.responses import FastJSONResponse, StreamingAwareGZipMiddleware, dumps, format_sse
+from src.services.tracing import tracer
+from src.stores import (
+    agent_manager_instance,
+    chat_manager_instance,
+    workflow_manager_instance,
+)
+from starlette.background import BackgroundTask
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    filename="app.log",
-    filemode="a",
-)
+log_pipeline.start()
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -54,6 +57,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if Config.GZIP_ENABLED:
+    app.add_middleware(
+        StreamingAwareGZipMiddleware,
+        minimum_size=Config.GZIP_MINIMUM_SIZE,
+        excluded_paths=Config.GZIP_EXCLUDED_PATHS,
+    )
 
 # Setup constants and directories
 UPLOAD_FOLDER = os.path.join(os.getcwd(), "uploads")
@@ -89,15 +98,77 @@ for router in ROUTERS:
     app.include_router(router)
 
 
-async def get_active_agent_for_chat(prompt: Dict[str, Any]) -> str:
-    """Get the active agent for handling the chat request."""
-    active_agent = agent_manager_instance.get_active_agent()
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Record every request as the root span of a trace.
+
+    The trace id is returned in the X-Trace-Id header. Sending an X-Debug-Trace header also
+    returns the full span tree (delegator, agents, LLM calls, tools, upstream calls) as
+    compact JSON in the X-Trace-Tree header.
+    """
+    with tracer.trace(f"{request.method} {request.url.path}") as span:
+        response = await call_next(request)
+        if span is None:
+            return response
+        span.set_attribute("status_code", response.status_code)
+
+    response.headers["X-Trace-Id"] = span.trace_id
+    if "x-debug-trace" in request.headers:
+        response.headers["X-Trace-Tree"] = json.dumps(span.to_tree(), separators=(",", ":"))
+    return response
+
+
+# Route templates by endpoint, so metrics are labelled per route rather than per raw path
+_route_paths: Dict[Any, str] = {}
+
+
+def get_route_label(request: Request) -> str:
+    """Get the route template that served a request, or "unmatched" for unknown paths"""
+    if not _route_paths:
+        _route_paths.update(
+            {route.endpoint: route.path for route in app.routes if hasattr(route, "endpoint")}
+        )
+    return _route_paths.get(request.scope.get("endpoint"), "unmatched")
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Track in-flight requests and request latency per route and status code"""
+    started_at = time.perf_counter()
+    status_code = 500
+    with metrics.http_requests_in_flight.track_in_progress():
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            metrics.http_request_duration.observe(
+                time.perf_counter() - started_at,
+                method=request.method,
+                route=get_route_label(request),
+                status_code=status_code,
+            )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Expose application metrics in the Prometheus text format"""
+    return PlainTextResponse(
+        metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@tracer.traced("delegator.route")
+async def get_active_agent_for_chat(prompt: Dict[str, Any], routing_context: RoutingContext) -> str:
+    """Get the agent handling the chat request, the conversation's active agent if it has one."""
+    active_agent = agent_manager_instance.get_active_agent(routing_context.conversation_id)
     if active_agent:
         return active_agent
 
     logger.info("No active agent, getting delegator response")
     start_time = time.time()
-    result = delegator.get_delegator_response(prompt)
+    result = await delegator.get_delegator_response(prompt, routing_context)
     logger.info(f"Delegator response time: {time.time() - start_time:.2f} seconds")
     logger.info(f"Delegator response: {result}")
 
@@ -108,10 +179,130 @@ async def get_active_agent_for_chat(prompt: Dict[str, Any]) -> str:
     return result["agent"]
 
 
+@app.get("/delegator/routing-stats")
+async def get_routing_stats():
+    """Get embedding router hit rate and margin statistics for threshold tuning"""
+    return delegator.get_routing_stats()
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize workflow manager on startup"""
+    """Initialize workflow manager and start evicting idle conversations on startup"""
     await workflow_manager_instance.initialize()
+    chat_manager_instance.start_sweeper(Config.CHAT_SWEEP_INTERVAL)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks and flush chat history on shutdown"""
+    chat_manager_instance.close()
+    log_pipeline.stop()
+
+
+@tracer.traced("chat.process")
+async def process_chat(chat_request: ChatRequest) -> Tuple[str, AgentResponse]:
+    """
+    Route a chat request to the appropriate agent and record the exchange in chat history.
+
+    Args:
+        chat_request (ChatRequest): Incoming chat request
+
+    Returns:
+        Tuple[str, AgentResponse]: Name of the agent that responded and its response
+    """
+    tracer.set_attribute("conversation_id", chat_request.conversation_id)
+    started_at = time.perf_counter()
+
+    # Parse command if present
+    agent_name, message = agent_manager_instance.parse_command(chat_request.prompt.content)
+
+    # A command makes its agent the conversation's active agent for this request; other requests
+    # clear it unless an agent made itself sticky mid-flow
+    if agent_name:
+        agent_manager_instance.set_active_agent(agent_name, chat_request.conversation_id)
+        chat_request.prompt.content = message
+    else:
+        agent_manager_instance.clear_command_agent(chat_request.conversation_id)
+
+    # Add user message to chat history
+    await chat_manager_instance.load_conversation(chat_request.conversation_id)
+    prompt = chat_request.prompt.dict()
+    chat_request.prompt.sequence = chat_manager_instance.add_message(
+        prompt, chat_request.conversation_id
+    )
+    prompt["sequence"] = chat_request.prompt.sequence
+
+    # If command was parsed, use that agent directly
+    if agent_name:
+        logger.info(f"Using command agent flow: {agent_name}")
+        agent = agent_manager_instance.get_agent(agent_name)
+        if not agent:
+            logger.error(f"Agent {agent_name} not found")
+            raise HTTPException(status_code=404, detail=f"Agent {agent_name} not found")
+
+        agent_response = await agent.chat(chat_request)
+        current_agent = agent_name
+
+    # Otherwise use delegator to find appropriate agent
+    else:
+        logger.info("Using delegator flow")
+        routing_context = RoutingContext(conversation_id=chat_request.conversation_id)
+        if delegator.speculative_runner and not agent_manager_instance.get_active_agent(
+            chat_request.conversation_id
+        ):
+            current_agent, agent_response = await delegator.speculative_delegate_chat(
+                chat_request, routing_context
+            )
+        else:
+            active_agent = await get_active_agent_for_chat(prompt, routing_context)
+            current_agent, agent_response = await delegator.delegate_chat(
+                active_agent, chat_request, routing_context
+            )
+
+    # We only critically fail if we don't get an AgentResponse
+    if not isinstance(agent_response, AgentResponse):
+        logger.error(f"Agent {current_agent} returned invalid response type {type(agent_response)}")
+        raise HTTPException(status_code=500, detail="Agent returned invalid response type")
+
+    tracer.set_attribute("agent", current_agent)
+    metrics.chat_request_duration.observe(
+        time.perf_counter() - started_at,
+        agent=current_agent or "none",
+        response_type=agent_response.response_type.value,
+    )
+
+    # Add to chat history straight from the response; endpoints serialize it once for the client
+    chat_manager_instance.add_response(agent_response, current_agent, chat_request.conversation_id)
+
+    return current_agent, agent_response
+
+
+def bypasses_admission_queue(chat_request: ChatRequest) -> bool:
+    """Check whether a chat request may skip the admission queue"""
+    if not Config.ADMISSION_BYPASS_COMMANDS:
+        return False
+    agent_name, _ = agent_manager_instance.parse_command(chat_request.prompt.content)
+    return agent_name is not None
+
+
+def to_http_exception(error: Exception) -> HTTPException:
+    """Map an error raised while processing a chat request to the HTTP error returned to clients"""
+    if isinstance(error, HTTPException):
+        return error
+    if isinstance(error, AdmissionRejected):
+        return HTTPException(
+            status_code=error.status_code,
+            detail=str(error),
+            headers={"Retry-After": str(error.retry_after)},
+        )
+    if isinstance(error, TimeoutError):
+        logger.error("Chat request timed out")
+        return HTTPException(status_code=504, detail="Request timed out")
+    if isinstance(error, ValueError):
+        logger.error(f"Input formatting error: {str(error)}")
+        return HTTPException(status_code=400, detail=str(error))
+    logger.error(f"Error in chat route: {str(error)}", exc_info=error)
+    return HTTPException(status_code=500, detail=str(error))
 
 
 @app.post("/chat")
@@ -120,58 +311,158 @@ async def chat(chat_request: ChatRequest):
     logger.info(f"Received chat request for conversation {chat_request.conversation_id}")
 
     try:
-        # Parse command if present
-        agent_name, message = agent_manager_instance.parse_command(chat_request.prompt.content)
-
-        if agent_name:
-            agent_manager_instance.set_active_agent(agent_name)
-            chat_request.prompt.content = message
-        else:
-            agent_manager_instance.clear_active_agent()
-
-        # Add user message to chat history
-        chat_manager_instance.add_message(chat_request.prompt.dict(), chat_request.conversation_id)
-
-        # If command was parsed, use that agent directly
-        if agent_name:
-            logger.info(f"Using command agent flow: {agent_name}")
-            agent = agent_manager_instance.get_agent(agent_name)
-            if not agent:
-                logger.error(f"Agent {agent_name} not found")
-                raise HTTPException(status_code=404, detail=f"Agent {agent_name} not found")
-
-            agent_response = await agent.chat(chat_request)
-            current_agent = agent_name
-
-        # Otherwise use delegator to find appropriate agent
-        else:
-            logger.info("Using delegator flow")
-            delegator.reset_attempted_agents()
-            active_agent = await get_active_agent_for_chat(chat_request.prompt.dict())
-            current_agent, agent_response = await delegator.delegate_chat(active_agent, chat_request)
-
-        # We only critically fail if we don't get an AgentResponse
-        if not isinstance(agent_response, AgentResponse):
-            logger.error(f"Agent {current_agent} returned invalid response type {type(agent_response)}")
-            raise HTTPException(status_code=500, detail="Agent returned invalid response type")
-
-        # Convert to API response and add to chat history
-        chat_manager_instance.add_response(agent_response.dict(), current_agent, chat_request.conversation_id)
-
-        logger.info(f"Sending response: {agent_response.dict()}")
-        return agent_response.dict()
-
-    except HTTPException:
-        raise
-    except TimeoutError:
-        logger.error("Chat request timed out")
-        raise HTTPException(status_code=504, detail="Request timed out")
-    except ValueError as ve:
-        logger.error(f"Input formatting error: {str(ve)}")
-        raise HTTPException(status_code=400, detail=str(ve))
+        async with admission_controller.admit(bypass=bypasses_admission_queue(chat_request)):
+            _, agent_response = await process_chat(chat_request)
+        logger.info(
+            f"Sending {agent_response.response_type.value} response",
+            extra={"content": agent_response.content, "response_metadata": agent_response.metadata},
+        )
+        return FastJSONResponse(agent_response.dict())
     except Exception as e:
-        logger.error(f"Error in chat route: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        raise to_http_exception(e)
+
+
+@app.post("/chat/stream")
+async def chat_stream(chat_request: ChatRequest) -> StreamingResponse:
+    """
+    Handle chat requests as a server-sent event stream.
+
+    Emits a `token` event for every token generated by the responding agent's LLM, then a
+    single `response` event carrying the full AgentResponse (including metadata and
+    action_type) together with the agent name. The `response` event is authoritative:
+    agents may post-process the generated text or answer through tools. Failures are
+    reported as an `error` event with the HTTP status code the /chat endpoint would return.
+    """
+    logger.info(f"Received streaming chat request for conversation {chat_request.conversation_id}")
+    # Admit before the response starts, so rejections get a proper status code and Retry-After
+    try:
+        ticket = await admission_controller.acquire(bypass=bypasses_admission_queue(chat_request))
+    except AdmissionRejected as e:
+        raise to_http_exception(e)
+
+    tokens: asyncio.Queue = asyncio.Queue()
+    request_span = tracer.current_span()
+
+    async def run_chat() -> Tuple[str, AgentResponse]:
+        # The request span ends once the headers are sent, so the streamed body gets its own trace
+        with tracer.trace(
+            "chat.stream", request_trace_id=request_span.trace_id if request_span else None
+        ):
+            with stream_tokens_to(tokens.put_nowait):
+                return await process_chat(chat_request)
+
+    async def event_stream() -> AsyncIterator[str]:
+        task = asyncio.create_task(run_chat())
+        # Wake the consumer once the chat completes, after all of its tokens were queued
+        task.add_done_callback(lambda _: tokens.put_nowait(None))
+        try:
+            while (token := await tokens.get()) is not None:
+                yield format_sse("token", {"content": token})
+
+            try:
+                current_agent, agent_response = task.result()
+            except Exception as e:
+                http_error = to_http_exception(e)
+                yield format_sse(
+                    "error", {"status_code": http_error.status_code, "detail": http_error.detail}
+                )
+                return
+
+            logger.info(
+                f"Sending streamed {agent_response.response_type.value} response from "
+                f"{current_agent}",
+                extra={
+                    "content": agent_response.content,
+                    "response_metadata": agent_response.metadata,
+                },
+            )
+            yield format_sse("response", {**agent_response.dict(), "agentName": current_agent})
+        finally:
+            # Stop generating if the client disconnected mid-stream
+            if not task.done():
+                task.cancel()
+            ticket.release()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also release the slot if the stream is never consumed
+        background=BackgroundTask(ticket.release),
+    )
+
+
+@app.post("/chat/batch")
+async def chat_batch(batch_request: ChatBatchRequest) -> StreamingResponse:
+    """
+    Handle a batch of chat requests, streaming results as NDJSON in completion order.
+
+    Each line carries the index of the request in the batch and either the agent name and
+    response, or an error with the HTTP status code the /chat endpoint would return.
+
+    Requests run in scratch conversations that are deleted once the batch ends, so batches
+    never touch the `default` conversation or any existing history. Requests sharing a
+    conversation_id share a scratch conversation and run one after another in batch order;
+    other requests run concurrently, up to max_concurrency at a time. Batch items queue for
+    admission like other chat requests, but wait for a slot instead of being rejected.
+    """
+    if len(batch_request.requests) > Config.CHAT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"Batch exceeds {Config.CHAT_BATCH_MAX_SIZE} requests"
+        )
+
+    concurrency = min(
+        batch_request.max_concurrency or Config.CHAT_BATCH_DEFAULT_CONCURRENCY,
+        Config.CHAT_BATCH_MAX_CONCURRENCY,
+    )
+    batch_id = uuid.uuid4().hex[:8]
+    logger.info(
+        f"Received chat batch {batch_id} of {len(batch_request.requests)} requests (concurrency "
+        f"{concurrency})"
+    )
+
+    semaphore = asyncio.Semaphore(concurrency)
+    conversation_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def run_request(index: int, chat_request: ChatRequest) -> Dict[str, Any]:
+        scratch_id = f"batch-{batch_id}-{chat_request.conversation_id}"
+        result: Dict[str, Any] = {"index": index, "conversation_id": chat_request.conversation_id}
+        async with conversation_locks[scratch_id], semaphore:
+            with tracer.trace("chat.batch_item", batch_id=batch_id, index=index):
+                try:
+                    async with admission_controller.admit(
+                        bypass=bypasses_admission_queue(chat_request), rejectable=False
+                    ):
+                        current_agent, agent_response = await process_chat(
+                            chat_request.copy(update={"conversation_id": scratch_id}, deep=True)
+                        )
+                    result.update(agentName=current_agent, response=agent_response.dict())
+                except Exception as e:
+                    http_error = to_http_exception(e)
+                    result["error"] = {
+                        "status_code": http_error.status_code,
+                        "detail": http_error.detail,
+                    }
+        return result
+
+    async def result_stream() -> AsyncIterator[bytes]:
+        tasks = [
+            asyncio.create_task(run_request(index, request))
+            for index, request in enumerate(batch_request.requests)
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield dumps(await next_result) + b"\n"
+            logger.info(f"Completed chat batch {batch_id}")
+        finally:
+            # Stop outstanding requests if the client disconnected, then drop the scratch history
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for scratch_id in conversation_locks:
+                chat_manager_routes.remove_conversation(scratch_id)
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
 
 
 if __name__ == "__main__":
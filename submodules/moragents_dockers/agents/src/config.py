@@ -1,5 +1,6 @@
-import logging
 import datetime
+import logging
+import os
 
 # Logging configuration
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +14,147 @@ class Config:
     OLLAMA_EMBEDDING_MODEL = "nomic-embed-text"
     OLLAMA_URL = "http://host.docker.internal:11434"
 
+    # LLM concurrency: maximum in-flight calls per LLM backend, with per-base-URL overrides
+    LLM_MAX_CONCURRENCY = 4
+    LLM_BACKEND_CONCURRENCY = {}
+
+    # Embedding router: select agents by description similarity, using the LLM only for ambiguous prompts
+    EMBEDDING_ROUTER_ENABLED = True
+    EMBEDDING_ROUTER_MIN_SIMILARITY = 0.55
+    EMBEDDING_ROUTER_MIN_MARGIN = 0.08
+
+    # Follow-ups: prompts continuing the previous turn (short follow-ups, or prompts at least CONTINUATION_MIN_SIMILARITY
+    # similar to the previous prompt) go to the agent that answered it, if it answered within CONTINUATION_MAX_AGE seconds
+    CONTINUATION_ENABLED = True
+    CONTINUATION_MIN_SIMILARITY = 0.75
+    CONTINUATION_MAX_WORDS = 6
+    CONTINUATION_MAX_AGE = 10 * 60
+
+    # Speculative delegation: race the top ranked agents on ambiguous prompts, keeping the first success.
+    # Only read-only agents may be listed here; never add agents that sign transactions or post content.
+    SPECULATIVE_DELEGATION_ENABLED = False
+    SPECULATIVE_DELEGATION_TOP_K = 2
+    SPECULATIVE_DELEGATION_AGENTS = [
+        "default",
+        "crypto data",
+        "rag",
+        "mor rewards",
+        "realtime search",
+        "dexscreener",
+        "rugcheck",
+    ]
+
+    # Agents that activate themselves mid-flow in a conversation (e.g. MOR claims) handle the conversation's
+    # requests directly for ACTIVE_AGENT_TTL seconds, until a command or a clear of the chat history. Agents
+    # activated by a slash command only handle that command.
+    ACTIVE_AGENT_TTL = 10 * 60
+
+    # Admission control for chat requests: ADMISSION_MAX_IN_FLIGHT run at once, up to ADMISSION_MAX_QUEUE more
+    # wait at most ADMISSION_QUEUE_TIMEOUT seconds for a slot, and anything beyond is rejected with 429/503.
+    # Slash-command requests name their agent explicitly and may skip the queue.
+    ADMISSION_MAX_IN_FLIGHT = 8
+    ADMISSION_MAX_QUEUE = 32
+    ADMISSION_QUEUE_TIMEOUT = 30.0
+    ADMISSION_RETRY_AFTER = 5
+    ADMISSION_BYPASS_COMMANDS = True
+
+    # Chat history limits: least recently used conversations beyond CHAT_MAX_CONVERSATIONS and conversations idle
+    # for CHAT_IDLE_TTL seconds are evicted (checked every CHAT_SWEEP_INTERVAL seconds); the oldest messages of a
+    # conversation beyond CHAT_MAX_MESSAGES are dropped from memory, but stay in the chat database when enabled.
+    # The default conversation is never evicted.
+    CHAT_MAX_CONVERSATIONS = 1000
+    CHAT_MAX_MESSAGES = 500
+    CHAT_IDLE_TTL = 24 * 60 * 60
+    CHAT_SWEEP_INTERVAL = 5 * 60
+
+    # Chat persistence: SQLite database backing the in-memory chat history, written in batches every
+    # CHAT_DB_FLUSH_INTERVAL seconds. Enabled when the agents_data volume is mounted (see docker-compose.yml).
+    CHAT_DB_PATH = "/var/lib/agents/chat_history.db" if os.path.isdir("/var/lib/agents") else None
+    CHAT_DB_FLUSH_INTERVAL = 0.5
+    CHAT_DB_BATCH_SIZE = 200
+
+    # Document indexes: uploaded documents are split into RAG_CHUNK_SIZE character chunks and their FAISS index is
+    # saved under RAG_INDEX_DIR, keyed by the file's SHA-256, the embedding model and the chunking parameters, so that
+    # identical re-uploads and restarts skip embedding. Beyond RAG_INDEX_MAX_ENTRIES indexes or RAG_INDEX_MAX_BYTES
+    # on disk, the least recently used indexes are deleted.
+    RAG_INDEX_DIR = (
+        "/var/lib/agents/rag_indexes" if os.path.isdir("/var/lib/agents") else os.path.join(os.getcwd(), "rag_indexes")
+    )
+    RAG_INDEX_MAX_BYTES = 1024 * 1024 * 1024
+    RAG_INDEX_MAX_ENTRIES = 200
+    RAG_CHUNK_SIZE = 1024
+    RAG_CHUNK_OVERLAP = 20
+    RAG_RETRIEVER_K = 7
+
+    # Conversation documents: each conversation has up to RAG_MAX_DOCUMENTS_PER_CONVERSATION documents, searched
+    # together. At most RAG_MAX_LOADED_INDEXES indexes and RAG_MAX_LOADED_BYTES of them stay in memory; the least
+    # recently used are reloaded from RAG_INDEX_DIR when needed again. The document lists of the
+    # RAG_MAX_CACHED_MANIFESTS most recently used conversations are cached in memory.
+    RAG_MAX_DOCUMENTS_PER_CONVERSATION = 10
+    RAG_MAX_CACHED_MANIFESTS = 1000
+    RAG_MAX_LOADED_INDEXES = 50
+    RAG_MAX_LOADED_BYTES = 512 * 1024 * 1024
+
+    # Hybrid document search: the RAG_HYBRID_CANDIDATES best chunks by embedding and by BM25 (from a lexical index
+    # built at ingest time) are fused with reciprocal rank fusion, whose damping constant is RAG_RRF_K. Exact terms
+    # such as contract addresses, tickers and numbers are then found even when embeddings miss them.
+    RAG_HYBRID_SEARCH_ENABLED = True
+    RAG_HYBRID_CANDIDATES = 20
+    RAG_RRF_K = 60
+
+    # Document embeddings: chunk embeddings are cached in an SQLite database by embedding model and chunk text hash
+    # (enabled when the agents_data volume is mounted), keeping the newest RAG_EMBEDDING_CACHE_MAX_ENTRIES. Chunks
+    # missing from the cache are embedded in batches of RAG_EMBEDDING_BATCH_SIZE, RAG_EMBEDDING_CONCURRENCY at a time.
+    RAG_EMBEDDING_CACHE_PATH = "/var/lib/agents/embedding_cache.db" if os.path.isdir("/var/lib/agents") else None
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES = 500000
+    RAG_EMBEDDING_BATCH_SIZE = 32
+    RAG_EMBEDDING_CONCURRENCY = 2
+
+    # Document ingestion: uploads are indexed in the background, RAG_INGEST_PAGE_BATCH pages at a time, with at most
+    # RAG_INGEST_MAX_CONCURRENT_JOBS ingestions running at once. The progress of the newest RAG_INGEST_MAX_JOBS jobs
+    # can be queried.
+    RAG_INGEST_PAGE_BATCH = 8
+    RAG_INGEST_MAX_CONCURRENT_JOBS = 2
+    RAG_INGEST_MAX_JOBS = 100
+
+    # Batch chat: maximum prompts per /chat/batch request and how many of them run concurrently.
+    # LLM calls made by batch items still share the per-backend LLM concurrency limit.
+    CHAT_BATCH_MAX_SIZE = 1000
+    CHAT_BATCH_DEFAULT_CONCURRENCY = 4
+    CHAT_BATCH_MAX_CONCURRENCY = 16
+
+    # Logging: records are queued and written by a background thread to the console and, as JSON lines, to
+    # LOG_FILE (rotated at LOG_MAX_BYTES). Strings longer than LOG_MAX_FIELD_CHARS are truncated and hashed,
+    # records are dropped rather than blocking when LOG_QUEUE_SIZE records are waiting, and only the given
+    # fraction of the records below WARNING of the loggers in LOG_SAMPLE_RATES is kept.
+    LOG_LEVEL = "INFO"
+    LOG_FILE = "app.log"
+    LOG_MAX_BYTES = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT = 5
+    LOG_QUEUE_SIZE = 10000
+    LOG_MAX_FIELD_CHARS = 2000
+    LOG_SAMPLE_RATES = {
+        "src.stores.chat_manager": 0.1,
+        "src.routing": 0.5,
+    }
+
+    # Response compression: gzip responses of at least GZIP_MINIMUM_SIZE bytes for clients that accept it.
+    # Streaming endpoints are never compressed, so proxies and clients do not buffer their events.
+    GZIP_ENABLED = True
+    GZIP_MINIMUM_SIZE = 1024
+    GZIP_EXCLUDED_PATHS = ["/chat/stream", "/chat/batch", "/rag/jobs/*/events"]
+
+    # Tracing: record request spans in-process, optionally appending them as JSON lines to a local file
+    TRACING_ENABLED = True
+    TRACE_EXPORT_PATH = None  # e.g. "traces.jsonl"
+    UPSTREAM_NAMES = {
+        "api.coingecko.com": "coingecko",
+        "api.llama.fi": "defillama",
+        "api.dexscreener.com": "dexscreener",
+        "api.rugcheck.xyz": "rugcheck",
+        "api.1inch.dev": "1inch",
+    }
+
     MAX_UPLOAD_LENGTH = 16 * 1024 * 1024
     AGENTS_CONFIG = {
         "agents": [
@@ -24,6 +166,8 @@ class Config:
                 "human_readable_name": "Default General Purpose",
                 "command": "morpheus",
                 "upload_required": False,
+                "context_token_budget": 2048,
+                "context_summary": True,
             },
             {
                 "path": "src.agents.imagen.agent",
@@ -51,6 +195,7 @@ class Config:
                 "human_readable_name": "Crypto Data Fetcher",
                 "command": "crypto",
                 "upload_required": False,
+                "context_token_budget": 512,
             },
             # TODO: Pending fix to swap agent. The swap agent's preview is often correct however the metamask preview is wrong.
             # {
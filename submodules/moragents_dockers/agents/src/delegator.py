@@ -1,9 +1,20 @@
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 
-from langchain.schema import HumanMessage, SystemMessage
-from src.stores import chat_manager_instance, agent_manager_instance
-from src.models.core import ChatRequest, AgentResponse
+from langchain.schema import HumanMessage
+from src.agents.agent_core.concurrency import llm_limiter
+from src.agents.rag.documents import conversation_documents
+from src.config import Config
+from src.models.core import AgentResponse, ChatRequest
+from src.routing.context import RoutingContext
+from src.routing.continuation import ContinuationDecision, ContinuationDetector
+from src.routing.embedding_router import EmbeddingRouter, RoutingDecision
+from src.routing.prompt_cache import RoutingPromptCache
+from src.routing.speculation import SpeculativeRunner
+from src.services.metrics import record_llm_call, routing_duration
+from src.services.tracing import tracer
+from src.stores import agent_manager_instance
 
 logger = logging.getLogger(__name__)
 
@@ -11,73 +22,132 @@ logger = logging.getLogger(__name__)
 class Delegator:
     def __init__(self, llm, embeddings):
         self.llm = llm  # Keep llm instance on delegator
-        self.attempted_agents = set()  # Track attempted agents within a chat session
+        self.routing_prompt_cache = RoutingPromptCache(llm)
+        self.embedding_router = (
+            EmbeddingRouter(
+                embeddings,
+                min_similarity=Config.EMBEDDING_ROUTER_MIN_SIMILARITY,
+                min_margin=Config.EMBEDDING_ROUTER_MIN_MARGIN,
+            )
+            if Config.EMBEDDING_ROUTER_ENABLED
+            else None
+        )
+        self.continuation_detector = (
+            ContinuationDetector(
+                embeddings,
+                min_similarity=Config.CONTINUATION_MIN_SIMILARITY,
+                max_words=Config.CONTINUATION_MAX_WORDS,
+                max_age=Config.CONTINUATION_MAX_AGE,
+            )
+            if Config.CONTINUATION_ENABLED
+            else None
+        )
+        self.speculative_runner = (
+            SpeculativeRunner(
+                Config.SPECULATIVE_DELEGATION_TOP_K, Config.SPECULATIVE_DELEGATION_AGENTS
+            )
+            if Config.SPECULATIVE_DELEGATION_ENABLED and self.embedding_router
+            else None
+        )
 
         # Load all agents via agent manager
         agent_manager_instance.load_all_agents(llm, embeddings)
+        agent_manager_instance.add_selection_listener(
+            lambda _: self.routing_prompt_cache.invalidate()
+        )
         logger.info(f"Delegator initialized with {len(agent_manager_instance.agents)} agents")
         logger.info(f"Active agents: {agent_manager_instance.get_selected_agents()}")
 
-    def reset_attempted_agents(self):
-        """Reset the set of attempted agents"""
-        self.attempted_agents = set()
-        logger.info("Reset attempted agents")
-
-    def get_available_unattempted_agents(self) -> List[Dict]:
-        """Get available agents that haven't been attempted yet"""
+    def get_available_unattempted_agents(self, routing_context: RoutingContext) -> List[Dict]:
+        """Get available agents that haven't been attempted yet for the current request"""
         return [
             agent_config
             for agent_config in agent_manager_instance.get_available_agents()
             if agent_config["name"] in agent_manager_instance.get_selected_agents()
-            and agent_config["name"] not in self.attempted_agents
-            and not (agent_config["upload_required"] and not chat_manager_instance.get_uploaded_file_status())
+            and agent_config["name"] not in routing_context.attempted_agents
+            and not (
+                agent_config["upload_required"]
+                and not conversation_documents.get_documents(routing_context.conversation_id)
+            )
         ]
 
-    def get_delegator_response(self, prompt: Dict) -> Dict[str, str]:
-        """Get appropriate agent based on prompt, excluding previously attempted agents"""
-        available_agents = self.get_available_unattempted_agents()
-        logger.info(f"Available, unattempted agents: {available_agents}")
+    async def _check_continuation(
+        self,
+        prompt: str,
+        sequence: Optional[int],
+        routing_context: RoutingContext,
+        available_agents: List[Dict],
+    ) -> Optional[ContinuationDecision]:
+        """Check whether a request continues the previous exchange; cascade retries always route"""
+        if not self.continuation_detector or routing_context.attempted_agents:
+            return None
+        return await self.continuation_detector.check(
+            routing_context.conversation_id,
+            prompt,
+            sequence,
+            [agent["name"] for agent in available_agents],
+        )
+
+    @tracer.traced("delegator.select_agent")
+    async def get_delegator_response(
+        self,
+        prompt: Dict,
+        routing_context: RoutingContext,
+        routing_decision: Optional[RoutingDecision] = None,
+    ) -> Dict[str, str]:
+        """
+        Get appropriate agent based on prompt, excluding agents already attempted for this request.
+
+        Follow-ups to the previous turn go to the agent that answered it without routing. A routing
+        decision already computed by the caller for the same candidates can be passed in to avoid
+        embedding the prompt twice.
+        """
+        started_at = time.perf_counter()
+        available_agents = self.get_available_unattempted_agents(routing_context)
+        logger.info(
+            f"Available, unattempted agents: {[agent['name'] for agent in available_agents]}"
+        )
 
         if not available_agents:
             # If no specialized agents are available, use default agent as last resort
-            if "default" not in self.attempted_agents:
+            if "default" not in routing_context.attempted_agents:
+                self._record_routing("fallback", started_at)
                 return {"agent": "default"}
             raise ValueError("No remaining agents available for current state")
 
-        system_prompt = (
-            "Your name is Morpheus. "
-            "Your primary function is to select the correct agent from the list of available agents based on the user's input. "
-            "You MUST use the 'select_agent' function to select an agent. "
-            "Available agents and their descriptions in the format `{agent_name}: {agent_description}`"
-            "You must use one of the available agent names.\n"
-            + "\n".join(f"- {agent['name']}: {agent['description']}" for agent in available_agents)
-        )
+        continuation = None
+        if routing_decision is None:
+            continuation = await self._check_continuation(
+                prompt["content"], prompt.get("sequence"), routing_context, available_agents
+            )
+            if continuation and continuation.continued:
+                self._record_routing("continuation", started_at)
+                return {"agent": continuation.agent}
 
-        tools = [
-            {
-                "name": "select_agent",
-                "description": "Choose which agent should be used to respond to the user query",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "agent": {
-                            "type": "string",
-                            "enum": [agent["name"] for agent in available_agents],
-                            "description": "The name of the agent to be used",
-                        }
-                    },
-                    "required": ["agent"],
-                },
-            }
-        ]
+        # Try the embedding router first and only ask the LLM when the match is ambiguous
+        if self.embedding_router and routing_decision is None:
+            prompt_vector = continuation.prompt_vector if continuation else None
+            routing_decision = await self.embedding_router.route(
+                prompt["content"], available_agents, prompt_vector
+            )
+        if routing_decision and routing_decision.confident:
+            logger.info(f"Embedding router selected agent: {routing_decision.agent}")
+            self._record_routing("embedding", started_at)
+            return {"agent": routing_decision.agent}
 
-        agent_selection_llm = self.llm.bind_tools(tools, tool_choice="select_agent")
+        routing_prompt = self.routing_prompt_cache.get(available_agents)
+        agent_selection_llm = routing_prompt.agent_selection_llm
         messages = [
-            SystemMessage(content=system_prompt),
+            routing_prompt.system_message,
             HumanMessage(content=prompt["content"]),
         ]
 
-        result = agent_selection_llm.invoke(messages)
+        model = getattr(self.llm, "model", None)
+        with tracer.span("llm.invoke", model=model, streamed=False):
+            async with llm_limiter.acquire(agent_selection_llm):
+                llm_started_at = time.perf_counter()
+                result = await agent_selection_llm.ainvoke(messages)
+                record_llm_call(model, time.perf_counter() - llm_started_at, result)
         tool_calls = result.tool_calls
 
         if not tool_calls:
@@ -87,27 +157,116 @@ class Delegator:
         logger.info(f"Selected agent: {selected_agent}")
         selected_agent_name = selected_agent.get("args", {}).get("agent")
 
-        # Track this agent as attempted
-        self.attempted_agents.add(selected_agent_name)
-        logger.info(f"Added {selected_agent_name} to attempted agents. Current attempts: {self.attempted_agents}")
+        if routing_decision and routing_decision.agent:
+            self.embedding_router.stats.record_fallback_result(
+                routing_decision, selected_agent_name
+            )
 
+        self._record_routing("llm", started_at)
         return {"agent": selected_agent_name}
 
-    async def delegate_chat(self, agent_name: str, chat_request: ChatRequest) -> Tuple[Optional[str], AgentResponse]:
+    @staticmethod
+    def _record_routing(method: str, started_at: float) -> None:
+        """Record how an agent was selected and how long the selection took"""
+        tracer.set_attribute("method", method)
+        routing_duration.observe(time.perf_counter() - started_at, method=method)
+
+    def get_routing_stats(self) -> Dict:
+        """Get embedding router, follow-up and speculative delegation statistics"""
+        stats = {"enabled": False}
+        if self.embedding_router:
+            stats = {"enabled": True, **self.embedding_router.stats.to_dict()}
+        if self.continuation_detector:
+            stats["continuation"] = self.continuation_detector.stats.to_dict()
+        if self.speculative_runner:
+            stats["speculation"] = self.speculative_runner.stats.to_dict()
+        return stats
+
+    @tracer.traced("delegator.speculative_delegate")
+    async def speculative_delegate_chat(
+        self, chat_request: ChatRequest, routing_context: RoutingContext
+    ) -> Tuple[Optional[str], AgentResponse]:
+        """
+        Delegate chat by racing the top ranked candidate agents, keeping the first success.
+
+        Follow-ups to the previous turn go to the agent that answered it. Other prompts are
+        ranked once by the embedding router. Confident decisions and rankings
+        led by agents outside the speculation allowlist are delegated normally. If every raced
+        agent fails, the regular cascade continues with the remaining agents.
+        """
+        available_agents = self.get_available_unattempted_agents(routing_context)
+        continuation = await self._check_continuation(
+            chat_request.prompt.content,
+            chat_request.prompt.sequence,
+            routing_context,
+            available_agents,
+        )
+        if continuation and continuation.continued:
+            return await self.delegate_chat(continuation.agent, chat_request, routing_context)
+
+        prompt_vector = continuation.prompt_vector if continuation else None
+        decision = await self.embedding_router.route(
+            chat_request.prompt.content, available_agents, prompt_vector
+        )
+        candidates = (
+            []
+            if decision.confident
+            else self.speculative_runner.select_candidates(decision.ranking)
+        )
+        candidates = [name for name in candidates if agent_manager_instance.get_agent(name)]
+
+        if len(candidates) < 2:
+            if decision.confident:
+                return await self.delegate_chat(decision.agent, chat_request, routing_context)
+            result = await self.get_delegator_response(
+                chat_request.prompt.dict(), routing_context, decision
+            )
+            return await self.delegate_chat(result["agent"], chat_request, routing_context)
+
+        logger.info(f"Speculatively delegating to agents: {candidates}")
+        routing_context.attempted_agents.update(candidates)
+        agent_calls = {
+            name: (
+                lambda agent=agent_manager_instance.get_agent(name): agent.chat(
+                    chat_request.copy(deep=True)
+                )
+            )
+            for name in candidates
+        }
+        winner, response = await self.speculative_runner.race(agent_calls)
+        if winner:
+            return winner, response
+
+        next_agent, next_response = await self._try_next_agent(chat_request, routing_context)
+        if next_agent is None and response is not None:
+            # Report the raced agents' failure rather than the exhausted cascade
+            return None, response
+        return next_agent, next_response
+
+    @tracer.traced("delegator.delegate")
+    async def delegate_chat(
+        self,
+        agent_name: str,
+        chat_request: ChatRequest,
+        routing_context: Optional[RoutingContext] = None,
+    ) -> Tuple[Optional[str], AgentResponse]:
         """Delegate chat to specific agent with cascading fallback"""
         logger.info(f"Attempting to delegate chat to agent: {agent_name}")
+        tracer.set_attribute("agent", agent_name)
+        if routing_context is None:
+            routing_context = RoutingContext(conversation_id=chat_request.conversation_id)
 
         # Add agent to attempted set before trying to use it
-        self.attempted_agents.add(agent_name)
+        routing_context.attempted_agents.add(agent_name)
 
         if agent_name not in agent_manager_instance.get_selected_agents():
             logger.warning(f"Attempted to delegate to unselected agent: {agent_name}")
-            return await self._try_next_agent(chat_request)
+            return await self._try_next_agent(chat_request, routing_context)
 
         agent = agent_manager_instance.get_agent(agent_name)
         if not agent:
             logger.error(f"Agent {agent_name} is selected but not loaded")
-            return await self._try_next_agent(chat_request)
+            return await self._try_next_agent(chat_request, routing_context)
 
         try:
             result = await agent.chat(chat_request)
@@ -115,13 +274,15 @@ class Delegator:
             return agent_name, result
         except Exception as e:
             logger.error(f"Error during chat delegation to {agent_name}: {str(e)}")
-            return await self._try_next_agent(chat_request)
+            return await self._try_next_agent(chat_request, routing_context)
 
-    async def _try_next_agent(self, chat_request: ChatRequest) -> Tuple[Optional[str], AgentResponse]:
+    async def _try_next_agent(
+        self, chat_request: ChatRequest, routing_context: RoutingContext
+    ) -> Tuple[Optional[str], AgentResponse]:
         """Try to get a response from the next best available agent"""
         try:
             # Get next best agent
-            result = self.get_delegator_response(chat_request.prompt.dict())
+            result = await self.get_delegator_response(chat_request.prompt.dict(), routing_context)
 
             if "agent" not in result:
                 return None, AgentResponse.error(error_message="No suitable agent found")
@@ -130,13 +291,15 @@ class Delegator:
             logger.info(f"Cascading to next agent: {next_agent}")
 
             # Check if we've already tried this agent to prevent infinite loop
-            if next_agent in self.attempted_agents:
+            if next_agent in routing_context.attempted_agents:
                 return None, AgentResponse.error(
                     error_message="All available agents have been attempted without success"
                 )
 
-            return await self.delegate_chat(next_agent, chat_request)
+            return await self.delegate_chat(next_agent, chat_request, routing_context)
         except ValueError as ve:
             # No more agents available
             logger.error(f"No more agents available: {str(ve)}")
-            return None, AgentResponse.error(error_message="All available agents have been attempted without success")
+            return None, AgentResponse.error(
+                error_message="All available agents have been attempted without success"
+            )
@@ -1,9 +1,20 @@
+import math
 import time
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, List, Optional
+
 from fastapi import Query
 from pydantic import BaseModel, Field
 
+# Rough token count estimate for Llama-style tokenizers on English text, used for context budgeting
+CHARS_PER_TOKEN = 4
+TOKENS_PER_MESSAGE = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens a message with the given content takes up in a prompt"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) + TOKENS_PER_MESSAGE
+
 
 class ResponseType(Enum):
     """Enum to distinguish between different types of responses"""
@@ -25,6 +36,8 @@ class ChatMessage(BaseModel):
     requires_action: Optional[bool] = False
     action_type: Optional[str] = None
     timestamp: Optional[float] = Field(default_factory=lambda: time.time())
+    # Position of the message in the chat history, increasing with every message (a fetch cursor)
+    sequence: Optional[int] = None
 
     def from_agent_response(self, response: "AgentResponse", agent_name: str) -> "ChatMessage":
         """Create a ChatMessage from an AgentResponse"""
@@ -46,9 +59,18 @@ class ChatRequest(BaseModel):
     conversation_id: str = Query(default="default")
 
 
+class ChatBatchRequest(BaseModel):
+    """Chat requests replayed together, e.g. for evaluation runs"""
+
+    requests: List[ChatRequest]
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+
+
 class Conversation(BaseModel):
     messages: List[ChatMessage]
     has_uploaded_file: bool = False
+    # Sequence number of the latest change (new message or clear) to the conversation
+    last_sequence: int = 0
 
 
 class AgentResponse(BaseModel):
@@ -1,6 +1,11 @@
 import logging
-from fastapi import APIRouter, Query
-from src.stores import chat_manager_instance
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request, Response
+from src.agents.rag.documents import conversation_documents
+from src.services.responses import FastJSONResponse
+from src.stores import agent_manager_instance, chat_manager_instance
 
 logger = logging.getLogger(__name__)
 
@@ -8,17 +13,61 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 
 
 @router.get("/messages")
-async def get_messages(conversation_id: str = Query(default="default")):
-    """Get all chat messages for a conversation"""
+async def get_messages(
+    request: Request,
+    conversation_id: str = Query(default="default"),
+    since: Optional[int] = Query(default=None, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1, le=500),
+):
+    """
+    Get chat messages for a conversation.
+
+    Pass the returned `cursor` as `since` to only fetch messages added after the previous
+    call, and `limit` to page through long histories (`has_more` tells whether to continue).
+    When the history was cleared after `since`, the messages are returned from the beginning
+    with `reset` set, telling the client to replace what it has instead of appending.
+    Responses carry an ETag; a request for the same page whose If-None-Match matches it gets an
+    empty 304.
+    """
     logger.info(f"Received get_messages request for conversation {conversation_id}")
-    return {"messages": chat_manager_instance.get_messages(conversation_id)}
+    await chat_manager_instance.load_conversation(conversation_id)
+    etag = chat_manager_instance.get_messages_etag(conversation_id, since, limit)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    cleared_sequence = chat_manager_instance.get_cleared_sequence(conversation_id)
+    reset = since is not None and since < cleared_sequence
+    messages, cursor, has_more = await chat_manager_instance.get_messages_page(
+        conversation_id, None if reset else since, limit
+    )
+    # Messages before the clear are gone, so a cursor on the disclaimer can skip past it
+    cursor = max(cursor, cleared_sequence)
+    return FastJSONResponse(
+        {"messages": messages, "cursor": cursor, "has_more": has_more, "reset": reset},
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/search")
+async def search_messages(
+    q: str = Query(min_length=1),
+    conversation_id: Optional[str] = Query(default=None),
+    limit: int = Query(default=10, ge=1, le=100),
+):
+    """Search chat messages by keywords, in all conversations or within one, best matches first"""
+    logger.info(f"Searching messages for conversation {conversation_id or 'all'}")
+    return FastJSONResponse(
+        {"results": chat_manager_instance.search_messages(q, conversation_id, limit)}
+    )
 
 
 @router.get("/clear")
 async def clear_messages(conversation_id: str = Query(default="default")):
     """Clear chat message history for a conversation"""
     logger.info(f"Clearing message history for conversation {conversation_id}")
+    await chat_manager_instance.load_conversation(conversation_id)
     chat_manager_instance.clear_messages(conversation_id)
+    agent_manager_instance.clear_active_agent(conversation_id)
     return {"response": "successfully cleared message history"}
 
 
@@ -26,21 +75,29 @@ async def clear_messages(conversation_id: str = Query(default="default")):
 async def get_conversations():
     """Get all conversation IDs"""
     logger.info("Getting all conversation IDs")
-    return {"conversation_ids": chat_manager_instance.get_all_conversation_ids()}
+    return {"conversation_ids": await chat_manager_instance.get_all_conversation_ids()}
 
 
 @router.post("/conversations")
 async def create_conversation():
     """Create a new conversation"""
-    new_id = f"conversation_{len(chat_manager_instance.get_all_conversation_ids())}"
+    # Counting conversations could reuse the ID of a live one once others are evicted or deleted
+    new_id = f"conversation_{uuid.uuid4().hex[:12]}"
     conversation = chat_manager_instance.create_conversation(new_id)
     logger.info(f"Created new conversation with ID: {new_id}")
     return {"conversation_id": new_id, "conversation": conversation}
 
 
+def remove_conversation(conversation_id: str) -> None:
+    """Delete a conversation's history, active agent and documents"""
+    chat_manager_instance.delete_conversation(conversation_id)
+    agent_manager_instance.clear_active_agent(conversation_id)
+    conversation_documents.remove_conversation(conversation_id)
+
+
 @router.delete("/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """Delete a conversation"""
     logger.info(f"Deleting conversation {conversation_id}")
-    chat_manager_instance.delete_conversation(conversation_id)
+    remove_conversation(conversation_id)
     return {"response": f"successfully deleted conversation {conversation_id}"}
@@ -1,7 +1,8 @@
 import logging
 from datetime import timedelta
+
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from src.services.responses import FastJSONResponse
 from src.stores import workflow_manager_instance
 
 logger = logging.getLogger(__name__)
@@ -10,7 +11,7 @@ router = APIRouter(prefix="/workflows", tags=["workflows"])
 
 
 @router.post("/create")
-async def create_workflow(request: Request) -> JSONResponse:
+async def create_workflow(request: Request) -> FastJSONResponse:
     """Create a new workflow"""
     try:
         data = await request.json()
@@ -22,67 +23,67 @@ async def create_workflow(request: Request) -> JSONResponse:
             interval=timedelta(seconds=data["interval"]),
             metadata=data.get("metadata"),
         )
-        return JSONResponse(content={"status": "success", "workflow": workflow.to_dict()})
+        return FastJSONResponse(content={"status": "success", "workflow": workflow.to_dict()})
     except Exception as e:
         logger.error(f"Failed to create workflow: {str(e)}")
-        return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+        return FastJSONResponse(status_code=500, content={"status": "error", "message": str(e)})
 
 
 @router.get("/list")
-async def list_workflows() -> JSONResponse:
+async def list_workflows() -> FastJSONResponse:
     """Get list of all workflows"""
     try:
         workflows = await workflow_manager_instance.list_workflows()
-        return JSONResponse(content={"workflows": [w.to_dict() for w in workflows]})
+        return FastJSONResponse(content={"workflows": [w.to_dict() for w in workflows]})
     except Exception as e:
         logger.error(f"Failed to list workflows: {str(e)}")
-        return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+        return FastJSONResponse(status_code=500, content={"status": "error", "message": str(e)})
 
 
 @router.get("/{workflow_id}")
-async def get_workflow(workflow_id: str) -> JSONResponse:
+async def get_workflow(workflow_id: str) -> FastJSONResponse:
     """Get workflow by ID"""
     try:
         workflow = await workflow_manager_instance.get_workflow(workflow_id)
         if workflow:
-            return JSONResponse(content={"workflow": workflow.to_dict()})
-        return JSONResponse(
+            return FastJSONResponse(content={"workflow": workflow.to_dict()})
+        return FastJSONResponse(
             status_code=404,
             content={"status": "error", "message": f"Workflow {workflow_id} not found"},
         )
     except Exception as e:
         logger.error(f"Failed to get workflow: {str(e)}")
-        return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+        return FastJSONResponse(status_code=500, content={"status": "error", "message": str(e)})
 
 
 @router.put("/{workflow_id}")
-async def update_workflow(workflow_id: str, request: Request) -> JSONResponse:
+async def update_workflow(workflow_id: str, request: Request) -> FastJSONResponse:
     """Update workflow properties"""
     try:
         updates = await request.json()
         workflow = await workflow_manager_instance.update_workflow(workflow_id, **updates)
         if workflow:
-            return JSONResponse(content={"status": "success", "workflow": workflow.to_dict()})
-        return JSONResponse(
+            return FastJSONResponse(content={"status": "success", "workflow": workflow.to_dict()})
+        return FastJSONResponse(
             status_code=404,
             content={"status": "error", "message": f"Workflow {workflow_id} not found"},
         )
     except Exception as e:
         logger.error(f"Failed to update workflow: {str(e)}")
-        return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+        return FastJSONResponse(status_code=500, content={"status": "error", "message": str(e)})
 
 
 @router.delete("/{workflow_id}")
-async def delete_workflow(workflow_id: str) -> JSONResponse:
+async def delete_workflow(workflow_id: str) -> FastJSONResponse:
     """Delete a workflow"""
     try:
         success = await workflow_manager_instance.delete_workflow(workflow_id)
         if success:
-            return JSONResponse(content={"status": "success"})
-        return JSONResponse(
+            return FastJSONResponse(content={"status": "success"})
+        return FastJSONResponse(
             status_code=404,
             content={"status": "error", "message": f"Workflow {workflow_id} not found"},
         )
     except Exception as e:
         logger.error(f"Failed to delete workflow: {str(e)}")
-        return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+        return FastJSONResponse(status_code=500, content={"status": "error", "message": str(e)})
@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+from typing import Set
+
+
+@dataclass
+class RoutingContext:
+    """
+    Routing state of a single chat request.
+
+    The delegator is shared by every request, so all state of the cascading fallback lives
+    here instead, letting concurrent conversations route independently.
+
+    Attributes:
+        conversation_id (str): Conversation the request belongs to
+        attempted_agents (Set[str]): Agents already selected or tried for this request
+    """
+
+    conversation_id: str = "default"
+    attempted_agents: Set[str] = field(default_factory=set)
@@ -0,0 +1,251 @@
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, Optional, Tuple
+
+import numpy as np
+from src.services.metrics import record_cache_lookup, routing_continuations
+from src.services.tracing import tracer
+from src.stores import chat_manager_instance
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"[\w']+")
+
+# Openings of prompts that carry on the previous request rather than start a new one
+CONTINUATION_PREFIXES = (
+    "and",
+    "also",
+    "what about",
+    "how about",
+    "same",
+    "now",
+    "then",
+    "again",
+    "more",
+    "another",
+    "instead",
+    "but",
+)
+
+# Words that only make sense with the previous turn in mind
+REFERRING_WORDS = frozenset(
+    "it its that this those these them they same again more other another instead".split()
+)
+
+# Short replies to a question or confirmation request of the previous agent
+CONFIRMATION_WORDS = frozenset(
+    "yes yeah yep sure ok okay no nope confirm confirmed proceed go ahead do cancel stop please "
+    "thanks correct".split()
+)
+
+
+@dataclass
+class ContinuationDecision:
+    """
+    Outcome of checking whether a prompt continues the conversation's previous exchange.
+
+    Attributes:
+        agent (Optional[str]): Agent that answered the previous turn, None if there is none
+        continued (bool): Whether the prompt should go to that agent without routing
+        reason (str): Why the prompt was or was not considered a continuation
+        similarity (Optional[float]): Similarity to the previous prompt, if it was computed
+        prompt_vector (Optional[np.ndarray]): Normalized prompt embedding, if it was computed, for
+            reuse by routing
+    """
+
+    agent: Optional[str]
+    continued: bool
+    reason: str
+    similarity: Optional[float] = None
+    prompt_vector: Optional[np.ndarray] = None
+
+
+@dataclass
+class ContinuationStats:
+    """Counters describing how often follow-up prompts skip routing, and why the others did not"""
+
+    checks: int = 0
+    hits: int = 0
+    hits_by_reason: Dict[str, int] = field(default_factory=dict)
+    misses_by_reason: Dict[str, int] = field(default_factory=dict)
+    hits_by_agent: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, decision: ContinuationDecision) -> None:
+        """Record a continuation check"""
+        self.checks += 1
+        if decision.continued:
+            self.hits += 1
+            self.hits_by_reason[decision.reason] = self.hits_by_reason.get(decision.reason, 0) + 1
+            self.hits_by_agent[decision.agent] = self.hits_by_agent.get(decision.agent, 0) + 1
+        else:
+            self.misses_by_reason[decision.reason] = (
+                self.misses_by_reason.get(decision.reason, 0) + 1
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the statistics for reporting"""
+        return {
+            "checks": self.checks,
+            "hits": self.hits,
+            "misses": self.checks - self.hits,
+            "hit_rate": self.hits / self.checks if self.checks else 0.0,
+            "hits_by_reason": dict(self.hits_by_reason),
+            "misses_by_reason": dict(self.misses_by_reason),
+            "hits_by_agent": dict(self.hits_by_agent),
+        }
+
+
+def is_short_followup(prompt: str, max_words: int) -> bool:
+    """Check whether a prompt is a short follow-up such as "and for ETH?" or "yes, proceed" """
+    words = _WORD_PATTERN.findall(prompt.lower())
+    if not words or len(words) > max_words:
+        return False
+    if all(word in CONFIRMATION_WORDS for word in words):
+        return True
+    text = " ".join(words)
+    if any(text == prefix or text.startswith(prefix + " ") for prefix in CONTINUATION_PREFIXES):
+        return True
+    return any(word in REFERRING_WORDS for word in words)
+
+
+class ContinuationDetector:
+    """
+    Sends follow-up prompts to the agent that answered the previous turn, skipping routing.
+
+    Follow-ups are detected cheaply: short prompts that refer back to the previous turn are
+    continuations outright, and other prompts continue the conversation when their embedding
+    is close to the previous user prompt. Full routing only runs when the topic changes, the
+    previous answer failed or is too old, or no agent has answered yet.
+
+    Prompt embeddings are cached per conversation message, so each prompt is embedded once:
+    its vector serves as the previous prompt of the next turn, and a miss hands it to the
+    embedding router.
+
+    Attributes:
+        embeddings: Embeddings model used for prompts
+        min_similarity (float): Minimum similarity to the previous prompt for a continuation
+        max_words (int): Maximum number of words of a prompt matched by the short follow-up
+            heuristics
+        max_age (float): Maximum age in seconds of the previous answer
+        max_cached_vectors (int): Maximum number of cached prompt embeddings
+        stats (ContinuationStats): Hit rate statistics
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        min_similarity: float,
+        max_words: int,
+        max_age: float,
+        max_cached_vectors: int = 2000,
+    ) -> None:
+        self.embeddings = embeddings
+        self.min_similarity = min_similarity
+        self.max_words = max_words
+        self.max_age = max_age
+        self.max_cached_vectors = max_cached_vectors
+        self.stats = ContinuationStats()
+        self._vectors: "OrderedDict[Tuple[str, Optional[int]], np.ndarray]" = OrderedDict()
+
+    @staticmethod
+    def _normalize(vector: Any) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    async def _embed(self, conversation_id: str, sequence: Optional[int], text: str) -> np.ndarray:
+        """Embed a prompt of a conversation, reusing the cached vector of the same message"""
+        key = (conversation_id, sequence)
+        cached = self._vectors.get(key) if sequence is not None else None
+        record_cache_lookup("continuation_embedding", hit=cached is not None)
+        if cached is not None:
+            self._vectors.move_to_end(key)
+            return cached
+
+        vector = self._normalize(await self.embeddings.aembed_query(text))
+        if sequence is not None:
+            self._vectors[key] = vector
+            if len(self._vectors) > self.max_cached_vectors:
+                self._vectors.popitem(last=False)
+        return vector
+
+    @tracer.traced("router.continuation")
+    async def check(
+        self,
+        conversation_id: str,
+        prompt: str,
+        sequence: Optional[int],
+        candidates: Collection[str],
+    ) -> ContinuationDecision:
+        """
+        Check whether a prompt continues the conversation's previous exchange.
+
+        Args:
+            conversation_id (str): Conversation the prompt belongs to
+            prompt (str): User prompt
+            sequence (int, optional): Sequence number of the prompt in the chat history
+            candidates (Collection[str]): Names of the agents the prompt may be routed to
+
+        Returns:
+            ContinuationDecision: The previous agent and whether to use it directly
+        """
+        decision = await self._decide(conversation_id, prompt, sequence, candidates)
+        self.stats.record(decision)
+        routing_continuations.inc(
+            result="hit" if decision.continued else "miss", reason=decision.reason
+        )
+        tracer.set_attribute("continued", decision.continued)
+        tracer.set_attribute("reason", decision.reason)
+        logger.info(
+            f"Continuation check: agent={decision.agent} continued={decision.continued} "
+            f"reason={decision.reason}"
+        )
+        return decision
+
+    async def _decide(
+        self,
+        conversation_id: str,
+        prompt: str,
+        sequence: Optional[int],
+        candidates: Collection[str],
+    ) -> ContinuationDecision:
+        exchange = chat_manager_instance.get_last_exchange(conversation_id, sequence)
+        if exchange is None:
+            return ContinuationDecision(agent=None, continued=False, reason="no_previous_agent")
+
+        previous_prompt, previous_response = exchange
+        agent = previous_response.agentName
+        if agent not in candidates:
+            return ContinuationDecision(agent=agent, continued=False, reason="agent_unavailable")
+        if previous_response.error_message:
+            return ContinuationDecision(agent=agent, continued=False, reason="previous_error")
+        if (
+            previous_response.timestamp is None
+            or time.time() - previous_response.timestamp > self.max_age
+        ):
+            return ContinuationDecision(agent=agent, continued=False, reason="expired")
+        if is_short_followup(prompt, self.max_words):
+            return ContinuationDecision(agent=agent, continued=True, reason="short_followup")
+        if previous_prompt is None or not previous_prompt.content:
+            return ContinuationDecision(agent=agent, continued=False, reason="no_previous_prompt")
+
+        try:
+            prompt_vector = await self._embed(conversation_id, sequence, prompt)
+            previous_vector = await self._embed(
+                conversation_id, previous_prompt.sequence, previous_prompt.content
+            )
+        except Exception as e:
+            logger.warning(f"Continuation check failed, routing the prompt: {str(e)}")
+            return ContinuationDecision(agent=agent, continued=False, reason="error")
+
+        similarity = float(np.dot(prompt_vector, previous_vector))
+        return ContinuationDecision(
+            agent=agent,
+            continued=similarity >= self.min_similarity,
+            reason="similar_prompt" if similarity >= self.min_similarity else "topic_change",
+            similarity=similarity,
+            prompt_vector=prompt_vector,
+        )
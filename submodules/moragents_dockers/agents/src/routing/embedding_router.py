@@ -0,0 +1,209 @@
+import bisect
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from src.services.metrics import record_cache_lookup
+from src.services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the margin histogram buckets reported in the routing statistics
+MARGIN_BUCKETS = [0.01, 0.02, 0.05, 0.1, 0.2, 0.5]
+
+
+@dataclass
+class RoutingDecision:
+    """
+    Outcome of routing a prompt against the agent description index.
+
+    Attributes:
+        agent (Optional[str]): Best matching agent name, None if no candidate could be scored
+        confident (bool): Whether the match is strong enough to skip LLM agent selection
+        similarity (float): Cosine similarity between the prompt and the best agent
+        margin (float): Similarity gap between the best and the second best agent
+        ranking (List[Tuple[str, float]]): All candidates with their similarity, best first
+    """
+
+    agent: Optional[str]
+    confident: bool
+    similarity: float = 0.0
+    margin: float = 0.0
+    ranking: List[Tuple[str, float]] = field(default_factory=list)
+
+
+@dataclass
+class RoutingStats:
+    """
+    Counters describing how often the embedding router resolves prompts on its own.
+
+    Fallback decisions are compared with the agent the LLM eventually selected, giving the
+    agreement rate per margin bucket that is needed to tune the confidence thresholds.
+    """
+
+    routed: int = 0
+    hits: int = 0
+    fallbacks: int = 0
+    errors: int = 0
+    margin_total: float = 0.0
+    margin_histogram: List[int] = field(default_factory=lambda: [0] * (len(MARGIN_BUCKETS) + 1))
+    fallback_agreements: List[int] = field(default_factory=lambda: [0] * (len(MARGIN_BUCKETS) + 1))
+    fallback_comparisons: List[int] = field(default_factory=lambda: [0] * (len(MARGIN_BUCKETS) + 1))
+    hits_by_agent: Dict[str, int] = field(default_factory=dict)
+
+    @staticmethod
+    def bucket(margin: float) -> int:
+        """Get the histogram bucket index for a margin"""
+        return bisect.bisect_left(MARGIN_BUCKETS, margin)
+
+    def record(self, decision: RoutingDecision) -> None:
+        """Record a routing decision"""
+        self.routed += 1
+        self.margin_total += decision.margin
+        self.margin_histogram[self.bucket(decision.margin)] += 1
+        if decision.confident:
+            self.hits += 1
+            self.hits_by_agent[decision.agent] = self.hits_by_agent.get(decision.agent, 0) + 1
+        else:
+            self.fallbacks += 1
+
+    def record_fallback_result(self, decision: RoutingDecision, selected_agent: str) -> None:
+        """Record whether the LLM agreed with the router's best guess on an ambiguous prompt"""
+        bucket = self.bucket(decision.margin)
+        self.fallback_comparisons[bucket] += 1
+        if decision.agent == selected_agent:
+            self.fallback_agreements[bucket] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the statistics for reporting"""
+        labels = [f"<={bound}" for bound in MARGIN_BUCKETS] + [f">{MARGIN_BUCKETS[-1]}"]
+        return {
+            "routed": self.routed,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "errors": self.errors,
+            "hit_rate": self.hits / self.routed if self.routed else 0.0,
+            "mean_margin": self.margin_total / self.routed if self.routed else 0.0,
+            "margin_histogram": dict(zip(labels, self.margin_histogram)),
+            "fallback_agreement_by_margin": {
+                label: {"agreed": agreed, "total": total}
+                for label, agreed, total in zip(
+                    labels, self.fallback_agreements, self.fallback_comparisons
+                )
+                if total
+            },
+            "hits_by_agent": dict(self.hits_by_agent),
+        }
+
+
+class EmbeddingRouter:
+    """
+    Selects agents by comparing prompt embeddings with pre-embedded agent descriptions.
+
+    Agent descriptions are embedded once and kept in an in-memory index (re-embedded only
+    when a description changes). A prompt is routed directly when its best match is both
+    similar enough and clearly ahead of the runner-up; otherwise the caller falls back to
+    LLM agent selection.
+
+    Attributes:
+        embeddings: Embeddings model used for descriptions and prompts
+        min_similarity (float): Minimum similarity of the best agent for a confident decision
+        min_margin (float): Minimum gap between the best and second best agent
+        stats (RoutingStats): Hit rate and margin statistics
+    """
+
+    def __init__(self, embeddings: Any, min_similarity: float, min_margin: float) -> None:
+        self.embeddings = embeddings
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.stats = RoutingStats()
+        self._index: Dict[str, Tuple[str, np.ndarray]] = {}
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    async def _ensure_indexed(self, agent_configs: List[Dict]) -> None:
+        """Embed descriptions of agents missing from the index or whose description changed"""
+        stale = [
+            agent
+            for agent in agent_configs
+            if agent["name"] not in self._index
+            or self._index[agent["name"]][0] != agent["description"]
+        ]
+        record_cache_lookup("agent_embedding", hit=True, count=len(agent_configs) - len(stale))
+        record_cache_lookup("agent_embedding", hit=False, count=len(stale))
+        if not stale:
+            return
+
+        vectors = await self.embeddings.aembed_documents([agent["description"] for agent in stale])
+        for agent, vector in zip(stale, vectors):
+            self._index[agent["name"]] = (agent["description"], self._normalize(vector))
+        logger.info(f"Embedded descriptions for agents: {[agent['name'] for agent in stale]}")
+
+    @tracer.traced("router.embedding_rank")
+    async def rank(
+        self, prompt: str, agent_configs: List[Dict], prompt_vector: Optional[np.ndarray] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank candidate agents by similarity to the prompt.
+
+        Args:
+            prompt (str): User prompt
+            agent_configs (List[Dict]): Configurations of the candidate agents
+            prompt_vector (np.ndarray, optional): Normalized prompt embedding, if already computed
+
+        Returns:
+            List[Tuple[str, float]]: Agent names with their cosine similarity, best first
+        """
+        await self._ensure_indexed(agent_configs)
+        if prompt_vector is None:
+            prompt_vector = self._normalize(await self.embeddings.aembed_query(prompt))
+        scores = [
+            (agent["name"], float(np.dot(prompt_vector, self._index[agent["name"]][1])))
+            for agent in agent_configs
+        ]
+        return sorted(scores, key=lambda score: score[1], reverse=True)
+
+    async def route(
+        self, prompt: str, agent_configs: List[Dict], prompt_vector: Optional[np.ndarray] = None
+    ) -> RoutingDecision:
+        """
+        Route a prompt to one of the candidate agents.
+
+        Args:
+            prompt (str): User prompt
+            agent_configs (List[Dict]): Configurations of the candidate agents
+            prompt_vector (np.ndarray, optional): Normalized prompt embedding, if already computed
+
+        Returns:
+            RoutingDecision: Best match and whether it is confident enough to use directly
+        """
+        if not agent_configs:
+            return RoutingDecision(agent=None, confident=False)
+
+        try:
+            ranking = await self.rank(prompt, agent_configs, prompt_vector)
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(f"Embedding routing failed, falling back to LLM selection: {str(e)}")
+            return RoutingDecision(agent=None, confident=False)
+
+        best_agent, similarity = ranking[0]
+        margin = similarity - (ranking[1][1] if len(ranking) > 1 else 0.0)
+        decision = RoutingDecision(
+            agent=best_agent,
+            confident=similarity >= self.min_similarity and margin >= self.min_margin,
+            similarity=similarity,
+            margin=margin,
+            ranking=ranking,
+        )
+        self.stats.record(decision)
+        logger.info(
+            f"Embedding router: best={best_agent} similarity={similarity:.3f} "
+            f"margin={margin:.3f} confident={decision.confident}"
+        )
+        return decision
@@ -0,0 +1,110 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List
+
+from langchain.schema import SystemMessage
+from src.services.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RoutingPrompt:
+    """
+    Prebuilt inputs of the LLM agent selection call for one set of candidate agents.
+
+    Attributes:
+        agent_selection_llm: LLM bound to the select_agent tool for these candidates
+        system_message (SystemMessage): System prompt listing the candidates
+    """
+
+    agent_selection_llm: Any
+    system_message: SystemMessage
+
+
+class RoutingPromptCache:
+    """
+    Caches the select_agent tool binding and system prompt per set of candidate agents.
+
+    The candidates only change when the agent selection changes or when a cascade excludes
+    attempted agents, so the same few entries are reused across requests. Reusing the exact
+    same system message also keeps the prompt prefix byte-identical, letting Ollama reuse its
+    prompt cache between routing calls.
+
+    Attributes:
+        llm: Language model the tool is bound to
+        max_entries (int): Maximum number of cached candidate sets
+    """
+
+    def __init__(self, llm: Any, max_entries: int = 32) -> None:
+        self.llm = llm
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[FrozenSet[str], RoutingPrompt]" = OrderedDict()
+
+    @staticmethod
+    def _build_system_prompt(available_agents: List[Dict]) -> str:
+        return (
+            "Your name is Morpheus. "
+            "Your primary function is to select the correct agent "
+            "from the list of available agents based on the user's input. "
+            "You MUST use the 'select_agent' function to select an agent. "
+            "Available agents and their descriptions in the format "
+            "`{agent_name}: {agent_description}`"
+            "You must use one of the available agent names.\n"
+            + "\n".join(f"- {agent['name']}: {agent['description']}" for agent in available_agents)
+        )
+
+    @staticmethod
+    def _build_tools(available_agents: List[Dict]) -> List[Dict]:
+        return [
+            {
+                "name": "select_agent",
+                "description": "Choose which agent should be used to respond to the user query",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "agent": {
+                            "type": "string",
+                            "enum": [agent["name"] for agent in available_agents],
+                            "description": "The name of the agent to be used",
+                        }
+                    },
+                    "required": ["agent"],
+                },
+            }
+        ]
+
+    def get(self, available_agents: List[Dict]) -> RoutingPrompt:
+        """
+        Get the routing prompt for a set of candidate agents, building it on first use.
+
+        Args:
+            available_agents (List[Dict]): Configurations of the candidate agents, in config order
+
+        Returns:
+            RoutingPrompt: Bound agent selection LLM and system message
+        """
+        key = frozenset(agent["name"] for agent in available_agents)
+        routing_prompt = self._entries.get(key)
+        record_cache_lookup("routing_prompt", hit=routing_prompt is not None)
+        if routing_prompt is not None:
+            self._entries.move_to_end(key)
+            return routing_prompt
+
+        routing_prompt = RoutingPrompt(
+            agent_selection_llm=self.llm.bind_tools(
+                self._build_tools(available_agents), tool_choice="select_agent"
+            ),
+            system_message=SystemMessage(content=self._build_system_prompt(available_agents)),
+        )
+        self._entries[key] = routing_prompt
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        logger.info(f"Built routing prompt for agents: {sorted(key)}")
+        return routing_prompt
+
+    def invalidate(self) -> None:
+        """Drop all cached routing prompts"""
+        self._entries.clear()
+        logger.info("Invalidated routing prompt cache")
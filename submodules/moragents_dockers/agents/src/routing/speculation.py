@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.agents.agent_core.streaming import suppress_token_stream
+from src.models.core import AgentResponse, ResponseType
+from src.services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+AgentCall = Callable[[], Awaitable[AgentResponse]]
+
+
+@dataclass
+class SpeculationStats:
+    """
+    Counters describing the cost and payoff of speculative delegation.
+
+    Attributes:
+        races (int): Number of speculative races started
+        wins_by_rank (Dict[int, int]): Races won, keyed by the winner's routing rank (0 = best
+            match)
+        all_failed (int): Races in which no candidate produced a successful response
+        cancelled (int): Losing attempts cancelled before they finished
+        discarded (int): Losing attempts that finished but whose response was thrown away
+        wasted_seconds (float): Total time spent running losing attempts
+    """
+
+    races: int = 0
+    wins_by_rank: Dict[int, int] = field(default_factory=dict)
+    all_failed: int = 0
+    cancelled: int = 0
+    discarded: int = 0
+    wasted_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the statistics for reporting"""
+        return {
+            "races": self.races,
+            "wins_by_rank": dict(self.wins_by_rank),
+            "all_failed": self.all_failed,
+            "cancelled": self.cancelled,
+            "discarded": self.discarded,
+            "wasted_seconds": round(self.wasted_seconds, 3),
+        }
+
+
+class SpeculativeRunner:
+    """
+    Runs the top ranked candidate agents concurrently and keeps the first successful response.
+
+    Only agents on the allowlist take part, so agents with side effects (transactions,
+    strategies, posts) are never run speculatively.
+
+    Attributes:
+        top_k (int): Maximum number of agents raced per request
+        allowed_agents (Sequence[str]): Names of agents that are safe to run speculatively
+        stats (SpeculationStats): Wasted work and win statistics
+    """
+
+    def __init__(self, top_k: int, allowed_agents: Sequence[str]) -> None:
+        self.top_k = top_k
+        self.allowed_agents = set(allowed_agents)
+        self.stats = SpeculationStats()
+
+    def select_candidates(self, ranking: List[Tuple[str, float]]) -> List[str]:
+        """
+        Pick the agents to race from a routing ranking.
+
+        Speculation only happens when all top ranked agents are allowlisted; skipping a
+        state-changing agent in favour of lower ranked ones would change routing outcomes.
+
+        Args:
+            ranking (List[Tuple[str, float]]): Agent names with routing scores, best first
+
+        Returns:
+            List[str]: Agent names to race, or an empty list when speculation does not apply
+        """
+        candidates = [name for name, _ in ranking[: self.top_k]]
+        if len(candidates) < 2 or any(name not in self.allowed_agents for name in candidates):
+            return []
+        return candidates
+
+    @staticmethod
+    def _is_success(task: asyncio.Task) -> bool:
+        if task.cancelled() or task.exception() is not None:
+            return False
+        return task.result().response_type != ResponseType.ERROR
+
+    @staticmethod
+    def _get_error_response(name: str, task: asyncio.Task) -> Optional[AgentResponse]:
+        """Log a failed attempt, returning its error response unless it raised or was cancelled"""
+        if task.cancelled():
+            # E.g. a client timeout raising CancelledError inside the agent
+            logger.warning(f"Speculative attempt by {name} was cancelled")
+        elif task.exception() is not None:
+            logger.warning(f"Speculative attempt by {name} raised: {task.exception()}")
+        else:
+            return task.result()
+        return None
+
+    @staticmethod
+    async def _attempt(
+        name: str, call: AgentCall, request_trace_id: Optional[str]
+    ) -> AgentResponse:
+        with tracer.trace("speculation.attempt", agent=name, request_trace_id=request_trace_id):
+            return await call()
+
+    def _record_cancelled_attempt(self, started_at: float) -> Callable[[asyncio.Task], None]:
+        def record(task: asyncio.Task) -> None:
+            self.stats.wasted_seconds += time.monotonic() - started_at
+            if task.cancelled():
+                self.stats.cancelled += 1
+            else:
+                self.stats.discarded += 1
+
+        return record
+
+    @tracer.traced("speculation.race")
+    async def race(
+        self, agent_calls: Dict[str, AgentCall]
+    ) -> Tuple[Optional[str], Optional[AgentResponse]]:
+        """
+        Run agent calls concurrently and return the first successful response.
+
+        Args:
+            agent_calls (Dict[str, AgentCall]): Agent calls keyed by agent name, in ranking order
+
+        Returns:
+            Tuple[Optional[str], Optional[AgentResponse]]: Winning agent and its response, or
+            (None, last error response) when every candidate failed
+        """
+        self.stats.races += 1
+        started_at = time.monotonic()
+        winner: Optional[asyncio.Task] = None
+
+        request_span = tracer.current_span()
+        request_trace_id = request_span.trace_id if request_span else None
+        # Concurrent candidates must not interleave tokens in a streamed response. Losing
+        # candidates can finish after the request, so each is traced on its own.
+        with suppress_token_stream():
+            context = tracer.detached_context()
+        tasks = {
+            context.run(asyncio.create_task, self._attempt(name, call, request_trace_id)): name
+            for name, call in agent_calls.items()
+        }
+
+        finished_at: Dict[asyncio.Task, float] = {}
+        for task in tasks:
+            task.add_done_callback(
+                lambda done_task: finished_at.setdefault(done_task, time.monotonic())
+            )
+
+        pending = set(tasks)
+        last_error: Optional[AgentResponse] = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the better ranked agent when several finish at once
+                for task in (task for task in tasks if task in done):
+                    if self._is_success(task):
+                        winner = task
+                        break
+                    last_error = self._get_error_response(tasks[task], task) or last_error
+        finally:
+            for task in pending:
+                task.add_done_callback(self._record_cancelled_attempt(started_at))
+                task.cancel()
+
+        for task, finished in finished_at.items():
+            if task is not winner:
+                self.stats.discarded += 1
+                self.stats.wasted_seconds += finished - started_at
+
+        if winner is None:
+            self.stats.all_failed += 1
+            logger.info(f"All speculative candidates failed: {list(agent_calls)}")
+            return None, last_error
+
+        rank = list(tasks).index(winner)
+        self.stats.wins_by_rank[rank] = self.stats.wins_by_rank.get(rank, 0) + 1
+        tracer.set_attribute("winner", tasks[winner])
+        logger.info(
+            f"Speculative race won by {tasks[winner]} (rank {rank}) "
+            f"in {time.monotonic() - started_at:.2f}s"
+        )
+        return tasks[winner], winner.result()
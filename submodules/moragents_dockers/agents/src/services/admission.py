@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional
+
+from src.config import Config
+from src.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted because the chat pipeline is saturated.
+
+    Attributes:
+        status_code (int): 429 when the wait queue is full, 503 when the queue deadline passed
+        retry_after (int): Seconds the client should wait before retrying
+    """
+
+    def __init__(self, status_code: int, detail: str, retry_after: int) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """Slot held by an admitted request; releasing it more than once is a no-op"""
+
+    def __init__(self, controller: Optional["AdmissionController"]) -> None:
+        self._controller = controller
+
+    def release(self) -> None:
+        """Give the slot back to the controller"""
+        if self._controller is not None:
+            self._controller._release()
+            self._controller = None
+
+
+class AdmissionController:
+    """
+    Bounds the number of chat requests processed at once.
+
+    Requests beyond the in-flight limit wait in a FIFO queue. When the queue is full they are
+    rejected immediately with 429, and when they cannot start before the queue deadline they
+    are rejected with 503, so clients back off instead of piling onto the LLM backend until
+    everything times out.
+
+    Attributes:
+        max_in_flight (int): Maximum number of admitted requests running at once
+        max_queue (int): Maximum number of requests waiting for a slot
+        queue_timeout (float): Seconds a request may wait for a slot
+        retry_after (int): Retry-After hint returned with rejections, in seconds
+        in_flight (int): Number of admitted requests currently running
+    """
+
+    def __init__(
+        self, max_in_flight: int, max_queue: int, queue_timeout: float, retry_after: int
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a slot"""
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def _update_gauges(self) -> None:
+        metrics.admission_in_flight.set(self.in_flight)
+        metrics.admission_queue_depth.set(self.queue_depth)
+
+    def _reject(self, status_code: int, reason: str, detail: str) -> AdmissionRejected:
+        metrics.admission_rejections.inc(reason=reason)
+        logger.warning(
+            f"Rejected chat request ({reason}): "
+            f"{self.in_flight} in flight, {self.queue_depth} queued"
+        )
+        return AdmissionRejected(status_code, detail, self.retry_after)
+
+    async def acquire(self, bypass: bool = False, rejectable: bool = True) -> AdmissionTicket:
+        """
+        Wait for a processing slot.
+
+        Args:
+            bypass (bool): Admit immediately without taking a slot, for requests that skip the LLM
+                queue
+            rejectable (bool): Set to False for requests that should wait for a slot however long
+                the queue is, e.g. items of a batch whose concurrency is already bounded
+
+        Returns:
+            AdmissionTicket: Ticket to release once the request is done
+
+        Raises:
+            AdmissionRejected: If the queue is full or the queue deadline passed
+        """
+        if bypass:
+            metrics.admission_bypassed.inc()
+            return AdmissionTicket(None)
+
+        if self.in_flight < self.max_in_flight and not self.queue_depth:
+            self.in_flight += 1
+            self._update_gauges()
+            return AdmissionTicket(self)
+
+        if rejectable and self.queue_depth >= self.max_queue:
+            raise self._reject(429, "queue_full", "Too many requests, please retry later")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        started_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout if rejectable else None)
+        except asyncio.TimeoutError:
+            raise self._reject(503, "queue_timeout", "Server is busy, please retry later")
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the waiting request was cancelled
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._update_gauges()
+            metrics.admission_queue_wait.observe(time.perf_counter() - started_at)
+
+        # The releasing request handed its slot over, so in_flight already accounts for this one
+        return AdmissionTicket(self)
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.in_flight -= 1
+        self._update_gauges()
+
+    @asynccontextmanager
+    async def admit(self, bypass: bool = False, rejectable: bool = True) -> AsyncIterator[None]:
+        """Hold a processing slot for the duration of the block; see acquire()"""
+        ticket = await self.acquire(bypass=bypass, rejectable=rejectable)
+        try:
+            yield
+        finally:
+            ticket.release()
+
+
+# Create an instance shared by all chat endpoints
+admission_controller = AdmissionController(
+    max_in_flight=Config.ADMISSION_MAX_IN_FLIGHT,
+    max_queue=Config.ADMISSION_MAX_QUEUE,
+    queue_timeout=Config.ADMISSION_QUEUE_TIMEOUT,
+    retry_after=Config.ADMISSION_RETRY_AFTER,
+)
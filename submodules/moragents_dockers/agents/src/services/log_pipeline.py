@@ -0,0 +1,239 @@
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from src.config import Config
+from src.services import metrics
+from src.services.tracing import tracer
+
+# Attributes every LogRecord has; anything else was passed through `extra` and becomes a JSON field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+}
+
+
+def truncate_payload(value: Any, max_chars: int) -> Any:
+    """
+    Bound the size of a logged value.
+
+    Strings longer than max_chars keep their beginning, followed by their length and a hash
+    identifying the full value. Dictionaries and lists are truncated field by field.
+
+    Args:
+        value (Any): Value to log
+        max_chars (int): Maximum length of any string in the value
+
+    Returns:
+        Any: The value with long strings truncated
+    """
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        digest = hashlib.sha256(value.encode("utf-8", "replace")).hexdigest()[:16]
+        return f"{value[:max_chars]}... [truncated {len(value)} chars, sha256:{digest}]"
+    if isinstance(value, dict):
+        return {key: truncate_payload(item, max_chars) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [truncate_payload(item, max_chars) for item in value]
+    return value
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the records of chatty loggers.
+
+    Records at WARNING and above are always kept. A logger's rate applies to the logger and
+    its children; the longest matching logger name wins.
+
+    Attributes:
+        rates (Dict[str, float]): Fraction of records kept per logger name, between 0 and 1
+    """
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+
+    def _get_rate(self, logger_name: str) -> float:
+        name = logger_name
+        while True:
+            if name in self.rates:
+                return self.rates[name]
+            if "." not in name:
+                return 1.0
+            name = name.rsplit(".", 1)[0]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        if random.random() < self._get_rate(record.name):
+            return True
+        metrics.log_records_dropped.inc(reason="sampled")
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the logging caller.
+
+    Records are only stripped of unformatted arguments and tagged with the active trace here;
+    truncation, formatting and I/O happen on the listener thread. Records arriving while the
+    queue is full are dropped and counted instead of waiting for the writer.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Format the message now: arguments may be mutated once the caller moves on
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        span = tracer.current_span()
+        if span is not None and not hasattr(record, "trace_id"):
+            record.trace_id = span.trace_id
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.log_records_dropped.inc(reason="queue_full")
+
+
+class TruncatingQueueListener(logging.handlers.QueueListener):
+    """Queue listener that bounds the message and extra fields of each record before handling it"""
+
+    def __init__(
+        self, log_queue: queue.Queue, *handlers: logging.Handler, max_field_chars: int
+    ) -> None:
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.max_field_chars = max_field_chars
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = truncate_payload(record.msg, self.max_field_chars)
+        for key, value in list(vars(record).items()):
+            if key not in _RECORD_ATTRIBUTES:
+                setattr(record, key, truncate_payload(value, self.max_field_chars))
+        return record
+
+    def enqueue_sentinel(self) -> None:
+        # Wait for room on shutdown rather than failing when the queue is full
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as JSON lines, with fields passed through `extra` as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class LogPipeline:
+    """
+    Non-blocking application logging.
+
+    Application code logs into an in-memory queue; a listener thread truncates large
+    payloads, formats records and writes them to a size-rotated JSON lines file and to the
+    console. The event loop therefore never waits on disk or terminal I/O for logging.
+
+    Attributes:
+        path (Optional[str]): Log file path, None to log to the console only
+        level (str): Minimum level of logged records
+        max_bytes (int): Size at which the log file is rotated
+        backup_count (int): Number of rotated log files kept
+        queue_size (int): Maximum number of records waiting to be written; further records are
+            dropped
+        max_field_chars (int): Maximum length of the message and of each string field of a record
+        sample_rates (Dict[str, float]): Fraction of records below WARNING kept per logger name
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        level: str = "INFO",
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        queue_size: int = 10000,
+        max_field_chars: int = 2000,
+        sample_rates: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.path = path
+        self.level = level
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue_size = queue_size
+        self.max_field_chars = max_field_chars
+        self.sample_rates = sample_rates or {}
+        self._listener: Optional[TruncatingQueueListener] = None
+
+    def _create_handlers(self) -> List[logging.Handler]:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
+        handlers: List[logging.Handler] = [console_handler]
+        if self.path:
+            file_handler = logging.handlers.RotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+            )
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        return handlers
+
+    def start(self) -> None:
+        """Route all records of the root logger through the queue, replacing its current handlers"""
+        if self._listener is not None:
+            return
+        log_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(self.sample_rates))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+        root.addHandler(queue_handler)
+        root.setLevel(self.level)
+
+        self._listener = TruncatingQueueListener(
+            log_queue, *self._create_handlers(), max_field_chars=self.max_field_chars
+        )
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Write out queued records and stop the listener thread"""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+
+
+# Create an instance configuring the application's logging
+log_pipeline = LogPipeline(
+    path=Config.LOG_FILE,
+    level=Config.LOG_LEVEL,
+    max_bytes=Config.LOG_MAX_BYTES,
+    backup_count=Config.LOG_BACKUP_COUNT,
+    queue_size=Config.LOG_QUEUE_SIZE,
+    max_field_chars=Config.LOG_MAX_FIELD_CHARS,
+    sample_rates=Config.LOG_SAMPLE_RATES,
+)
@@ -0,0 +1,362 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, spanning fast cache lookups to slow local LLM generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str]) -> str:
+    if not label_names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label_value(value)}"' for name, value in zip(label_names, label_values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    Base class of a metric family with a fixed set of label names.
+
+    Samples may be recorded from the event loop as well as from worker threads (sync
+    upstream calls), so every update happens under a lock.
+
+    Attributes:
+        name (str): Metric name
+        documentation (str): Help text
+        label_names (Tuple[str, ...]): Names of the labels identifying each series
+    """
+
+    type_name = "untyped"
+    # Counters expose their samples (and therefore their family) with a _total suffix
+    family_suffix = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.label_names}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> List[Tuple[str, LabelValues, float, Tuple[Tuple[str, str], ...]]]:
+        """Get (suffix, label values, value, extra labels) tuples of all series"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Render the metric family in the Prometheus text exposition format"""
+        family = self.name + self.family_suffix
+        lines = [f"# HELP {family} {self.documentation}", f"# TYPE {family} {self.type_name}"]
+        for suffix, label_values, value, extra_labels in self.samples():
+            names = self.label_names + tuple(name for name, _ in extra_labels)
+            values = label_values + tuple(value for _, value in extra_labels)
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    type_name = "counter"
+    family_suffix = "_total"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Increase the count of the series identified by the labels"""
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        """Get the current count of a series"""
+        return self._values.get(self._label_values(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [("_total", key, value, ()) for key, value in self._values.items()]
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        """Set the value of the series identified by the labels"""
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Increase the value of the series identified by the labels"""
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        """Decrease the value of the series identified by the labels"""
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        """Get the current value of a series"""
+        return self._values.get(self._label_values(labels), 0)
+
+    @contextmanager
+    def track_in_progress(self, **labels) -> Iterator[None]:
+        """Count the enclosed operation as in progress until it exits"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self):
+        with self._lock:
+            return [("", key, value, ()) for key, value in self._values.items()]
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values over fixed buckets.
+
+    Attributes:
+        buckets (Tuple[float, ...]): Upper bounds of the buckets, ascending
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: non-cumulative bucket counts (with a trailing +Inf bucket), sum and count
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        """Record an observation in the series identified by the labels"""
+        key = self._label_values(labels)
+        index = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets)
+        )
+        with self._lock:
+            counts, totals = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0, 0]))
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the enclosed block, in seconds"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def get_count(self, **labels) -> int:
+        """Get the number of observations of a series"""
+        series = self._series.get(self._label_values(labels))
+        return int(series[1][1]) if series else 0
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, (total, count)) in self._series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += bucket_count
+                    samples.append(("_bucket", key, cumulative, (("le", _format_value(bound)),)))
+                samples.append(("_sum", key, total, ()))
+                samples.append(("_count", key, count, ()))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Registry of the application's metrics, rendered on the /metrics endpoint.
+
+    Attributes:
+        prefix (str): Prefix prepended to every metric name
+    """
+
+    def __init__(self, prefix: str = "") -> None:
+        self.prefix = prefix
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """Create and register a counter"""
+        return self._register(Counter(self.prefix + name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge"""
+        return self._register(Gauge(self.prefix + name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram"""
+        return self._register(Histogram(self.prefix + name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Create an instance shared by the whole application
+registry = MetricsRegistry(prefix="moragents_")
+
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status_code"]
+)
+chat_request_duration = registry.histogram(
+    "chat_request_duration_seconds",
+    "Chat request latency by responding agent",
+    ["agent", "response_type"],
+)
+routing_duration = registry.histogram(
+    "delegator_routing_duration_seconds", "Delegator agent selection latency", ["method"]
+)
+routing_continuations = registry.counter(
+    "routing_continuations",
+    "Follow-up checks that kept the previous agent (hit) or routed again (miss)",
+    ["result", "reason"],
+)
+llm_requests_in_flight = registry.gauge(
+    "llm_requests_in_flight", "LLM calls currently running", ["backend"]
+)
+llm_request_duration = registry.histogram(
+    "llm_request_duration_seconds", "LLM call latency", ["model"]
+)
+llm_tokens = registry.counter("llm_tokens", "Tokens processed by LLM calls", ["model", "direction"])
+upstream_requests = registry.counter(
+    "upstream_requests", "Calls made to upstream APIs and RPC nodes", ["upstream", "status_code"]
+)
+upstream_request_duration = registry.histogram(
+    "upstream_request_duration_seconds", "Upstream API and RPC call latency", ["upstream"]
+)
+admission_in_flight = registry.gauge(
+    "admission_in_flight", "Chat requests holding an admission slot"
+)
+admission_queue_depth = registry.gauge(
+    "admission_queue_depth", "Chat requests waiting for an admission slot"
+)
+admission_queue_wait = registry.histogram(
+    "admission_queue_wait_seconds", "Time chat requests spent queued"
+)
+admission_rejections = registry.counter(
+    "admission_rejections", "Chat requests rejected by admission control", ["reason"]
+)
+admission_bypassed = registry.counter(
+    "admission_bypassed", "Chat requests admitted without queueing"
+)
+chat_conversations = registry.gauge("chat_conversations", "Conversations held in memory")
+chat_evictions = registry.counter("chat_evictions", "Conversations evicted from memory", ["reason"])
+chat_messages_trimmed = registry.counter(
+    "chat_messages_trimmed", "Old messages dropped from conversations over the cap"
+)
+cache_lookups = registry.counter(
+    "cache_lookups", "Cache lookups by cache and result", ["cache", "result"]
+)
+rag_ingest_chunks = registry.counter(
+    "rag_ingest_chunks", "Document chunks embedded for uploaded documents"
+)
+rag_ingest_duration = registry.histogram(
+    "rag_ingest_duration_seconds", "Time spent embedding the chunks of an uploaded document"
+)
+rag_loaded_indexes = registry.gauge("rag_loaded_indexes", "Document indexes held in memory")
+rag_loaded_index_bytes = registry.gauge(
+    "rag_loaded_index_bytes", "Estimated memory of the document indexes held in memory"
+)
+rag_index_spills = registry.counter(
+    "rag_index_spills", "Document indexes dropped from memory, to be reloaded from disk when needed"
+)
+rag_index_evictions = registry.counter(
+    "rag_index_evictions",
+    "Saved document indexes deleted to keep the index store within its limits",
+)
+log_records_dropped = registry.counter(
+    "log_records_dropped",
+    "Log records dropped by sampling or because the log queue was full",
+    ["reason"],
+)
+cache_hit_ratio = registry.gauge(
+    "cache_hit_ratio", "Fraction of cache lookups that were hits", ["cache"]
+)
+
+
+def record_cache_lookup(cache: str, hit: bool, count: int = 1) -> None:
+    """Count cache lookups and refresh the cache's hit ratio"""
+    cache_lookups.inc(count, cache=cache, result="hit" if hit else "miss")
+    hits, misses = cache_lookups.get(cache=cache, result="hit"), cache_lookups.get(
+        cache=cache, result="miss"
+    )
+    if hits + misses:
+        cache_hit_ratio.set(hits / (hits + misses), cache=cache)
+
+
+def record_llm_call(model: Optional[str], seconds: float, response: Any) -> None:
+    """Record the latency and token usage of a completed LLM call"""
+    model = model or "unknown"
+    llm_request_duration.observe(seconds, model=model)
+    usage = getattr(response, "usage_metadata", None) or {}
+    for direction, key in (("prompt", "input_tokens"), ("completion", "output_tokens")):
+        if usage.get(key):
+            llm_tokens.inc(usage[key], model=model, direction=direction)
+
+
+def record_upstream_call(upstream: str, seconds: float, status_code: Optional[int]) -> None:
+    """Record an upstream call, with a None status code for calls that failed without a response"""
+    upstream_requests.inc(
+        upstream=upstream, status_code=status_code if status_code is not None else "error"
+    )
+    upstream_request_duration.observe(seconds, upstream=upstream)
@@ -0,0 +1,71 @@
+from fnmatch import fnmatchcase
+from typing import Any, Collection
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _encode_fallback(value: Any) -> Any:
+    # Called by orjson only for types it cannot serialize natively, e.g. Decimal or sets in agent
+    # metadata
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content with orjson, falling back to FastAPI's encoder for other types"""
+    return orjson.dumps(content, default=_encode_fallback, option=_ORJSON_OPTIONS)
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Format a server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    JSON response serialized in a single orjson pass.
+
+    Return it directly from route handlers: FastAPI sends Response objects as is, whereas
+    returned dictionaries first go through jsonable_encoder and are then encoded again.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class StreamingAwareGZipMiddleware:
+    """
+    Gzip middleware that leaves streaming endpoints uncompressed.
+
+    Compressing server-sent events or NDJSON makes proxies and some clients buffer the stream,
+    so requests to the excluded paths skip compression.
+
+    Attributes:
+        excluded_paths (Collection[str]): Request paths whose responses are never compressed; paths
+            containing `*` are glob patterns, e.g. "/rag/jobs/*/events"
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int = 1024, excluded_paths: Collection[str] = ()
+    ) -> None:
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, minimum_size=minimum_size)
+        self.excluded_paths = frozenset(path for path in excluded_paths if "*" not in path)
+        self.excluded_patterns = [path for path in excluded_paths if "*" in path]
+
+    def is_excluded(self, path: str) -> bool:
+        """Check whether responses to a request path are left uncompressed"""
+        return path in self.excluded_paths or any(
+            fnmatchcase(path, pattern) for pattern in self.excluded_patterns
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not self.is_excluded(scope["path"]):
+            await self.gzip_app(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
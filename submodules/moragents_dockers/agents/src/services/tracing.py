@@ -0,0 +1,288 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """
+    A timed operation within a trace.
+
+    Attributes:
+        name (str): Operation name, e.g. "agent.chat" or "upstream.http"
+        trace_id (str): Identifier shared by all spans of a trace
+        span_id (str): Identifier of this span
+        parent_id (Optional[str]): Identifier of the parent span, None for the root span
+        start_time (float): Unix timestamp at which the span started
+        end_time (Optional[float]): Unix timestamp at which the span ended
+        attributes (Dict[str, Any]): Free-form span attributes
+        status (str): "ok" or "error"
+        error (Optional[str]): Error description when the operation raised
+        children (List[Span]): Child spans, in start order
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time: float = field(default_factory=time.time)
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: Optional[str] = None
+    children: List["Span"] = field(default_factory=list)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Span duration in milliseconds, None while the span is still open"""
+        if self.end_time is None:
+            return None
+        return round((self.end_time - self.start_time) * 1000, 3)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set a span attribute"""
+        self.attributes[key] = value
+
+    def to_record(self) -> Dict[str, Any]:
+        """Convert the span (without children) to a flat record for export"""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+    def to_tree(self) -> Dict[str, Any]:
+        """Convert the span and its descendants to a nested dictionary"""
+        return {
+            "name": self.name,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            **({"error": self.error} if self.error else {}),
+            **({"attributes": self.attributes} if self.attributes else {}),
+            **({"children": [child.to_tree() for child in self.children]} if self.children else {}),
+        }
+
+    def iter_spans(self) -> Iterator["Span"]:
+        """Iterate over this span and all of its descendants"""
+        yield self
+        for child in self.children:
+            yield from child.iter_spans()
+
+
+class SpanExporter:
+    """
+    Appends finished traces to a local file as JSON lines, one span per line.
+
+    Writes happen on a background thread so request handlers never wait on disk I/O.
+
+    Attributes:
+        path (str): File the spans are appended to
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._queue: "queue.SimpleQueue[Dict[str, Any]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, root: Span) -> None:
+        """Queue all spans of a finished trace for writing"""
+        for span in root.iter_spans():
+            self._queue.put(span.to_record())
+        self._ensure_writer()
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._write_loop, name="span-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            records = [self._queue.get()]
+            while not self._queue.empty():
+                records.append(self._queue.get_nowait())
+            try:
+                with open(self.path, "a") as file:
+                    file.writelines(json.dumps(record, default=str) + "\n" for record in records)
+            except OSError as e:
+                logger.error(f"Failed to export {len(records)} spans to {self.path}: {str(e)}")
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Minimal in-process tracer.
+
+    The current span is kept in a context variable, so spans opened anywhere down the call
+    chain of a request (delegator, agents, LLM calls, tools, upstream calls) nest under the
+    request's root span without passing it around explicitly. No external collector is
+    needed: finished traces are optionally exported to a local JSON lines file.
+
+    Attributes:
+        enabled (bool): Whether spans are recorded at all
+        exporter (Optional[SpanExporter]): Exporter for finished traces
+    """
+
+    def __init__(self, enabled: bool, exporter: Optional[SpanExporter] = None) -> None:
+        self.enabled = enabled
+        self.exporter = exporter
+
+    def current_span(self) -> Optional[Span]:
+        """Get the span active in the current context"""
+        return _current_span.get()
+
+    def detached_context(self) -> contextvars.Context:
+        """
+        Copy the current context without its current span, for tasks that can outlive the request.
+
+        Spans of a task started in this context never attach to a request span that has already
+        ended and been exported; the task should open its own root span with trace().
+
+        Returns:
+            contextvars.Context: Context to start the task in, with
+                context.run(asyncio.create_task, coroutine)
+        """
+        context = contextvars.copy_context()
+        context.run(_current_span.set, None)
+        return context
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute on the current span, if any"""
+        span = _current_span.get()
+        if span is not None:
+            span.set_attribute(key, value)
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes) -> Span:
+        """
+        Start a span without making it current.
+
+        Used by callback-style instrumentation; prefer the span() context manager otherwise.
+
+        Args:
+            name (str): Operation name
+            parent (Optional[Span]): Parent span, defaults to the current span
+            **attributes: Initial span attributes
+
+        Returns:
+            Span: The started span
+        """
+        parent = parent if parent is not None else _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+        if parent is not None:
+            parent.children.append(span)
+        return span
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None) -> None:
+        """End a span, exporting the whole trace when the span is a root span"""
+        span.end_time = time.time()
+        if error is not None:
+            span.status = "error"
+            span.error = f"{type(error).__name__}: {error}"
+        if span.parent_id is None and self.exporter is not None:
+            self.exporter.export(span)
+
+    @contextmanager
+    def _activate(self, span: Span) -> Iterator[Span]:
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, error=e)
+            raise
+        else:
+            self.end_span(span)
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """
+        Record an operation as a child of the current span.
+
+        Args:
+            name (str): Operation name
+            **attributes: Initial span attributes
+
+        Yields:
+            Optional[Span]: The recorded span, None when tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+        with self._activate(self.start_span(name, **attributes)) as span:
+            yield span
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """Record an operation as the root span of a new trace"""
+        if not self.enabled:
+            yield None
+            return
+        root = Span(
+            name=name,
+            trace_id=uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            attributes=attributes,
+        )
+        with self._activate(root) as span:
+            yield span
+
+    def traced(self, name: str) -> Callable:
+        """Decorator recording every call of a sync or async function as a span"""
+
+        def decorator(func: Callable) -> Callable:
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+# Create an instance shared by the whole application
+tracer = Tracer(
+    enabled=Config.TRACING_ENABLED,
+    exporter=SpanExporter(Config.TRACE_EXPORT_PATH) if Config.TRACE_EXPORT_PATH else None,
+)
@@ -0,0 +1,94 @@
+import time
+from types import SimpleNamespace
+from typing import Optional
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+from src.config import Config
+from src.services.metrics import record_upstream_call
+from src.services.tracing import tracer
+
+
+def get_upstream_name(url: str) -> str:
+    """Get the friendly upstream name for a URL, falling back to its host name"""
+    host = urlparse(str(url)).hostname or "unknown"
+    return Config.UPSTREAM_NAMES.get(host, host)
+
+
+class InstrumentedSession(requests.Session):
+    """
+    requests session that records every upstream call as a tracing span and in upstream metrics.
+
+    Also usable as the session of a web3 HTTPProvider, which instruments RPC calls.
+
+    Attributes:
+        upstream (Optional[str]): Fixed upstream name, derived from each URL's host when None
+    """
+
+    def __init__(self, upstream: Optional[str] = None) -> None:
+        super().__init__()
+        self.upstream = upstream
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        upstream = self.upstream or get_upstream_name(url)
+        started_at = time.perf_counter()
+        with tracer.span(
+            "upstream.http", upstream=upstream, method=method, path=urlparse(str(url)).path
+        ) as span:
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except requests.RequestException:
+                record_upstream_call(upstream, time.perf_counter() - started_at, None)
+                raise
+            record_upstream_call(upstream, time.perf_counter() - started_at, response.status_code)
+            if span is not None:
+                span.set_attribute("status_code", response.status_code)
+            return response
+
+
+async def _on_request_start(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestStartParams,
+) -> None:
+    context.upstream = get_upstream_name(str(params.url))
+    context.started_at = time.perf_counter()
+    context.span = None
+    if tracer.enabled:
+        context.span = tracer.start_span(
+            "upstream.http",
+            upstream=context.upstream,
+            method=params.method,
+            path=params.url.path,
+        )
+
+
+async def _on_request_end(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: aiohttp.TraceRequestEndParams
+) -> None:
+    record_upstream_call(
+        context.upstream, time.perf_counter() - context.started_at, params.response.status
+    )
+    if context.span is not None:
+        context.span.set_attribute("status_code", params.response.status)
+        tracer.end_span(context.span)
+
+
+async def _on_request_exception(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestExceptionParams,
+) -> None:
+    record_upstream_call(context.upstream, time.perf_counter() - context.started_at, None)
+    if context.span is not None:
+        tracer.end_span(context.span, error=params.exception)
+
+
+def get_aiohttp_trace_config() -> aiohttp.TraceConfig:
+    """Create an aiohttp trace config recording each request as a tracing span and in metrics"""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_request_end.append(_on_request_end)
+    trace_config.on_request_exception.append(_on_request_exception)
+    return trace_config
@@ -1,10 +1,11 @@
 import importlib
 import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from typing import Any, Dict, List, Optional, Tuple
-from langchain_ollama import ChatOllama
 from langchain_community.embeddings import OllamaEmbeddings
-
+from langchain_ollama import ChatOllama
 from src.config import Config
 
 logger = logging.getLogger(__name__)
@@ -14,28 +15,39 @@ class AgentManager:
     """
     Manages the loading, selection and activation of agents in the system.
 
+    Each conversation can have its own active agent, which handles the conversation's requests
+    without going through the delegator. An agent activated by a slash command only handles that
+    command and is cleared by the next request without one; an agent that activates itself
+    mid-flow (sticky) stays active until it expires, is replaced or is cleared.
+
     Attributes:
-        active_agent (Optional[str]): Currently active agent name
+        active_agent_ttl (Optional[float]): Seconds an active agent stays active after being set,
+            None for no expiry
         selected_agents (List[str]): List of selected agent names
         config (Dict): Configuration dictionary for agents
         agents (Dict[str, Any]): Dictionary of loaded agent instances
         llm (ChatOllama): Language model instance
         embeddings (OllamaEmbeddings): Embeddings model instance
+        selection_listeners (List[Callable[[List[str]], None]]): Callbacks run on selection changes
     """
 
-    def __init__(self, config: Dict) -> None:
+    def __init__(self, config: Dict, active_agent_ttl: Optional[float] = None) -> None:
         """
         Initialize the AgentManager.
 
         Args:
             config (Dict): Configuration dictionary containing agent definitions
+            active_agent_ttl (float, optional): Seconds an active agent stays active after being set
         """
-        self.active_agent: Optional[str] = None
+        self.active_agent_ttl = active_agent_ttl
+        # Active agent, expiry time and stickiness per conversation, soonest expiry first
+        self._active_agents: "OrderedDict[str, Tuple[str, float, bool]]" = OrderedDict()
         self.selected_agents: List[str] = []
         self.config = config
         self.agents: Dict[str, Any] = {}
         self.llm: Optional[ChatOllama] = None
         self.embeddings: Optional[OllamaEmbeddings] = None
+        self.selection_listeners: List[Callable[[List[str]], None]] = []
 
         # Select first 6 agents by default
         self.set_selected_agents([agent["name"] for agent in config["agents"][:6]])
@@ -75,30 +87,78 @@ class AgentManager:
             self._load_agent(agent_config)
         logger.info(f"Loaded {len(self.agents)} agents")
 
-    def get_active_agent(self) -> Optional[str]:
+    def get_active_agent(self, conversation_id: str = "default") -> Optional[str]:
         """
-        Get the name of the currently active agent.
+        Get the name of the agent active in a conversation.
+
+        Args:
+            conversation_id (str): Conversation to look up. Defaults to "default"
 
         Returns:
             Optional[str]: Name of active agent or None if no agent is active
         """
-        return self.active_agent
+        entry = self._active_agents.get(conversation_id)
+        if entry is None:
+            return None
+        agent_name, expires_at, _ = entry
+        if expires_at <= time.time():
+            del self._active_agents[conversation_id]
+            return None
+        return agent_name
+
+    def set_active_agent(
+        self, agent_name: Optional[str], conversation_id: str = "default", sticky: bool = False
+    ) -> None:
+        """
+        Set the agent active in a conversation, restarting its expiry.
 
-    def set_active_agent(self, agent_name: Optional[str]) -> None:
+        Args:
+            agent_name (Optional[str]): Name of agent to activate, None to clear
+            conversation_id (str): Conversation to set the agent for. Defaults to "default"
+            sticky (bool): Keep the agent active across requests without a command until it expires,
+                for agents in the middle of a multi-step flow. Defaults to False
         """
-        Set the active agent.
+        if agent_name is None:
+            self.clear_active_agent(conversation_id)
+            return
+        now = time.time()
+        self._active_agents[conversation_id] = (
+            agent_name,
+            now + self.active_agent_ttl if self.active_agent_ttl else float("inf"),
+            sticky,
+        )
+        self._active_agents.move_to_end(conversation_id)
+        self._purge_expired_active_agents(now)
+
+    def clear_active_agent(self, conversation_id: str = "default") -> None:
+        """
+        Clear the agent active in a conversation.
 
         Args:
-            agent_name (Optional[str]): Name of agent to activate
+            conversation_id (str): Conversation to clear the agent of. Defaults to "default"
+        """
+        self._active_agents.pop(conversation_id, None)
 
-        Raises:
-            ValueError: If agent_name is not in selected_agents
+    def clear_command_agent(self, conversation_id: str = "default") -> None:
         """
-        self.active_agent = agent_name
+        Clear the agent active in a conversation unless it activated itself as sticky.
 
-    def clear_active_agent(self) -> None:
-        """Clear the currently active agent."""
-        self.active_agent = None
+        Called for requests without a slash command, so a command only applies to its own request.
+
+        Args:
+            conversation_id (str): Conversation to clear the agent of. Defaults to "default"
+        """
+        entry = self._active_agents.get(conversation_id)
+        if entry is not None and not entry[2]:
+            del self._active_agents[conversation_id]
+
+    def _purge_expired_active_agents(self, now: float) -> None:
+        """Drop expired active agents, visiting only those since entries are ordered by expiry"""
+        while self._active_agents:
+            conversation_id, (_, expires_at, _) = next(iter(self._active_agents.items()))
+            if expires_at > now:
+                break
+            del self._active_agents[conversation_id]
 
     def get_available_agents(self) -> List[Dict]:
         """
@@ -136,8 +196,21 @@ class AgentManager:
 
         self.selected_agents = agent_names
 
-        if self.active_agent not in agent_names:
-            self.clear_active_agent()
+        for conversation_id, (agent_name, _, _) in list(self._active_agents.items()):
+            if agent_name not in agent_names:
+                self.clear_active_agent(conversation_id)
+
+        for listener in self.selection_listeners:
+            listener(agent_names)
+
+    def add_selection_listener(self, listener: Callable[[List[str]], None]) -> None:
+        """
+        Register a callback invoked with the new selection whenever the selected agents change.
+
+        Args:
+            listener (Callable[[List[str]], None]): Callback receiving the selected agent names
+        """
+        self.selection_listeners.append(listener)
 
     def get_agent_config(self, agent_name: str) -> Optional[Dict]:
         """
@@ -200,4 +273,6 @@ class AgentManager:
 
 
 # Create an instance to act as a singleton store
-agent_manager_instance = AgentManager(Config.AGENTS_CONFIG)
+agent_manager_instance = AgentManager(
+    Config.AGENTS_CONFIG, active_agent_ttl=Config.ACTIVE_AGENT_TTL
+)
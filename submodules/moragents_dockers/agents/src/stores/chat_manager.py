@@ -1,7 +1,17 @@
+import asyncio
+import bisect
 import logging
 import time
-from typing import Dict, List, Optional
-from src.models.core import ChatMessage, Conversation, AgentResponse
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from src.config import Config
+from src.models.core import AgentResponse
+from src.services import metrics
+from src.stores.chat_persistence import ChatPersistence, SQLiteChatPersistence, StoredConversation
+from src.stores.chat_records import ConversationRecord, MessageRecord
+from src.stores.chat_search import ChatSearchIndex, make_snippet
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +27,36 @@ class ChatManager:
     - Clear conversation history
     - Get chat history in different formats
     - Delete conversations
+    - Search messages by keywords
+    - Bound memory use by evicting least recently used and idle conversations
+    - Persist conversations to an optional durable backend
 
     Each conversation starts with a default disclaimer message about the experimental nature
-    of the chatbot.
+    of the chatbot. The default conversation is never evicted.
+
+    Every message gets a sequence number that increases across all conversations, so clients
+    can poll for messages newer than the last one they have seen. With a persistence backend,
+    numbering resumes after the highest stored sequence number on restart.
+
+    With a persistence backend, conversations kept in memory act as a cache: a conversation
+    is loaded from the backend the first time it is accessed (including after an eviction or
+    a restart), and every change is handed to the backend, which writes it asynchronously.
+    The message cap only bounds memory; the backend keeps the full history, which paging and
+    range reads fall back to for messages older than those held in memory. Those reads run in
+    worker threads, and request handlers call load_conversation before using a conversation,
+    so the event loop does not wait on the backend.
+
+    Messages are held as compact MessageRecord objects; dictionaries are only built for the
+    messages a caller asks for. Messages of the conversations held in memory are also kept in
+    a full-text search index, updated as messages are added, trimmed, cleared or evicted.
 
     Attributes:
-        conversations (Dict[str, Conversation]): Dictionary mapping conversation IDs to Conversation objects
-        default_message (ChatMessage): Default disclaimer message added to new conversations
+        conversations (Dict[str, ConversationRecord]): Conversation records by conversation ID
+        default_message (MessageRecord): Default disclaimer message shared by all conversations
+        max_conversations (Optional[int]): Maximum number of evictable conversations kept in memory
+        max_messages (Optional[int]): Maximum number of messages kept in memory per conversation
+        idle_ttl (Optional[float]): Seconds after which an unused conversation is evicted
+        persistence (Optional[ChatPersistence]): Durable backend, None to keep history in memory
 
     Example:
         >>> chat_manager = ChatManager()
@@ -31,21 +64,43 @@ class ChatManager:
         >>> messages = chat_manager.get_messages("conv1")
     """
 
-    def __init__(self) -> None:
-        self.conversations: Dict[str, Conversation] = {}
-        self.default_message = ChatMessage(
+    PROTECTED_CONVERSATIONS = frozenset({"default"})
+
+    def __init__(
+        self,
+        max_conversations: Optional[int] = None,
+        max_messages: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        persistence: Optional[ChatPersistence] = None,
+    ) -> None:
+        self.conversations: Dict[str, ConversationRecord] = {}
+        self.max_conversations = max_conversations
+        self.max_messages = max_messages
+        self.idle_ttl = idle_ttl
+        self.persistence = persistence
+        self.search_index = ChatSearchIndex()
+        # Last access time per conversation, least recently used first
+        self._last_accessed: "OrderedDict[str, float]" = OrderedDict()
+        self._sweeper_task: Optional[asyncio.Task] = None
+        # Sequence numbers held by clients as cursors must not be handed out again after a restart
+        self._last_sequence = persistence.get_last_sequence() if persistence else 0
+        # Distinguishes ETags issued by this process from those of a previous run or another replica
+        self._instance_id = uuid.uuid4().hex[:8]
+        self.default_message = MessageRecord(
             role="assistant",
             agentName="Morpheus AI",
-            content="""This highly experimental chatbot is not intended for making important decisions. Its
-                        responses are generated using AI models and may not always be accurate.
-                        By using this chatbot, you acknowledge that you use it at your own discretion
-                        and assume all risks associated with its limitations and potential errors.""",
-            metadata={},
-            requires_action=False,
+            content=(
+                "This highly experimental chatbot is not intended for making important decisions. "
+                "Its responses are generated using AI models and may not always be accurate. By "
+                "using this chatbot, you acknowledge that you use it at your own discretion and "
+                "assume all risks associated with its limitations and potential errors."
+            ),
+            timestamp=time.time(),
+            sequence=0,
         )
 
         # Initialize with default conversation
-        self.conversations["default"] = Conversation(messages=[self.default_message], has_uploaded_file=False)
+        self._get_or_create_conversation("default")
 
     def _get_conversation_id(self, conversation_id: Optional[str] = None) -> str:
         """Helper method to get conversation ID, defaulting to 'default' if None provided"""
@@ -56,44 +111,299 @@ class ChatManager:
         Get all messages for a specific conversation.
 
         Args:
-            conversation_id (str, optional): Unique identifier for the conversation. Defaults to "default"
+            conversation_id (str, optional): Unique identifier for the conversation. Defaults to
+                "default"
 
         Returns:
             List[Dict[str, str]]: List of messages as dictionaries
         """
         conversation = self._get_or_create_conversation(self._get_conversation_id(conversation_id))
-        return [msg.dict() for msg in conversation.messages]
+        return [msg.to_dict() for msg in conversation.messages]
+
+    async def get_messages_page(
+        self,
+        conversation_id: Optional[str] = None,
+        since: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, str]], int, bool]:
+        """
+        Get the messages of a conversation that come after a cursor.
+
+        Args:
+            conversation_id (str, optional): Unique identifier for the conversation. Defaults to
+                "default"
+            since (int, optional): Sequence number of the last message already fetched, None to
+                start from the beginning
+            limit (int, optional): Maximum number of messages to return, None for all
 
-    def add_message(self, message: Dict[str, str], conversation_id: Optional[str] = None):
+        Returns:
+            Tuple[List[Dict[str, str]], int, bool]: Messages as dictionaries, the cursor to pass as
+            `since`
+            on the next call, and whether more messages are available after this page
+        """
+        conversation_id = self._get_conversation_id(conversation_id)
+        conversation = self._get_or_create_conversation(conversation_id)
+        # When the page starts before the messages held in memory, one extra stored message tells
+        # whether more follow
+        stored = await self._load_trimmed_messages(
+            conversation_id, conversation, since or 0, None, None if limit is None else limit + 1
+        )
+        messages = conversation.messages
+        start = (
+            0
+            if since is None
+            else bisect.bisect_right(messages, since, key=lambda msg: msg.sequence)
+        )
+        if stored is not None:
+            messages = (messages[:1] if since is None else []) + stored + messages[1:]
+            start = 0
+        end = len(messages) if limit is None else min(start + limit, len(messages))
+        page = messages[start:end]
+        cursor = page[-1].sequence if page else since or 0
+        return [msg.to_dict() for msg in page], cursor, end < len(messages)
+
+    def get_messages_etag(
+        self,
+        conversation_id: Optional[str] = None,
+        since: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> str:
+        """
+        Get an ETag identifying a page of a conversation's messages in its current state.
+
+        Sequence numbers are never reused within a process, so the ETag changes whenever a
+        message is added or the conversation is cleared, deleted or recreated. Pages of the same
+        state fetched with different cursors or limits get different ETags.
+
+        Args:
+            conversation_id (str, optional): Unique identifier for the conversation. Defaults to
+                "default"
+            since (int, optional): Cursor the page is fetched from
+            limit (int, optional): Maximum number of messages in the page
+
+        Returns:
+            str: Weak ETag value
+        """
+        conversation = self._get_or_create_conversation(self._get_conversation_id(conversation_id))
+        return f'W/"{self._instance_id}-{conversation.last_sequence}-{since}-{limit}"'
+
+    def get_recent_messages(
+        self, conversation_id: str, token_budget: int, before_sequence: Optional[int] = None
+    ) -> Tuple[List[MessageRecord], Optional[int]]:
+        """
+        Get the most recent messages of a conversation that fit within a token budget.
+
+        Token estimates are cached per message and each conversation keeps a running total,
+        so a conversation that fits the budget is returned without counting, and otherwise
+        only the returned window is walked.
+
+        Args:
+            conversation_id (str): Unique identifier for the conversation
+            token_budget (int): Maximum estimated tokens of the returned messages
+            before_sequence (int, optional): Only consider messages older than this sequence number,
+                e.g. the prompt being answered
+
+        Returns:
+            Tuple[List[MessageRecord], Optional[int]]: Messages oldest first, excluding the opening
+            disclaimer, and the sequence number of the newest message left out of the window
+            (None when the window holds the whole history)
+        """
+        conversation = self._get_or_create_conversation(conversation_id)
+        messages = conversation.messages
+        end = len(messages)
+        if before_sequence is not None:
+            end = bisect.bisect_left(messages, before_sequence, key=lambda msg: msg.sequence)
+
+        if (
+            conversation.token_total - sum(msg.token_estimate for msg in messages[end:])
+            <= token_budget
+        ):
+            return messages[1:end], None
+
+        start, used = end, 0
+        while start > 1 and used + messages[start - 1].token_estimate <= token_budget:
+            start -= 1
+            used += messages[start].token_estimate
+        return messages[start:end], messages[start - 1].sequence
+
+    async def get_messages_between(
+        self, conversation_id: str, after_sequence: int, through_sequence: int
+    ) -> List[MessageRecord]:
+        """
+        Get the messages of a conversation within a sequence number range.
+
+        Args:
+            conversation_id (str): Unique identifier for the conversation
+            after_sequence (int): Exclusive lower bound of the range
+            through_sequence (int): Inclusive upper bound of the range
+
+        Returns:
+            List[MessageRecord]: Messages oldest first, excluding the opening disclaimer
+        """
+        conversation = self._get_or_create_conversation(conversation_id)
+        stored = await self._load_trimmed_messages(
+            conversation_id, conversation, after_sequence, through_sequence
+        )
+        messages = conversation.messages
+        start = max(1, bisect.bisect_right(messages, after_sequence, key=lambda msg: msg.sequence))
+        end = bisect.bisect_right(messages, through_sequence, key=lambda msg: msg.sequence)
+        return (stored or []) + messages[start:end]
+
+    async def _load_trimmed_messages(
+        self,
+        conversation_id: str,
+        conversation: ConversationRecord,
+        after_sequence: int,
+        through_sequence: Optional[int],
+        limit: Optional[int] = None,
+    ) -> Optional[List[MessageRecord]]:
+        """
+        Read messages trimmed from memory back from the persistence backend in a worker thread.
+
+        Returns:
+            Optional[List[MessageRecord]]: Stored messages after after_sequence, through
+            through_sequence and at most through the trimmed ones; None if no trimmed message
+            comes after after_sequence
+        """
+        while self.persistence and after_sequence < conversation.trimmed_through:
+            trimmed_through = conversation.trimmed_through
+            if through_sequence is not None:
+                trimmed_through = min(through_sequence, trimmed_through)
+            stored = await asyncio.to_thread(
+                self.persistence.load_messages,
+                conversation_id,
+                after_sequence,
+                trimmed_through,
+                limit,
+            )
+            # Messages trimmed while reading would fall between the stored and in-memory ones
+            if trimmed_through in (conversation.trimmed_through, through_sequence):
+                return stored
+        return None
+
+    def search_messages(
+        self, query: str, conversation_id: Optional[str] = None, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the messages of the conversations held in memory, ranked by relevance.
+
+        Args:
+            query (str): Search terms
+            conversation_id (str, optional): Only search this conversation, None to search them all
+            limit (int): Maximum number of results
+
+        Returns:
+            List[Dict[str, Any]]: Matching messages, best first, with their conversation ID,
+                relevance score and a snippet of the content around the first matching term
+        """
+        results = []
+        for matched_conversation_id, sequence, score in self.search_index.search(
+            query, conversation_id, limit
+        ):
+            messages = self.conversations[matched_conversation_id].messages
+            message = messages[bisect.bisect_left(messages, sequence, key=lambda msg: msg.sequence)]
+            results.append(
+                {
+                    "conversation_id": matched_conversation_id,
+                    "score": round(score, 4),
+                    "snippet": make_snippet(message.content, query),
+                    **message.to_dict(),
+                }
+            )
+        return results
+
+    def get_last_exchange(
+        self, conversation_id: str, before_sequence: Optional[int] = None
+    ) -> Optional[Tuple[Optional[MessageRecord], MessageRecord]]:
+        """
+        Get the latest agent response of a conversation and the user message it answered.
+
+        Args:
+            conversation_id (str): Unique identifier for the conversation
+            before_sequence (int, optional): Only consider messages older than this sequence number,
+                e.g. the prompt being routed
+
+        Returns:
+            Optional[Tuple[Optional[MessageRecord], MessageRecord]]: The preceding user message
+                (None if there is none) and the response, or None if no agent has responded yet
+        """
+        messages = self._get_or_create_conversation(conversation_id).messages
+        end = len(messages)
+        if before_sequence is not None:
+            end = bisect.bisect_left(messages, before_sequence, key=lambda msg: msg.sequence)
+
+        # The opening disclaimer (index 0) is not an agent response
+        for index in range(end - 1, 0, -1):
+            if messages[index].role == "assistant" and messages[index].agentName:
+                prompt = next(
+                    (msg for msg in reversed(messages[1:index]) if msg.role == "user"), None
+                )
+                return prompt, messages[index]
+        return None
+
+    def get_cleared_sequence(self, conversation_id: str) -> int:
+        """Get the sequence number of the last time a conversation was cleared, 0 if never"""
+        return self._get_or_create_conversation(conversation_id).cleared_sequence
+
+    def _next_sequence(self, conversation: ConversationRecord) -> int:
+        """Allocate a sequence number for a change to a conversation"""
+        # Conversations loaded from storage may hold sequence numbers from a previous run
+        self._last_sequence = max(self._last_sequence, conversation.last_sequence) + 1
+        conversation.last_sequence = self._last_sequence
+        return self._last_sequence
+
+    def add_message(self, message: Dict[str, str], conversation_id: Optional[str] = None) -> int:
         """
         Add a new message to a conversation.
 
         Args:
             message (Dict[str, str]): Message to add
             conversation_id (str, optional): Conversation to add message to. Defaults to "default"
+
+        Returns:
+            int: Sequence number assigned to the message
         """
-        conversation_id = self._get_conversation_id(conversation_id)
+        return self._append_message(
+            MessageRecord.from_dict(message), self._get_conversation_id(conversation_id)
+        )
+
+    def _append_message(self, chat_message: MessageRecord, conversation_id: str) -> int:
+        """Append a message record to a conversation, returning its sequence number"""
         conversation = self._get_or_create_conversation(conversation_id)
-        chat_message = ChatMessage(**message)
-        if "timestamp" not in message:
-            chat_message.timestamp = time.time()
+        chat_message.sequence = self._next_sequence(conversation)
         conversation.messages.append(chat_message)
-        logger.info(f"Added message to conversation {conversation_id}: {chat_message.content}")
-
-    def add_response(self, response: Dict[str, str], agent_name: str, conversation_id: Optional[str] = None):
+        conversation.token_total += chat_message.token_estimate
+        if self.persistence:
+            self.persistence.append_message(conversation_id, chat_message)
+        self.search_index.add(conversation_id, chat_message.sequence, chat_message.content)
+        self._trim_messages(conversation_id, conversation)
+        logger.info(
+            f"Added message {chat_message.sequence} to conversation {conversation_id}",
+            extra={"content": chat_message.content},
+        )
+        return chat_message.sequence
+
+    def add_response(
+        self,
+        response: Union[AgentResponse, Dict[str, str]],
+        agent_name: str,
+        conversation_id: Optional[str] = None,
+    ):
         """
         Add an agent's response to a conversation.
 
         Args:
-            response (Dict[str, str]): Response content
+            response (Union[AgentResponse, Dict[str, str]]): Response, or its content as a dict
             agent_name (str): Name of the responding agent
             conversation_id (str, optional): Conversation to add response to. Defaults to "default"
         """
-        # Convert the dictionary to an AgentResponse first
-        agent_response = AgentResponse(**response)
-        # Then convert to ChatMessage
-        chat_message = agent_response.to_chat_message(agent_name)
-        self.add_message(chat_message.dict(), self._get_conversation_id(conversation_id))
+        agent_response = (
+            response if isinstance(response, AgentResponse) else AgentResponse(**response)
+        )
+        self._append_message(
+            MessageRecord.from_agent_response(agent_response, agent_name),
+            self._get_conversation_id(conversation_id),
+        )
         logger.info(f"Added response from agent {agent_name} to conversation {conversation_id}")
 
     def set_uploaded_file(self, has_file: bool, conversation_id: Optional[str] = None):
@@ -104,8 +414,11 @@ class ChatManager:
             has_file (bool): Whether file is uploaded
             conversation_id (str, optional): Target conversation. Defaults to "default"
         """
-        conversation = self._get_or_create_conversation(self._get_conversation_id(conversation_id))
+        conversation_id = self._get_conversation_id(conversation_id)
+        conversation = self._get_or_create_conversation(conversation_id)
         conversation.has_uploaded_file = has_file
+        if self.persistence:
+            self.persistence.save_conversation(conversation_id, has_file)
         logger.info(f"Set uploaded file status to {has_file} for conversation {conversation_id}")
 
     def get_uploaded_file_status(self, conversation_id: Optional[str] = None) -> bool:
@@ -128,8 +441,15 @@ class ChatManager:
         Args:
             conversation_id (str, optional): Conversation to clear. Defaults to "default"
         """
-        conversation = self._get_or_create_conversation(self._get_conversation_id(conversation_id))
+        conversation_id = self._get_conversation_id(conversation_id)
+        conversation = self._get_or_create_conversation(conversation_id)
         conversation.messages = [self.default_message]  # Keep the initial message
+        self.search_index.remove_conversation(conversation_id)
+        conversation.token_total = 0
+        conversation.trimmed_through = 0
+        conversation.cleared_sequence = self._next_sequence(conversation)
+        if self.persistence:
+            self.persistence.clear_messages(conversation_id, conversation.cleared_sequence)
         logger.info(f"Cleared message history for conversation {conversation_id}")
 
     def get_last_message(self, conversation_id: Optional[str] = None) -> Dict[str, str]:
@@ -143,7 +463,7 @@ class ChatManager:
             Dict[str, str]: Last message or empty dict if no messages
         """
         conversation = self._get_or_create_conversation(self._get_conversation_id(conversation_id))
-        return conversation.messages[-1].dict() if conversation.messages else {}
+        return conversation.messages[-1].to_dict() if conversation.messages else {}
 
     def get_chat_history(self, conversation_id: Optional[str] = None) -> str:
         """
@@ -158,14 +478,20 @@ class ChatManager:
         conversation = self._get_or_create_conversation(self._get_conversation_id(conversation_id))
         return "\n".join([f"{msg.role}: {msg.content}" for msg in conversation.messages])
 
-    def get_all_conversation_ids(self) -> List[str]:
+    async def get_all_conversation_ids(self) -> List[str]:
         """
         Get a list of all conversation IDs.
 
         Returns:
             List[str]: List of conversation IDs
         """
-        return list(self.conversations.keys())
+        # Include stored conversations that were not loaded (or were evicted) in this process
+        stored_ids = []
+        if self.persistence:
+            stored_ids = await asyncio.to_thread(self.persistence.get_conversation_ids)
+        conversation_ids = list(self.conversations.keys())
+        loaded = set(conversation_ids)
+        return conversation_ids + [stored_id for stored_id in stored_ids if stored_id not in loaded]
 
     def delete_conversation(self, conversation_id: Optional[str] = None):
         """
@@ -175,8 +501,10 @@ class ChatManager:
             conversation_id (str, optional): ID of conversation to delete. Defaults to "default"
         """
         conversation_id = self._get_conversation_id(conversation_id)
+        if self.persistence:
+            self.persistence.delete_conversation(conversation_id)
         if conversation_id in self.conversations:
-            del self.conversations[conversation_id]
+            self._remove_conversation(conversation_id)
             logger.info(f"Deleted conversation {conversation_id}")
 
     def create_conversation(self, conversation_id: Optional[str] = None) -> Dict:
@@ -189,23 +517,197 @@ class ChatManager:
         Returns:
             Dict: Created conversation as dictionary
         """
-        conversation = self._get_or_create_conversation(self._get_conversation_id(conversation_id))
-        return conversation.dict()
+        conversation_id = self._get_conversation_id(conversation_id)
+        conversation = self._get_or_create_conversation(conversation_id)
+        if self.persistence:
+            self.persistence.save_conversation(conversation_id, conversation.has_uploaded_file)
+        return conversation.to_dict()
 
-    def _get_or_create_conversation(self, conversation_id: str) -> Conversation:
+    async def load_conversation(self, conversation_id: Optional[str] = None) -> None:
+        """
+        Load a conversation from the persistence backend into memory in a worker thread.
+
+        Request handlers call this before using a conversation, so that the other methods find
+        it in memory instead of reading it from the backend on the event loop.
+
+        Args:
+            conversation_id (str, optional): Conversation to load. Defaults to "default"
+        """
+        conversation_id = self._get_conversation_id(conversation_id)
+        if self.persistence and conversation_id not in self.conversations:
+            stored = await asyncio.to_thread(
+                self.persistence.load_conversation, conversation_id, self._load_limit
+            )
+            # The conversation may have been created while it was being read
+            if conversation_id not in self.conversations:
+                self._touch(conversation_id)
+                self._add_conversation(conversation_id, stored)
+        self._get_or_create_conversation(conversation_id)
+
+    @property
+    def _load_limit(self) -> Optional[int]:
+        """Number of stored messages loaded with a conversation; older ones are read on demand"""
+        return None if self.max_messages is None else max(self.max_messages - 1, 1)
+
+    def _touch(self, conversation_id: str) -> None:
+        self._last_accessed[conversation_id] = time.time()
+        self._last_accessed.move_to_end(conversation_id)
+
+    def _get_or_create_conversation(self, conversation_id: str) -> ConversationRecord:
         """
-        Get existing conversation or create new one if not exists.
+        Get existing conversation, loading it from the persistence backend or creating a new one if
+        not in memory.
 
         Args:
             conversation_id (str): Conversation ID to get/create
 
         Returns:
-            Conversation: Retrieved or created conversation
+            ConversationRecord: Retrieved or created conversation
         """
+        self._touch(conversation_id)
         if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = Conversation(messages=[self.default_message], has_uploaded_file=False)
+            stored = None
+            if self.persistence:
+                stored = self.persistence.load_conversation(conversation_id, self._load_limit)
+            self._add_conversation(conversation_id, stored)
         return self.conversations[conversation_id]
 
+    def _add_conversation(self, conversation_id: str, stored: Optional[StoredConversation]) -> None:
+        """Add a conversation to memory, as stored by the persistence backend or new"""
+        limit = self._load_limit
+        if stored is None:
+            # Context derived from an earlier conversation with the same ID must not carry over
+            conversation = ConversationRecord(
+                messages=[self.default_message],
+                has_uploaded_file=False,
+                cleared_sequence=self._last_sequence,
+            )
+        else:
+            messages = stored.messages
+            conversation = ConversationRecord(
+                messages=[self.default_message, *messages],
+                has_uploaded_file=stored.has_uploaded_file,
+                last_sequence=max([stored.last_sequence, *(msg.sequence or 0 for msg in messages)]),
+                cleared_sequence=stored.cleared_sequence,
+                trimmed_through=(
+                    (messages[0].sequence or 0) - 1 if limit and len(messages) >= limit else 0
+                ),
+            )
+            self._trim_messages(conversation_id, conversation)
+            for msg in conversation.messages[1:]:
+                self.search_index.add(conversation_id, msg.sequence, msg.content)
+        self.conversations[conversation_id] = conversation
+        self._evict_least_recently_used()
+        metrics.chat_conversations.set(len(self.conversations))
+
+    def _remove_conversation(self, conversation_id: str) -> None:
+        """Drop a conversation and its bookkeeping"""
+        del self.conversations[conversation_id]
+        self._last_accessed.pop(conversation_id, None)
+        self.search_index.remove_conversation(conversation_id)
+        metrics.chat_conversations.set(len(self.conversations))
+
+    def _evict(self, conversation_id: str, reason: str) -> None:
+        """Evict a conversation from memory, counting the eviction by reason"""
+        self._remove_conversation(conversation_id)
+        metrics.chat_evictions.inc(reason=reason)
+        logger.info(f"Evicted conversation {conversation_id} ({reason})")
+
+    def _evict_least_recently_used(self) -> None:
+        """Evict least recently used conversations until the conversation cap is respected"""
+        if self.max_conversations is None:
+            return
+        protected = sum(
+            1
+            for conversation_id in self.PROTECTED_CONVERSATIONS
+            if conversation_id in self.conversations
+        )
+        excess = len(self.conversations) - protected - self.max_conversations
+        if excess <= 0:
+            return
+        least_recently_used = []
+        for conversation_id in self._last_accessed:
+            if len(least_recently_used) == excess:
+                break
+            if conversation_id not in self.PROTECTED_CONVERSATIONS:
+                least_recently_used.append(conversation_id)
+        for conversation_id in least_recently_used:
+            self._evict(conversation_id, "lru")
+
+    def _trim_messages(self, conversation_id: str, conversation: ConversationRecord) -> None:
+        """Drop the oldest messages beyond the per-conversation cap, keeping the opening message"""
+        if self.max_messages is None or len(conversation.messages) <= self.max_messages:
+            return
+        excess = len(conversation.messages) - max(self.max_messages, 1)
+        conversation.token_total -= sum(
+            msg.token_estimate for msg in conversation.messages[1 : excess + 1]
+        )
+        for msg in conversation.messages[1 : excess + 1]:
+            self.search_index.remove(conversation_id, msg.sequence, msg.content)
+        conversation.trimmed_through = conversation.messages[excess].sequence or 0
+        del conversation.messages[1 : excess + 1]
+        metrics.chat_messages_trimmed.inc(excess)
+
+    def sweep_idle_conversations(self, now: Optional[float] = None) -> int:
+        """
+        Evict conversations that have not been accessed within the idle TTL.
+
+        Args:
+            now (float, optional): Current time, defaults to time.time()
+
+        Returns:
+            int: Number of evicted conversations
+        """
+        if self.idle_ttl is None:
+            return 0
+        cutoff = (now or time.time()) - self.idle_ttl
+        idle = []
+        for conversation_id, last_accessed in self._last_accessed.items():
+            # Access times are ordered, so every following conversation was used more recently
+            if last_accessed >= cutoff:
+                break
+            if conversation_id not in self.PROTECTED_CONVERSATIONS:
+                idle.append(conversation_id)
+        for conversation_id in idle:
+            self._evict(conversation_id, "idle")
+        return len(idle)
+
+    async def _sweep_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.sweep_idle_conversations()
+            except Exception as e:
+                logger.error(f"Error sweeping idle conversations: {str(e)}")
+
+    def start_sweeper(self, interval: float) -> None:
+        """Start evicting idle conversations in the background every interval seconds"""
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.create_task(self._sweep_periodically(interval))
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper"""
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            self._sweeper_task = None
+
+    def close(self) -> None:
+        """Stop background work and write pending changes to the persistence backend"""
+        self.stop_sweeper()
+        if self.persistence:
+            self.persistence.close()
+
 
 # Create an instance to act as a singleton store
-chat_manager_instance = ChatManager()
+chat_manager_instance = ChatManager(
+    max_conversations=Config.CHAT_MAX_CONVERSATIONS,
+    max_messages=Config.CHAT_MAX_MESSAGES,
+    idle_ttl=Config.CHAT_IDLE_TTL,
+    persistence=(
+        SQLiteChatPersistence(
+            Config.CHAT_DB_PATH, Config.CHAT_DB_FLUSH_INTERVAL, Config.CHAT_DB_BATCH_SIZE
+        )
+        if Config.CHAT_DB_PATH
+        else None
+    ),
+)
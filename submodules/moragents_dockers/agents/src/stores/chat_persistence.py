@@ -0,0 +1,364 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.stores.chat_records import MessageRecord
+
+logger = logging.getLogger(__name__)
+
+Statement = Tuple[str, Sequence[Any]]
+
+
+class StoredConversation(NamedTuple):
+    """
+    A conversation as loaded from a persistence backend.
+
+    Attributes:
+        messages (List[MessageRecord]): Stored messages, oldest first
+        has_uploaded_file (bool): Whether a file was uploaded to the conversation
+        last_sequence (int): Sequence number of the latest change to the conversation
+        cleared_sequence (int): Sequence number of the last clear, 0 if never cleared
+    """
+
+    messages: List[MessageRecord]
+    has_uploaded_file: bool
+    last_sequence: int
+    cleared_sequence: int
+
+
+class ChatPersistence(ABC):
+    """
+    Durable storage behind the in-memory ChatManager.
+
+    ChatManager stays the hot cache: it reads a conversation from the backend the first time
+    the conversation is accessed in this process, reads older messages when a caller asks for
+    history it no longer holds in memory, and reports every change so the backend can persist
+    it. The backend keeps the full history; the opening disclaimer message is not stored. It
+    also keeps the highest sequence number handed out, so that sequence numbers keep increasing
+    across restarts and cursors held by clients stay valid.
+    """
+
+    @abstractmethod
+    def load_conversation(
+        self, conversation_id: str, limit: Optional[int] = None
+    ) -> Optional[StoredConversation]:
+        """
+        Load a stored conversation.
+
+        Args:
+            conversation_id (str): Conversation to load
+            limit (int, optional): Only load the newest `limit` messages, None for all
+
+        Returns:
+            Optional[StoredConversation]: The conversation, None if not stored
+        """
+
+    @abstractmethod
+    def get_last_sequence(self) -> int:
+        """Get the highest sequence number of any stored change, including deleted conversations"""
+
+    @abstractmethod
+    def get_conversation_ids(self) -> List[str]:
+        """Get the IDs of all stored conversations, oldest first"""
+
+    @abstractmethod
+    def save_conversation(self, conversation_id: str, has_uploaded_file: bool) -> None:
+        """Store a conversation's metadata, creating the conversation if needed"""
+
+    @abstractmethod
+    def append_message(self, conversation_id: str, message: MessageRecord) -> None:
+        """Store a message at the end of a conversation"""
+
+    @abstractmethod
+    def load_messages(
+        self,
+        conversation_id: str,
+        after_sequence: int,
+        through_sequence: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[MessageRecord]:
+        """
+        Load stored messages of a conversation within a sequence number range.
+
+        Args:
+            conversation_id (str): Conversation to load messages of
+            after_sequence (int): Exclusive lower bound of the range
+            through_sequence (int, optional): Inclusive upper bound of the range, None for no bound
+            limit (int, optional): Maximum number of messages, None for all
+
+        Returns:
+            List[MessageRecord]: Messages oldest first
+        """
+
+    @abstractmethod
+    def clear_messages(self, conversation_id: str, cleared_sequence: int) -> None:
+        """Drop all stored messages of a conversation, cleared as change cleared_sequence"""
+
+    @abstractmethod
+    def delete_conversation(self, conversation_id: str) -> None:
+        """Drop a conversation and its messages"""
+
+    def flush(self) -> None:
+        """Wait until all reported changes are durable"""
+
+    def close(self) -> None:
+        """Flush pending changes and release resources"""
+
+
+class SQLiteChatPersistence(ChatPersistence):
+    """
+    SQLite conversation store with write-behind batching.
+
+    Changes are queued and written by a background thread, which groups everything queued
+    within flush_interval seconds into a single transaction, so request handlers never wait
+    on disk I/O. The database runs in WAL mode, letting reads proceed while a batch is being
+    committed and letting several processes share the file.
+
+    Attributes:
+        path (str): Database file path
+        flush_interval (float): Maximum seconds a change waits before being written
+        batch_size (int): Maximum number of changes written per transaction
+    """
+
+    # Queue markers: _FLUSH ends the current batch early, _STOP also ends the writer thread
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(self, path: str, flush_interval: float = 0.5, batch_size: int = 200) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                id TEXT PRIMARY KEY,
+                has_uploaded_file INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_sequence INTEGER NOT NULL DEFAULT 0,
+                cleared_sequence INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                sequence INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS messages_conversation ON messages (conversation_id, id);
+            CREATE TABLE IF NOT EXISTS sequences (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                last_sequence INTEGER NOT NULL
+            );
+            """)
+        self._migrate(connection)
+
+        self._writer = threading.Thread(
+            target=self._write_loop, name="chat-persistence", daemon=True
+        )
+        self._writer.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection to the database"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            # WAL keeps the database consistent on crashes without syncing on every commit
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _migrate(connection: sqlite3.Connection) -> None:
+        """Add the sequence columns to databases created before them, filled from stored messages"""
+        columns = [name for (_, name, *_) in connection.execute("PRAGMA table_info(messages)")]
+        conversation_columns = [
+            name for (_, name, *_) in connection.execute("PRAGMA table_info(conversations)")
+        ]
+        with connection:
+            if "sequence" not in columns:
+                connection.execute("ALTER TABLE messages ADD COLUMN sequence INTEGER")
+                connection.execute(
+                    "UPDATE messages SET sequence = json_extract(data, '$.sequence')"
+                )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS messages_sequence "
+                "ON messages (conversation_id, sequence)"
+            )
+            if "last_sequence" not in conversation_columns:
+                for column in ("last_sequence", "cleared_sequence"):
+                    connection.execute(
+                        f"ALTER TABLE conversations ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+                    )
+                connection.execute(
+                    "UPDATE conversations SET last_sequence = COALESCE((SELECT MAX(sequence) "
+                    "FROM messages WHERE conversation_id = conversations.id), 0)"
+                )
+            connection.execute(
+                "INSERT OR IGNORE INTO sequences (id, last_sequence) "
+                "SELECT 0, COALESCE(MAX(sequence), 0) FROM messages"
+            )
+
+    def _submit(self, *statements: Statement) -> None:
+        self._queue.put(statements)
+
+    def _write_loop(self) -> None:
+        connection = self._connection()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] not in (self._FLUSH, self._STOP) and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            changes = [change for change in batch if change not in (self._FLUSH, self._STOP)]
+            try:
+                with connection:
+                    for statements in changes:
+                        for sql, params in statements:
+                            connection.execute(sql, params)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to persist {len(changes)} chat changes: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if batch[-1] is self._STOP:
+                connection.close()
+                return
+
+    def _upsert_conversation(self, conversation_id: str) -> Statement:
+        return (
+            "INSERT OR IGNORE INTO conversations (id, has_uploaded_file, created_at) "
+            "VALUES (?, 0, ?)",
+            (conversation_id, time.time()),
+        )
+
+    @staticmethod
+    def _record_sequence(conversation_id: str, sequence: int) -> Tuple[Statement, Statement]:
+        return (
+            (
+                "UPDATE conversations SET last_sequence = MAX(last_sequence, ?) WHERE id = ?",
+                (sequence, conversation_id),
+            ),
+            (
+                "UPDATE sequences SET last_sequence = MAX(last_sequence, ?) WHERE id = 0",
+                (sequence,),
+            ),
+        )
+
+    def load_conversation(
+        self, conversation_id: str, limit: Optional[int] = None
+    ) -> Optional[StoredConversation]:
+        # Cold path only: make sure changes still queued for this conversation are visible
+        self.flush()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT has_uploaded_file, last_sequence, cleared_sequence FROM conversations "
+            "WHERE id = ?",
+            (conversation_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        rows = connection.execute(
+            "SELECT data FROM messages WHERE conversation_id = ? ORDER BY id DESC LIMIT ?",
+            (conversation_id, -1 if limit is None else limit),
+        ).fetchall()
+        messages = [MessageRecord.from_dict(json.loads(data)) for (data,) in reversed(rows)]
+        return StoredConversation(messages, bool(row[0]), row[1], row[2])
+
+    def get_last_sequence(self) -> int:
+        self.flush()
+        row = self._connection().execute("SELECT last_sequence FROM sequences").fetchone()
+        return row[0] if row else 0
+
+    def load_messages(
+        self,
+        conversation_id: str,
+        after_sequence: int,
+        through_sequence: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[MessageRecord]:
+        # Cold path only: older history is read when a caller pages past the in-memory window
+        self.flush()
+        rows = self._connection().execute(
+            "SELECT data FROM messages "
+            "WHERE conversation_id = ? AND sequence > ? AND sequence <= ? "
+            "ORDER BY sequence LIMIT ?",
+            (
+                conversation_id,
+                after_sequence,
+                # SQLite integers are 64-bit
+                2**63 - 1 if through_sequence is None else through_sequence,
+                -1 if limit is None else limit,
+            ),
+        )
+        return [MessageRecord.from_dict(json.loads(data)) for (data,) in rows]
+
+    def get_conversation_ids(self) -> List[str]:
+        self.flush()
+        return [
+            conversation_id
+            for (conversation_id,) in self._connection().execute(
+                "SELECT id FROM conversations ORDER BY created_at"
+            )
+        ]
+
+    def save_conversation(self, conversation_id: str, has_uploaded_file: bool) -> None:
+        self._submit(
+            self._upsert_conversation(conversation_id),
+            (
+                "UPDATE conversations SET has_uploaded_file = ? WHERE id = ?",
+                (int(has_uploaded_file), conversation_id),
+            ),
+        )
+
+    def append_message(self, conversation_id: str, message: MessageRecord) -> None:
+        self._submit(
+            self._upsert_conversation(conversation_id),
+            (
+                "INSERT INTO messages (conversation_id, data, sequence) VALUES (?, ?, ?)",
+                (conversation_id, json.dumps(message.to_dict(), default=str), message.sequence),
+            ),
+            *self._record_sequence(conversation_id, message.sequence or 0),
+        )
+
+    def clear_messages(self, conversation_id: str, cleared_sequence: int) -> None:
+        self._submit(
+            self._upsert_conversation(conversation_id),
+            ("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,)),
+            (
+                "UPDATE conversations SET cleared_sequence = ? WHERE id = ?",
+                (cleared_sequence, conversation_id),
+            ),
+            *self._record_sequence(conversation_id, cleared_sequence),
+        )
+
+    def delete_conversation(self, conversation_id: str) -> None:
+        self._submit(
+            ("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,)),
+            ("DELETE FROM conversations WHERE id = ?", (conversation_id,)),
+        )
+
+    def flush(self) -> None:
+        if self._queue.unfinished_tasks:
+            self._queue.put(self._FLUSH)
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(self._STOP)
+            self._writer.join()
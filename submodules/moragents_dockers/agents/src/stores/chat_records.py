@@ -0,0 +1,166 @@
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from src.models.core import AgentResponse, estimate_tokens
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+class MessageRecord:
+    """
+    Compact in-memory form of a ChatMessage, as held by ChatManager.
+
+    Conversations hold many messages, so records use slots instead of a per-instance dict,
+    share interned strings for the few distinct roles, agent names and action types, and
+    keep no metadata dict when the metadata is empty. ChatMessage models and dictionaries
+    are only built when messages leave the store.
+
+    Attributes:
+        role (str): Message author role
+        content (str): Message text
+        agentName (Optional[str]): Name of the responding agent
+        error_message (Optional[str]): Error details of a failed response
+        metadata (Optional[Dict[str, Any]]): Response metadata, None when empty
+        requires_action (bool): Whether the message asks the user to act
+        action_type (Optional[str]): Kind of action requested
+        timestamp (Optional[float]): Creation time
+        sequence (Optional[int]): Position of the message in the chat history
+        token_estimate (int): Estimated number of prompt tokens of the message
+    """
+
+    __slots__ = (
+        "role",
+        "content",
+        "agentName",
+        "error_message",
+        "metadata",
+        "requires_action",
+        "action_type",
+        "timestamp",
+        "sequence",
+        "token_estimate",
+    )
+
+    def __init__(
+        self,
+        role: str,
+        content: str,
+        agentName: Optional[str] = None,
+        error_message: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        requires_action: Optional[bool] = False,
+        action_type: Optional[str] = None,
+        timestamp: Optional[float] = None,
+        sequence: Optional[int] = None,
+    ) -> None:
+        self.role = sys.intern(role)
+        self.content = content
+        self.agentName = _intern(agentName)
+        self.error_message = error_message
+        self.metadata = metadata or None
+        self.requires_action = bool(requires_action)
+        self.action_type = _intern(action_type)
+        self.timestamp = timestamp
+        self.sequence = sequence
+        self.token_estimate = estimate_tokens(content)
+
+    @classmethod
+    def from_dict(cls, message: Dict[str, Any]) -> "MessageRecord":
+        """Create a record from a ChatMessage dictionary, stamped with the current time if unset"""
+        return cls(
+            role=message["role"],
+            content=message["content"],
+            agentName=message.get("agentName"),
+            error_message=message.get("error_message"),
+            metadata=message.get("metadata"),
+            requires_action=message.get("requires_action"),
+            action_type=message.get("action_type"),
+            timestamp=message.get("timestamp") or time.time(),
+            sequence=message.get("sequence"),
+        )
+
+    @classmethod
+    def from_agent_response(cls, response: AgentResponse, agent_name: str) -> "MessageRecord":
+        """Create a record of an agent's response, like AgentResponse.to_chat_message()"""
+        content = (
+            f"{response.content} {response.error_message}"
+            if response.error_message
+            else response.content
+        )
+        return cls(
+            role="assistant",
+            content=content,
+            agentName=agent_name,
+            error_message=response.error_message,
+            metadata=response.metadata,
+            requires_action=response.requires_action,
+            action_type=response.action_type,
+            timestamp=time.time(),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a dictionary shaped like ChatMessage.dict()"""
+        return {
+            "role": self.role,
+            "content": self.content,
+            "agentName": self.agentName,
+            "error_message": self.error_message,
+            "metadata": dict(self.metadata) if self.metadata else {},
+            "requires_action": self.requires_action,
+            "action_type": self.action_type,
+            "timestamp": self.timestamp,
+            "sequence": self.sequence,
+        }
+
+
+class ConversationRecord:
+    """
+    In-memory state of a conversation held by ChatManager.
+
+    The opening disclaimer is the same record in every conversation.
+
+    Attributes:
+        messages (List[MessageRecord]): Messages, oldest first, starting with the disclaimer
+        has_uploaded_file (bool): Whether a file was uploaded to the conversation
+        last_sequence (int): Sequence number of the latest change (new message or clear)
+        token_total (int): Running total of the token estimates of all messages but the disclaimer
+        cleared_sequence (int): Sequence number of the last clear; earlier context (e.g. summaries)
+            no longer applies
+        trimmed_through (int): Sequence number up to which messages may have been dropped from
+            memory; older history is only available from the persistence backend
+    """
+
+    __slots__ = (
+        "messages",
+        "has_uploaded_file",
+        "last_sequence",
+        "token_total",
+        "cleared_sequence",
+        "trimmed_through",
+    )
+
+    def __init__(
+        self,
+        messages: List[MessageRecord],
+        has_uploaded_file: bool = False,
+        last_sequence: int = 0,
+        cleared_sequence: int = 0,
+        trimmed_through: int = 0,
+    ) -> None:
+        self.messages = messages
+        self.has_uploaded_file = has_uploaded_file
+        self.last_sequence = last_sequence
+        self.token_total = sum(message.token_estimate for message in messages[1:])
+        self.cleared_sequence = cleared_sequence
+        self.trimmed_through = trimmed_through
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a dictionary shaped like Conversation.dict()"""
+        return {
+            "messages": [message.to_dict() for message in self.messages],
+            "has_uploaded_file": self.has_uploaded_file,
+            "last_sequence": self.last_sequence,
+        }
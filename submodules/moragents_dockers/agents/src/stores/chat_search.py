@@ -0,0 +1,172 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Frequent English words that match nearly every message, kept out of the index
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from has have how i if in is it me my no not of on or "
+    "so that the this to was we what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms, dropping stopwords"""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def make_snippet(text: str, query: str, width: int = 160) -> str:
+    """Cut the part of a message around the first occurrence of a query term"""
+    lowered = text.lower()
+    positions = [position for position in map(lowered.find, tokenize(query)) if position >= 0]
+    start = max(0, min(positions, default=0) - width // 4)
+    snippet = text[start : start + width].strip()
+    return ("..." if start else "") + snippet + ("..." if start + width < len(text) else "")
+
+
+class ChatSearchIndex:
+    """
+    Inverted index over chat messages, ranked with BM25.
+
+    The index is maintained incrementally: adding a message costs one pass over its terms,
+    and removing a conversation only touches the terms that occur in it, so keeping it up
+    to date stays cheap at high message rates. Documents are identified by conversation ID
+    and message sequence number.
+
+    Attributes:
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 document length normalization
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        # term -> conversation ID -> message sequence -> term frequency
+        self._postings: Dict[str, Dict[str, Dict[int, int]]] = defaultdict(dict)
+        # conversation ID -> term -> number of the conversation's messages containing the term
+        self._conversation_terms: Dict[str, Counter] = defaultdict(Counter)
+        # conversation ID -> message sequence -> number of terms
+        self._lengths: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._document_frequency: Counter = Counter()
+        self._document_count = 0
+        self._total_length = 0
+
+    @property
+    def document_count(self) -> int:
+        """Number of indexed messages"""
+        return self._document_count
+
+    def add(self, conversation_id: str, sequence: int, text: str) -> None:
+        """
+        Index a message.
+
+        Args:
+            conversation_id (str): Conversation the message belongs to
+            sequence (int): Sequence number of the message
+            text (str): Message content
+        """
+        if sequence in self._lengths[conversation_id]:
+            return
+        terms = Counter(tokenize(text))
+        self._lengths[conversation_id][sequence] = sum(terms.values())
+        self._document_count += 1
+        self._total_length += sum(terms.values())
+        conversation_terms = self._conversation_terms[conversation_id]
+        for term, frequency in terms.items():
+            self._postings[term].setdefault(conversation_id, {})[sequence] = frequency
+            self._document_frequency[term] += 1
+            conversation_terms[term] += 1
+
+    def remove(self, conversation_id: str, sequence: int, text: str) -> None:
+        """
+        Remove a message from the index; messages that were never indexed are ignored.
+
+        Args:
+            conversation_id (str): Conversation the message belongs to
+            sequence (int): Sequence number of the message
+            text (str): Message content, used to find the message's terms
+        """
+        lengths = self._lengths.get(conversation_id)
+        if lengths is None or sequence not in lengths:
+            return
+        self._document_count -= 1
+        self._total_length -= lengths.pop(sequence)
+        conversation_terms = self._conversation_terms[conversation_id]
+        for term in set(tokenize(text)):
+            documents = self._postings[term][conversation_id]
+            del documents[sequence]
+            if not documents:
+                del self._postings[term][conversation_id]
+                if not self._postings[term]:
+                    del self._postings[term]
+            self._document_frequency[term] -= 1
+            if not self._document_frequency[term]:
+                del self._document_frequency[term]
+            conversation_terms[term] -= 1
+            if not conversation_terms[term]:
+                del conversation_terms[term]
+
+    def remove_conversation(self, conversation_id: str) -> None:
+        """Remove all messages of a conversation from the index"""
+        lengths = self._lengths.pop(conversation_id, None)
+        if lengths is None:
+            return
+        self._document_count -= len(lengths)
+        self._total_length -= sum(lengths.values())
+        for term, count in self._conversation_terms.pop(conversation_id, Counter()).items():
+            del self._postings[term][conversation_id]
+            if not self._postings[term]:
+                del self._postings[term]
+            self._document_frequency[term] -= count
+            if not self._document_frequency[term]:
+                del self._document_frequency[term]
+
+    def search(
+        self, query: str, conversation_id: Optional[str] = None, limit: int = 10
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Find the messages best matching a query.
+
+        Args:
+            query (str): Search terms
+            conversation_id (str, optional): Only search this conversation
+            limit (int): Maximum number of results
+
+        Returns:
+            List[Tuple[str, int, float]]: Conversation ID, message sequence and score of each match,
+            best first; equal scores rank more recent messages first
+        """
+        if not self._document_count:
+            return []
+        average_length = self._total_length / self._document_count
+        scores: Dict[Tuple[str, int], float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            document_frequency = self._document_frequency[term]
+            idf = math.log(
+                1 + (self._document_count - document_frequency + 0.5) / (document_frequency + 0.5)
+            )
+            if conversation_id is not None:
+                postings = (
+                    {conversation_id: postings[conversation_id]}
+                    if conversation_id in postings
+                    else {}
+                )
+            for matched_conversation_id, documents in postings.items():
+                lengths = self._lengths[matched_conversation_id]
+                for sequence, frequency in documents.items():
+                    norm = self.k1 * (1 - self.b + self.b * lengths[sequence] / average_length)
+                    scores[(matched_conversation_id, sequence)] += (
+                        idf * frequency * (self.k1 + 1) / (frequency + norm)
+                    )
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0][1]))
+        return [
+            (matched_conversation_id, sequence, score)
+            for (matched_conversation_id, sequence), score in best
+        ]
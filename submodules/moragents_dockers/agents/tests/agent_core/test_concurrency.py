@@ -0,0 +1,75 @@
+import asyncio
+from collections import Counter
+
+from langchain.schema import AIMessage, HumanMessage
+from src.agents.agent_core import agent as agent_module
+from src.agents.agent_core.agent import AgentCore
+from src.agents.agent_core.concurrency import LLMConcurrencyLimiter
+
+
+class BackendLLM:
+    """Records the peak number of concurrent calls made to each backend"""
+
+    in_flight = Counter()
+    peak = Counter()
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    async def ainvoke(self, messages, **kwargs):
+        self.in_flight[self.base_url] += 1
+        self.peak[self.base_url] = max(self.peak[self.base_url], self.in_flight[self.base_url])
+        await asyncio.sleep(0.01)
+        self.in_flight[self.base_url] -= 1
+        return AIMessage(content="done")
+
+
+class LLMAgent(AgentCore):
+    def __init__(self):
+        super().__init__({"name": "llm agent"}, None, None)
+
+    async def _process_request(self, request):
+        raise NotImplementedError
+
+    async def _execute_tool(self, func_name, args):
+        raise NotImplementedError
+
+
+def test_concurrent_calls_never_exceed_the_limit_of_their_backend(monkeypatch):
+    limiter = LLMConcurrencyLimiter(3, {"http://small:11434": 1})
+    monkeypatch.setattr(agent_module, "llm_limiter", limiter)
+    BackendLLM.peak.clear()
+    agent = LLMAgent()
+    llms = [BackendLLM("http://large:11434"), BackendLLM("http://small:11434")]
+
+    async def call_all():
+        calls = [
+            agent._invoke_llm(llm, [HumanMessage(content="hi")], stream=False)
+            for llm in llms
+            for _ in range(10)
+        ]
+        return await asyncio.gather(*calls)
+
+    results = asyncio.run(call_all())
+
+    assert [result.content for result in results] == ["done"] * 20
+    assert BackendLLM.peak == {"http://large:11434": 3, "http://small:11434": 1}
+
+
+def test_each_event_loop_gets_its_own_semaphores():
+    limiter = LLMConcurrencyLimiter(1)
+    llm = BackendLLM("http://ollama:11434")
+
+    async def contend():
+        async def call():
+            async with limiter.acquire(llm):
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(call(), call())
+        return limiter._get_semaphore("http://ollama:11434")
+
+    # Waiting binds a semaphore to its loop, so reusing it on the next loop would fail
+    first = asyncio.run(contend())
+    second = asyncio.run(contend())
+
+    assert first is not second
@@ -0,0 +1,86 @@
+import asyncio
+
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
+from src.agents.agent_core.context import ConversationContextBuilder
+from src.models.core import estimate_tokens
+from src.stores import chat_manager_instance
+
+CONVERSATION_ID = "context_builder_test"
+TURN_TOKENS = estimate_tokens("message 00")
+
+
+class FakeSummarizer:
+    def __init__(self):
+        self.transcripts = []
+
+    async def __call__(self, messages):
+        self.transcripts.append(messages[-1].content)
+        return AIMessage(content=f"summary {len(self.transcripts)}")
+
+
+def add_turns(start, count):
+    for i in range(start, start + count):
+        role = "user" if i % 2 == 0 else "assistant"
+        chat_manager_instance.add_message(
+            {"role": role, "content": f"message {i:02d}"}, CONVERSATION_ID
+        )
+
+
+def test_recent_turns_fit_the_budget_and_older_turns_are_summarized_incrementally():
+    builder = ConversationContextBuilder(summary_ratio=0.25)
+    summarizer = FakeSummarizer()
+    budget = TURN_TOKENS * 8
+    try:
+        add_turns(0, 4)
+        history = asyncio.run(builder.build(CONVERSATION_ID, budget))
+        assert [message.content for message in history] == [f"message {i:02d}" for i in range(4)]
+        assert isinstance(history[0], HumanMessage) and isinstance(history[1], AIMessage)
+
+        # Without a summarizer, turns beyond the budget are dropped
+        add_turns(4, 8)
+        history = asyncio.run(builder.build(CONVERSATION_ID, budget))
+        assert [message.content for message in history] == [
+            f"message {i:02d}" for i in range(4, 12)
+        ]
+
+        # With a summarizer, the window shrinks to make room for a summary of older turns
+        history = asyncio.run(builder.build(CONVERSATION_ID, budget, summarize=summarizer))
+        assert history[0] == SystemMessage(content="Summary of the earlier conversation: summary 1")
+        assert [message.content for message in history[1:]] == [
+            f"message {i:02d}" for i in range(6, 12)
+        ]
+        assert "message 05" in summarizer.transcripts[0]
+
+        # The cached summary is reused until the window slides, then only new turns are summarized
+        asyncio.run(builder.build(CONVERSATION_ID, budget, summarize=summarizer))
+        assert len(summarizer.transcripts) == 1
+        add_turns(12, 2)
+        asyncio.run(builder.build(CONVERSATION_ID, budget, summarize=summarizer))
+        assert summarizer.transcripts[1].startswith("Previous summary: summary 1")
+        assert (
+            "message 05" not in summarizer.transcripts[1]
+            and "message 07" in summarizer.transcripts[1]
+        )
+
+        # Clearing the conversation discards the summary
+        chat_manager_instance.clear_messages(CONVERSATION_ID)
+        add_turns(0, 12)
+        asyncio.run(builder.build(CONVERSATION_ID, budget, summarize=summarizer))
+        assert not summarizer.transcripts[2].startswith("Previous summary")
+    finally:
+        chat_manager_instance.delete_conversation(CONVERSATION_ID)
+
+
+def test_prompt_being_answered_is_excluded():
+    builder = ConversationContextBuilder()
+    try:
+        add_turns(0, 2)
+        prompt_sequence = chat_manager_instance.add_message(
+            {"role": "user", "content": "prompt"}, CONVERSATION_ID
+        )
+
+        history = asyncio.run(builder.build(CONVERSATION_ID, 1000, before_sequence=prompt_sequence))
+
+        assert [message.content for message in history] == ["message 00", "message 01"]
+    finally:
+        chat_manager_instance.delete_conversation(CONVERSATION_ID)
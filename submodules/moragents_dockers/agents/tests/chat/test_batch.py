@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from src import app as app_module
+from src.agents.rag.documents import DocumentEntry, conversation_documents
+from src.agents.rag.index_store import rag_index_store
+from src.models.core import AgentResponse
+from src.routing.embedding_router import RoutingDecision
+from src.stores import agent_manager_instance, chat_manager_instance
+
+AGENT_CONFIGS = [
+    {"name": "echo", "description": "Echoes prompts", "command": "echo", "upload_required": False}
+]
+
+
+class EchoAgent:
+    """Answers with the prompt and the number of messages seen in its conversation"""
+
+    def __init__(self):
+        self.conversation_ids = set()
+
+    async def chat(self, request):
+        await asyncio.sleep(0.01)
+        self.conversation_ids.add(request.conversation_id)
+        if request.prompt.content == "fail":
+            raise ValueError("bad prompt")
+        if request.prompt.content == "upload":
+            entry = DocumentEntry(key="notes", filename="notes.pdf")
+            conversation_documents._set_documents(request.conversation_id, [entry])
+        history = chat_manager_instance.get_messages(request.conversation_id)
+        return AgentResponse.success(content=f"{request.prompt.content}:{len(history)}")
+
+
+class EchoRouter:
+    async def route(self, prompt, agent_configs, prompt_vector=None):
+        return RoutingDecision(agent="echo", confident=True)
+
+
+@pytest.fixture
+def echo_agent(monkeypatch, tmp_path):
+    agent = EchoAgent()
+    monkeypatch.setattr(agent_manager_instance, "config", {"agents": AGENT_CONFIGS})
+    monkeypatch.setattr(agent_manager_instance, "selected_agents", ["echo"])
+    monkeypatch.setattr(agent_manager_instance, "agents", {"echo": agent})
+    monkeypatch.setattr(app_module.delegator, "embedding_router", EchoRouter())
+    monkeypatch.setattr(rag_index_store, "root", str(tmp_path))
+    return agent
+
+
+def make_request(content, conversation_id="default"):
+    return {
+        "prompt": {"role": "user", "content": content},
+        "chain_id": "1",
+        "wallet_address": "0x0",
+        "conversation_id": conversation_id,
+    }
+
+
+def test_batch_streams_indexed_results_in_isolated_conversations(echo_agent):
+    conversations_before = set(asyncio.run(chat_manager_instance.get_all_conversation_ids()))
+    default_messages = chat_manager_instance.get_messages("default")
+    requests = [make_request(f"prompt {i}") for i in range(8)]
+    requests += [
+        make_request("first", "shared"),
+        make_request("second", "shared"),
+        make_request("fail"),
+        make_request("upload", "documents"),
+    ]
+
+    response = TestClient(app_module.app).post(
+        "/chat/batch", json={"requests": requests, "max_concurrency": 3}
+    )
+
+    assert response.status_code == 200
+    results = {result["index"]: result for result in map(json.loads, response.text.splitlines())}
+    assert sorted(results) == list(range(len(requests)))
+
+    # Requests in the same conversation run in batch order and see each other's messages
+    assert results[8]["response"]["content"] == "first:2"
+    assert results[9]["response"]["content"] == "second:4"
+    assert results[10]["response"]["response_type"] == "error"
+
+    # The default conversation is untouched and scratch conversations are cleaned up
+    assert chat_manager_instance.get_messages("default") == default_messages
+    conversation_ids = asyncio.run(chat_manager_instance.get_all_conversation_ids())
+    assert set(conversation_ids) == conversations_before
+    for scratch_id in echo_agent.conversation_ids:
+        assert conversation_documents.get_documents(scratch_id) == []
+
+
+def test_batch_rejects_oversized_batches(echo_agent, monkeypatch):
+    monkeypatch.setattr(app_module.Config, "CHAT_BATCH_MAX_SIZE", 2)
+
+    response = TestClient(app_module.app).post(
+        "/chat/batch", json={"requests": [make_request("hi")] * 3}
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,45 @@
+import logging
+
+import pytest
+from tests.chat_manager_benchmarks.config import Config
+from tests.chat_manager_benchmarks.helpers import (
+    build_chat_manager,
+    build_legacy_store,
+    generate_messages,
+    measure,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_compact_message_storage_memory():
+    messages = generate_messages(Config.MESSAGES, Config.MESSAGES_PER_CONVERSATION)
+    total_messages = Config.NUM_CONVERSATIONS * Config.MESSAGES_PER_CONVERSATION
+
+    legacy_store, legacy_bytes, legacy_seconds = measure(
+        lambda: build_legacy_store(Config.NUM_CONVERSATIONS, messages)
+    )
+    del legacy_store
+    # Keep the per-message info logs of ChatManager out of the measurement
+    logging.getLogger("src.stores.chat_manager").setLevel(logging.WARNING)
+    chat_manager, compact_bytes, compact_seconds = measure(
+        lambda: build_chat_manager(Config.NUM_CONVERSATIONS, messages)
+    )
+
+    for layout, retained, seconds in [
+        ("legacy", legacy_bytes, legacy_seconds),
+        ("compact", compact_bytes, compact_seconds),
+    ]:
+        logger.info(
+            f"{layout}: {retained / 2**20:.1f} MiB for {total_messages} messages "
+            f"({retained / total_messages:.0f} bytes/message), built in {seconds:.1f}s"
+        )
+    logger.info(f"compact/legacy memory ratio: {compact_bytes / legacy_bytes:.2f}")
+
+    assert len(chat_manager.get_messages("conversation_0")) == Config.MESSAGES_PER_CONVERSATION + 1
+    assert compact_bytes <= legacy_bytes * Config.MAX_MEMORY_RATIO
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,26 @@
+class Config:
+    NUM_CONVERSATIONS = 10_000
+    MESSAGES_PER_CONVERSATION = 50
+
+    # Alternating user prompts and agent responses, cycled through to fill each conversation
+    MESSAGES = [
+        {"role": "user", "content": "What is the price of ETH?"},
+        {
+            "role": "assistant",
+            "agentName": "Crypto Data Agent",
+            "content": "The price of ETH is $3,456.78.",
+            "metadata": {},
+        },
+        {"role": "user", "content": "Swap 1 ETH for USDC on Base"},
+        {
+            "role": "assistant",
+            "agentName": "Token Swap Agent",
+            "content": "I can help you swap 1 ETH for USDC. Please confirm the transaction.",
+            "metadata": {"src": "ETH", "dst": "USDC", "src_amount": 1.0},
+            "requires_action": True,
+            "action_type": "swap",
+        },
+    ]
+
+    # The compact layout must take at most this fraction of the memory of the legacy layout
+    MAX_MEMORY_RATIO = 0.5
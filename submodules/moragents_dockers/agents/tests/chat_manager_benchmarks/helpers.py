@@ -0,0 +1,55 @@
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.models.core import ChatMessage, Conversation
+from src.stores.chat_manager import ChatManager
+
+
+def generate_messages(messages: List[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
+    """Cycle through sample messages, giving each a distinct content"""
+    return [
+        {
+            **messages[i % len(messages)],
+            "content": f"{messages[i % len(messages)]['content']} ({i})",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(build: Callable[[], Any]) -> Tuple[Any, int, float]:
+    """Build a store, returning it with the bytes it retains and the build time in seconds"""
+    gc.collect()
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    store = build()
+    elapsed = time.perf_counter() - started_at
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, retained, elapsed
+
+
+def build_legacy_store(
+    num_conversations: int, messages: List[Dict[str, Any]]
+) -> Dict[str, Conversation]:
+    """Hold conversations as pydantic models, the way ChatManager did before compact records"""
+    default_message = ChatManager().default_message.to_dict()
+    conversations = {}
+    for i in range(num_conversations):
+        conversation = Conversation(
+            messages=[ChatMessage(**default_message)], has_uploaded_file=False
+        )
+        for message in messages:
+            conversation.messages.append(ChatMessage(**message))
+        conversations[f"conversation_{i}"] = conversation
+    return conversations
+
+
+def build_chat_manager(num_conversations: int, messages: List[Dict[str, Any]]) -> ChatManager:
+    chat_manager = ChatManager()
+    for i in range(num_conversations):
+        for message in messages:
+            chat_manager.add_message(message, f"conversation_{i}")
+    return chat_manager
@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import pytest
+from src import app as app_module
+from src.models.core import AgentResponse
+from src.routing.embedding_router import RoutingDecision
+from src.stores import agent_manager_instance, chat_manager_instance
+
+AGENT_CONFIGS = [
+    {"name": "flaky", "description": "Always fails", "command": "flaky", "upload_required": False},
+    {
+        "name": "steady",
+        "description": "Always answers",
+        "command": "steady",
+        "upload_required": False,
+    },
+]
+
+
+class FlakyAgent:
+    def __init__(self):
+        self.calls = 0
+
+    async def chat(self, request):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream unavailable")
+
+
+class SteadyAgent:
+    async def chat(self, request):
+        await asyncio.sleep(0.01)
+        return AgentResponse.success(content=f"answer for {request.conversation_id}")
+
+
+class FirstCandidateRouter:
+    """Confidently routes every prompt to the first candidate still available to the request"""
+
+    async def route(self, prompt, agent_configs, prompt_vector=None):
+        await asyncio.sleep(0.01)
+        return RoutingDecision(agent=agent_configs[0]["name"], confident=True)
+
+
+@pytest.fixture
+def fake_agents(monkeypatch):
+    flaky = FlakyAgent()
+    monkeypatch.setattr(agent_manager_instance, "config", {"agents": AGENT_CONFIGS})
+    monkeypatch.setattr(agent_manager_instance, "selected_agents", ["flaky", "steady"])
+    monkeypatch.setattr(agent_manager_instance, "agents", {"flaky": flaky, "steady": SteadyAgent()})
+    monkeypatch.setattr(app_module.delegator, "embedding_router", FirstCandidateRouter())
+    return flaky
+
+
+def test_parallel_chats_cascade_independently(fake_agents):
+    conversation_ids = [f"concurrency_test_{i}" for i in range(20)]
+
+    async def send_all():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            requests = [
+                client.post(
+                    "/chat",
+                    json={
+                        "prompt": {"role": "user", "content": "hello"},
+                        "chain_id": "1",
+                        "wallet_address": "0x0",
+                        "conversation_id": conversation_id,
+                    },
+                )
+                for conversation_id in conversation_ids
+            ]
+            return await asyncio.gather(*requests)
+
+    try:
+        responses = asyncio.run(send_all())
+
+        # Every request tried the failing agent exactly once before cascading to the next one
+        assert fake_agents.calls == len(conversation_ids)
+        for conversation_id, response in zip(conversation_ids, responses):
+            assert response.status_code == 200
+            assert response.json()["content"] == f"answer for {conversation_id}"
+            assert chat_manager_instance.get_last_message(conversation_id)["agentName"] == "steady"
+    finally:
+        for conversation_id in conversation_ids:
+            chat_manager_instance.delete_conversation(conversation_id)
@@ -0,0 +1,71 @@
+import asyncio
+
+from src.models.core import AgentResponse
+from src.routing.continuation import ContinuationDetector, is_short_followup
+from src.stores import chat_manager_instance
+
+CONVERSATION_ID = "continuation_test"
+
+
+class TopicEmbeddings:
+    """Embeds prompts mentioning prices and weather onto two orthogonal axes"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def aembed_query(self, text):
+        self.calls += 1
+        return [1.0, 0.0] if "price" in text else [0.0, 1.0]
+
+
+def add_exchange(prompt, agent_name, error_message=None):
+    chat_manager_instance.add_message({"role": "user", "content": prompt}, CONVERSATION_ID)
+    response = (
+        AgentResponse.error(error_message)
+        if error_message
+        else AgentResponse.success(content="answer")
+    )
+    chat_manager_instance.add_response(response, agent_name, CONVERSATION_ID)
+
+
+def check(detector, prompt, candidates=("crypto data", "weather")):
+    sequence = chat_manager_instance.add_message(
+        {"role": "user", "content": prompt}, CONVERSATION_ID
+    )
+    return asyncio.run(detector.check(CONVERSATION_ID, prompt, sequence, candidates))
+
+
+def test_short_followups_are_detected():
+    assert is_short_followup("and for ETH?", max_words=6)
+    assert is_short_followup("what about tomorrow", max_words=6)
+    assert is_short_followup("Yes, proceed", max_words=6)
+    assert not is_short_followup("what is the weather in Paris", max_words=6)
+    assert not is_short_followup(
+        "and what is the current price of bitcoin in euros today", max_words=6
+    )
+
+
+def test_followups_reuse_the_previous_agent_until_the_topic_changes():
+    chat_manager_instance.clear_messages(CONVERSATION_ID)
+    embeddings = TopicEmbeddings()
+    detector = ContinuationDetector(embeddings, min_similarity=0.75, max_words=6, max_age=600)
+    add_exchange("what is the price of bitcoin", "crypto data")
+
+    decision = check(detector, "and for ETH?")
+    assert (decision.agent, decision.continued, decision.reason) == (
+        "crypto data",
+        True,
+        "short_followup",
+    )
+    assert embeddings.calls == 0
+
+    decision = check(detector, "show me the price history of solana over the last week")
+    assert (decision.continued, decision.reason) == (True, "similar_prompt")
+
+    decision = check(detector, "will it rain in Lisbon during the whole weekend")
+    assert (decision.continued, decision.reason) == (False, "topic_change")
+    assert decision.prompt_vector is not None
+
+    add_exchange("will it rain in Lisbon", "weather", error_message="upstream unavailable")
+    assert check(detector, "and in Porto?").reason == "previous_error"
+    assert detector.stats.to_dict()["hits"] == 2
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain.schema import AIMessage
+from src import app as app_module
+from src.routing.context import RoutingContext
+from src.routing.embedding_router import EmbeddingRouter
+from src.routing.prompt_cache import RoutingPromptCache
+from src.stores import agent_manager_instance
+
+AGENT_CONFIGS = [
+    {
+        "name": "crypto data",
+        "description": "Fetches the price of crypto tokens",
+        "command": "crypto",
+        "upload_required": False,
+    },
+    {
+        "name": "weather",
+        "description": "Reports the weather forecast",
+        "command": "weather",
+        "upload_required": False,
+    },
+]
+
+
+class KeywordEmbeddings:
+    """Embeds texts onto one axis per topic keyword they mention"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.embedded_documents = []
+
+    @staticmethod
+    def _embed(text):
+        return [float("price" in text), float("weather" in text), 0.1]
+
+    async def aembed_documents(self, texts):
+        self.embedded_documents.extend(texts)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text):
+        if self.fail:
+            raise ConnectionError("embeddings unavailable")
+        return self._embed(text)
+
+
+class AgentSelectionLLM:
+    """Selects a fixed agent through the select_agent tool"""
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.calls = 0
+
+    def bind_tools(self, tools, tool_choice=None):
+        return self
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": "select_agent", "args": {"agent": self.agent}, "id": "call_0"}],
+        )
+
+
+def make_router(embeddings=None):
+    return EmbeddingRouter(embeddings or KeywordEmbeddings(), min_similarity=0.55, min_margin=0.08)
+
+
+@pytest.fixture
+def delegator(monkeypatch):
+    delegator = app_module.delegator
+    monkeypatch.setattr(agent_manager_instance, "config", {"agents": AGENT_CONFIGS})
+    monkeypatch.setattr(agent_manager_instance, "selected_agents", ["crypto data", "weather"])
+    monkeypatch.setattr(delegator, "embedding_router", make_router())
+    monkeypatch.setattr(delegator, "continuation_detector", None)
+    monkeypatch.setattr(delegator, "speculative_runner", None)
+    return delegator
+
+
+def use_selection_llm(monkeypatch, delegator, agent):
+    selection_llm = AgentSelectionLLM(agent)
+    monkeypatch.setattr(delegator, "routing_prompt_cache", RoutingPromptCache(selection_llm))
+    return selection_llm
+
+
+def select_agent(delegator, prompt):
+    routing_context = RoutingContext(conversation_id="embedding_router_test")
+    result = asyncio.run(
+        delegator.get_delegator_response({"role": "user", "content": prompt}, routing_context)
+    )
+    return result["agent"]
+
+
+def test_clear_matches_are_routed_without_the_llm():
+    embeddings = KeywordEmbeddings()
+    router = make_router(embeddings)
+
+    decision = asyncio.run(router.route("what is the price of bitcoin", AGENT_CONFIGS))
+    assert (decision.agent, decision.confident) == ("crypto data", True)
+    assert [agent for agent, _ in decision.ranking] == ["crypto data", "weather"]
+    assert decision.margin == pytest.approx(decision.similarity - decision.ranking[1][1])
+
+    decision = asyncio.run(router.route("will the weather be sunny", AGENT_CONFIGS))
+    assert (decision.agent, decision.confident) == ("weather", True)
+    # Descriptions are only embedded once
+    assert len(embeddings.embedded_documents) == len(AGENT_CONFIGS)
+
+
+def test_ambiguous_prompts_are_not_confident():
+    router = make_router()
+
+    decision = asyncio.run(router.route("price of umbrellas in rainy weather", AGENT_CONFIGS))
+
+    assert not decision.confident
+    assert decision.margin == pytest.approx(0.0)
+    assert (router.stats.routed, router.stats.hits, router.stats.fallbacks) == (1, 0, 1)
+
+
+def test_embedding_failures_fall_back_to_the_llm():
+    router = make_router(KeywordEmbeddings(fail=True))
+
+    decision = asyncio.run(router.route("what is the price of bitcoin", AGENT_CONFIGS))
+
+    assert (decision.agent, decision.confident) == (None, False)
+    assert (router.stats.routed, router.stats.errors) == (0, 1)
+
+
+def test_delegator_asks_the_llm_only_below_the_threshold(monkeypatch, delegator):
+    selection_llm = use_selection_llm(monkeypatch, delegator, "weather")
+
+    assert select_agent(delegator, "what is the price of bitcoin") == "crypto data"
+    assert selection_llm.calls == 0
+
+    assert select_agent(delegator, "price of umbrellas in rainy weather") == "weather"
+    assert selection_llm.calls == 1
+
+
+def test_routing_stats_count_hits_fallbacks_and_llm_agreement(monkeypatch, delegator):
+    use_selection_llm(monkeypatch, delegator, "crypto data")
+    select_agent(delegator, "what is the price of bitcoin")
+    select_agent(delegator, "will the weather be sunny")
+    select_agent(delegator, "price of umbrellas in rainy weather")
+
+    stats = TestClient(app_module.app).get("/delegator/routing-stats").json()
+
+    assert stats["enabled"]
+    assert (stats["routed"], stats["hits"], stats["fallbacks"], stats["errors"]) == (3, 2, 1, 0)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+    assert stats["hits_by_agent"] == {"crypto data": 1, "weather": 1}
+    assert sum(stats["margin_histogram"].values()) == 3
+    # The tied prompt ranks crypto data first (config order), matching the LLM's choice
+    assert stats["fallback_agreement_by_margin"] == {"<=0.01": {"agreed": 1, "total": 1}}
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+from src import app as app_module
+from src.routing.prompt_cache import RoutingPromptCache
+from src.stores import agent_manager_instance
+
+AGENT_CONFIGS = [
+    {"name": "crypto data", "description": "Fetches token prices", "command": "crypto"},
+    {"name": "weather", "description": "Reports the weather forecast", "command": "weather"},
+]
+
+
+class ToolBindingLLM:
+    def __init__(self):
+        self.bound_tools = []
+
+    def bind_tools(self, tools, tool_choice=None):
+        self.bound_tools.append(tools)
+        return self
+
+
+@pytest.fixture
+def routing_prompt_cache(monkeypatch):
+    cache = RoutingPromptCache(ToolBindingLLM())
+    monkeypatch.setattr(agent_manager_instance, "config", {"agents": AGENT_CONFIGS})
+    monkeypatch.setattr(agent_manager_instance, "selected_agents", ["crypto data", "weather"])
+    monkeypatch.setattr(app_module.delegator, "routing_prompt_cache", cache)
+    return cache
+
+
+def test_routing_prompts_are_reused_for_the_same_candidates(routing_prompt_cache):
+    routing_prompt = routing_prompt_cache.get(AGENT_CONFIGS)
+
+    assert routing_prompt_cache.get(list(reversed(AGENT_CONFIGS))) is routing_prompt
+    assert routing_prompt_cache.get(AGENT_CONFIGS[:1]) is not routing_prompt
+    assert len(routing_prompt_cache.llm.bound_tools) == 2
+
+
+def test_selecting_agents_invalidates_the_delegator_routing_prompts(routing_prompt_cache):
+    routing_prompt = routing_prompt_cache.get(AGENT_CONFIGS)
+
+    response = TestClient(app_module.app).post(
+        "/agents/selected", json={"agents": ["crypto data", "weather"]}
+    )
+
+    assert response.status_code == 200
+    rebuilt = routing_prompt_cache.get(AGENT_CONFIGS)
+    assert rebuilt is not routing_prompt
+    assert rebuilt.system_message == routing_prompt.system_message
@@ -0,0 +1,46 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.models.core import AgentResponse
+from src.routing.speculation import SpeculativeRunner
+from src.services.tracing import tracer
+
+
+def test_race_survives_candidates_cancelled_from_within():
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    async def answers():
+        await asyncio.sleep(0.01)
+        return AgentResponse.success(content="ETH is $3,000")
+
+    runner = SpeculativeRunner(top_k=2, allowed_agents=["crypto data", "default"])
+    agent, response = asyncio.run(runner.race({"crypto data": cancelled, "default": answers}))
+
+    assert agent == "default"
+    assert response.content == "ETH is $3,000"
+
+
+def test_attempts_are_traced_apart_from_the_request(monkeypatch):
+    exported = []
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "exporter", SimpleNamespace(export=exported.append))
+
+    async def answers():
+        with tracer.span("agent.chat"):
+            return AgentResponse.success(content="ETH is $3,000")
+
+    async def request():
+        with tracer.trace("POST /chat") as span:
+            runner = SpeculativeRunner(top_k=2, allowed_agents=["crypto data", "default"])
+            await runner.race({"crypto data": answers, "default": answers})
+            return span
+
+    request_span = asyncio.run(request())
+
+    attempts = [span for span in exported if span.name == "speculation.attempt"]
+    assert len(attempts) == 2
+    assert all(span.parent_id is None for span in attempts)
+    assert all(span.attributes["request_trace_id"] == request_span.trace_id for span in attempts)
+    assert [child.name for child in attempts[0].children] == ["agent.chat"]
+    assert [span.name for span in request_span.iter_spans()] == ["POST /chat", "speculation.race"]
@@ -0,0 +1,51 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from src.agents.mor_claims import tools
+from src.agents.mor_claims.agent import MorClaimsAgent
+from src.models.core import ChatMessage, ChatRequest, ResponseType
+from src.stores import agent_manager_instance
+
+WALLET = "0x0000000000000000000000000000000000000001"
+
+
+def make_request(content, conversation_id):
+    return ChatRequest(
+        prompt=ChatMessage(role="user", content=content),
+        chain_id="1",
+        wallet_address=WALLET,
+        conversation_id=conversation_id,
+    )
+
+
+@pytest.fixture
+def claims_agent():
+    yield MorClaimsAgent({"name": "mor claims"}, MagicMock(), None)
+    for conversation_id in ("no_rewards", "declined"):
+        agent_manager_instance.clear_active_agent(conversation_id)
+
+
+def test_a_wallet_without_rewards_does_not_pin_the_conversation(claims_agent, monkeypatch):
+    monkeypatch.setattr(tools, "get_current_user_reward", lambda wallet, pool: 0)
+
+    response = asyncio.run(
+        claims_agent._process_request(make_request("claim my rewards", "no_rewards"))
+    )
+
+    assert response.response_type == ResponseType.ERROR
+    assert agent_manager_instance.get_active_agent("no_rewards") is None
+
+
+def test_the_conversation_is_released_once_the_user_answers(claims_agent, monkeypatch):
+    monkeypatch.setattr(tools, "get_current_user_reward", lambda wallet, pool: pool + 1)
+
+    asyncio.run(claims_agent._process_request(make_request("claim my rewards", "declined")))
+    assert agent_manager_instance.get_active_agent("declined") == "mor claims"
+    asyncio.run(claims_agent._process_request(make_request("hmm", "declined")))
+    assert agent_manager_instance.get_active_agent("declined") == "mor claims"
+
+    response = asyncio.run(claims_agent._process_request(make_request("no thanks", "declined")))
+    assert response.response_type == ResponseType.SUCCESS
+    assert agent_manager_instance.get_active_agent("declined") is None
+    assert claims_agent.conversation_state[WALLET]["state"] == "initial"
@@ -0,0 +1,98 @@
+import asyncio
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+from src.agents.rag.documents import ConversationDocuments, DocumentEntry
+from src.agents.rag.index_store import RagIndexStore
+from src.agents.rag.lexical import LexicalIndex
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=8)
+
+
+def add_document(documents, conversation_id, key, *texts):
+    vector_store = FAISS.from_texts(
+        list(texts), EMBEDDINGS, metadatas=[{"source": f"{key}.pdf"}] * len(texts)
+    )
+    lexical_index = LexicalIndex.from_vector_store(vector_store)
+    documents.index_store.save(key, vector_store, {"filename": f"{key}.pdf"}, lexical_index)
+    entry = DocumentEntry(key=key, filename=f"{key}.pdf")
+    documents.add_document(conversation_id, entry, vector_store, lexical_index, saved=True)
+
+
+def test_conversations_search_their_own_documents_with_bounded_memory(tmp_path):
+    index_store = RagIndexStore(str(tmp_path), max_bytes=10**9, max_entries=100)
+    documents = ConversationDocuments(index_store, max_loaded=2, max_bytes=10**9, max_documents=10)
+    add_document(documents, "alice", "tokenomics", "MOR emissions decay daily")
+    add_document(documents, "alice", "roadmap", "Mainnet launches in Q3")
+    add_document(documents, "bob", "audit", "No critical issues were found")
+
+    # Only two indexes fit in memory: Alice's oldest document was dropped and is reloaded from disk
+    assert list(documents._loaded) == ["roadmap", "audit"]
+    results = asyncio.run(documents.search("alice", "MOR emissions decay daily", EMBEDDINGS, k=5))
+
+    assert [document.page_content for document in results] == [
+        "MOR emissions decay daily",
+        "Mainnet launches in Q3",
+    ]
+    assert len(documents._loaded) == 2
+
+    # Document lists survive restarts
+    restarted = ConversationDocuments(index_store, max_loaded=2, max_bytes=10**9, max_documents=10)
+    assert [document.key for document in restarted.get_documents("bob")] == ["audit"]
+    restarted.remove_conversation("bob")
+    assert ConversationDocuments(index_store, 2, 10**9, 10).get_documents("bob") == []
+
+
+def test_hybrid_search_finds_exact_terms_missed_by_embeddings(tmp_path):
+    index_store = RagIndexStore(str(tmp_path), max_bytes=10**9, max_entries=100)
+    texts = [f"Pool {number} holds liquidity for the staking contract" for number in range(20)]
+    texts.append("The MOR token contract is deployed at 0x7431ada8a591c955a994a21710752ef9b882b8e3")
+    query = "Which contract is at 0x7431ada8a591c955a994a21710752ef9b882b8e3?"
+
+    vector_only = ConversationDocuments(index_store, 10, 10**9, 10, hybrid=False)
+    add_document(vector_only, "alice", "contracts", *texts)
+    hybrid = ConversationDocuments(index_store, 10, 10**9, 10, hybrid=True)
+
+    assert texts[-1] not in [
+        document.page_content
+        for document in asyncio.run(vector_only.search("alice", query, EMBEDDINGS, k=3))
+    ]
+    # The lexical index is reloaded from disk alongside the vector index
+    results = asyncio.run(hybrid.search("alice", query, EMBEDDINGS, k=3))
+    assert results[0].page_content == texts[-1]
+
+
+def test_searches_only_wait_for_updates_of_their_own_documents(tmp_path):
+    index_store = RagIndexStore(str(tmp_path), max_bytes=10**9, max_entries=100)
+    documents = ConversationDocuments(index_store, 10, 10**9, 10)
+    add_document(documents, "alice", "tokenomics", "MOR emissions decay daily")
+    add_document(documents, "bob", "audit", "No critical issues were found")
+
+    async def search_while_updating():
+        async with documents.lock_for("tokenomics"):
+            results = await asyncio.wait_for(
+                documents.search("bob", "critical issues", EMBEDDINGS, k=1), timeout=5
+            )
+            blocked = asyncio.create_task(documents.search("alice", "MOR", EMBEDDINGS, k=1))
+            await asyncio.sleep(0.1)
+            assert not blocked.done()
+        return results, await blocked
+
+    bob_results, alice_results = asyncio.run(search_while_updating())
+
+    assert bob_results[0].page_content == "No critical issues were found"
+    assert alice_results[0].page_content == "MOR emissions decay daily"
+
+
+def test_document_lists_cached_in_memory_are_bounded(tmp_path):
+    index_store = RagIndexStore(str(tmp_path), max_bytes=10**9, max_entries=100)
+    documents = ConversationDocuments(index_store, 10, 10**9, 10, max_manifests=2)
+    for conversation_id in ("alice", "bob", "carol"):
+        add_document(documents, conversation_id, f"{conversation_id}-notes", "MOR emissions")
+    for number in range(100):
+        assert documents.get_documents(f"unknown-{number}") == []
+
+    assert list(documents._documents) == ["bob", "carol"]
+    # Lists that left the cache are read back from their manifest
+    assert [document.key for document in documents.get_documents("alice")] == ["alice-notes"]
+    assert list(documents._documents) == ["carol", "alice"]
@@ -0,0 +1,43 @@
+import asyncio
+
+from src.agents.rag.embedding_cache import CachedDocumentEmbedder, EmbeddingCache
+
+
+class CountingEmbeddings:
+    """Embeds texts by length, recording batch sizes and the peak number of concurrent calls"""
+
+    def __init__(self):
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def aembed_documents(self, texts):
+        self.batches.append(len(texts))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_only_distinct_cache_misses_are_embedded_in_bounded_batches(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.db"))
+    embeddings = CountingEmbeddings()
+    embedder = CachedDocumentEmbedder(
+        embeddings, model="test", cache=cache, batch_size=3, concurrency=2
+    )
+    disclaimer = "Not financial advice."
+    texts = [disclaimer] + [f"chunk {i}" * (i + 1) for i in range(9)] + [disclaimer]
+
+    vectors, stats = asyncio.run(embedder.embed(texts))
+
+    assert vectors == [[float(len(text)), 1.0] for text in texts]
+    assert embeddings.batches == [3, 3, 3, 1]
+    assert embeddings.max_in_flight == 2
+    assert (stats.chunks, stats.cache_hits) == (11, 1)
+
+    # A second document sharing the disclaimer only embeds its new chunk
+    vectors, stats = asyncio.run(embedder.embed([disclaimer, "new chunk"]))
+    assert vectors == [[21.0, 1.0], [9.0, 1.0]]
+    assert embeddings.batches[-1] == 1
+    assert stats.cache_hit_ratio == 0.5
@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import fitz
+import httpx
+import pytest
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from src import app as app_module
+from src.agents.rag import agent as rag_agent_module
+from src.agents.rag.agent import RagAgent
+from src.agents.rag.documents import conversation_documents
+from src.agents.rag.index_store import rag_index_store
+from src.agents.rag.ingestion import IngestionJob
+from src.config import Config
+from src.models.core import ChatMessage, ChatRequest, ResponseType
+from src.stores import agent_manager_instance, chat_manager_instance
+
+CONVERSATION_ID = "ingestion_test"
+OTHER_CONVERSATION_ID = "ingestion_test_other"
+
+
+def make_pdf(pages):
+    document = fitz.open()
+    for number in range(pages):
+        document.new_page().insert_text((72, 72), f"Page {number} mentions token MOR{number}.")
+    return document.tobytes()
+
+
+@pytest.fixture
+def rag_agent(monkeypatch, tmp_path):
+    agent = RagAgent({"name": "rag"}, None, DeterministicFakeEmbedding(size=8))
+    monkeypatch.setattr(agent_manager_instance, "agents", {"rag": agent})
+    monkeypatch.setattr(rag_index_store, "root", str(tmp_path / "indexes"))
+    monkeypatch.setattr(rag_agent_module, "UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setattr(Config, "RAG_INGEST_PAGE_BATCH", 2)
+    yield agent
+    for conversation_id in (CONVERSATION_ID, OTHER_CONVERSATION_ID):
+        chat_manager_instance.delete_conversation(conversation_id)
+        conversation_documents.remove_conversation(conversation_id)
+
+
+def test_upload_returns_a_job_reporting_incremental_progress(rag_agent):
+    async def upload_and_follow():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/rag/upload",
+                files={"file": ("whitepaper.pdf", make_pdf(5), "application/pdf")},
+                data={"conversation_id": CONVERSATION_ID},
+            )
+            assert response.status_code == 202
+            job_id = response.json()["metadata"]["job_id"]
+            events = (await client.get(f"/rag/jobs/{job_id}/events")).text
+            status = (await client.get(f"/rag/jobs/{job_id}")).json()
+            return events, status
+
+    events, status = asyncio.run(upload_and_follow())
+
+    names = [line.split(": ", 1)[1] for line in events.splitlines() if line.startswith("event: ")]
+    payloads = [
+        json.loads(line.split(": ", 1)[1])
+        for line in events.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert names[-1] == "completed"
+    # Pages are embedded two at a time; the stream may coalesce updates, but never skips ahead
+    running = [payload["pages_done"] for payload in payloads if payload["status"] == "running"]
+    assert running == sorted(running) and set(running) <= {0, 2, 4, 5}
+    assert any(0 < pages_done < 5 for pages_done in running)
+    assert (status["pages_total"], status["pages_done"], status["chunks_done"]) == (5, 5, 5)
+    assert chat_manager_instance.get_uploaded_file_status(CONVERSATION_ID)
+    assert (
+        chat_manager_instance.get_messages(CONVERSATION_ID)[-1]["content"]
+        == "You have successfully uploaded the text"
+    )
+    assert [
+        document.filename for document in conversation_documents.get_documents(CONVERSATION_ID)
+    ] == ["whitepaper.pdf"]
+    assert not conversation_documents.get_documents("default")
+
+
+def test_concurrent_uploads_of_a_document_share_one_ingestion(rag_agent, monkeypatch):
+    embedded = []
+    embed = rag_agent.document_embedder.embed
+
+    async def counting_embed(texts):
+        embedded.extend(texts)
+        return await embed(texts)
+
+    monkeypatch.setattr(rag_agent.document_embedder, "embed", counting_embed)
+    content = make_pdf(3)
+    jobs = [
+        IngestionJob(
+            job_id=conversation_id, filename="whitepaper.pdf", conversation_id=conversation_id
+        )
+        for conversation_id in (CONVERSATION_ID, OTHER_CONVERSATION_ID)
+    ]
+
+    async def upload_twice():
+        await asyncio.gather(*(rag_agent.ingest(job, content) for job in jobs))
+
+    asyncio.run(upload_twice())
+
+    assert len(embedded) == 3
+    assert (jobs[0].reused_index, jobs[1].reused_index) == (False, True)
+    [first] = conversation_documents.get_documents(CONVERSATION_ID)
+    [second] = conversation_documents.get_documents(OTHER_CONVERSATION_ID)
+    assert first.key == second.key and first.key in conversation_documents._loaded
+    assert first.key not in conversation_documents._ingesting
+
+
+def test_documents_are_queried_without_the_chat_upload_flag(rag_agent, monkeypatch):
+    job = IngestionJob(job_id="flag", filename="whitepaper.pdf", conversation_id=CONVERSATION_ID)
+    asyncio.run(rag_agent.ingest(job, make_pdf(2)))
+    # A restart without chat persistence forgets the flag, but the document manifest remains
+    chat_manager_instance.set_uploaded_file(False, CONVERSATION_ID)
+
+    async def answer(prompt, retrieved_docs):
+        return retrieved_docs[0].metadata["source"]
+
+    monkeypatch.setattr(rag_agent, "_get_rag_response", answer)
+    request = ChatRequest(
+        prompt=ChatMessage(role="user", content="Which token is on page 1?"),
+        chain_id="1",
+        wallet_address="",
+        conversation_id=CONVERSATION_ID,
+    )
+    response = asyncio.run(rag_agent._process_request(request))
+
+    assert response.response_type == ResponseType.SUCCESS
+    assert response.content == "whitepaper.pdf"
@@ -0,0 +1,39 @@
+import os
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+from src.agents.rag.index_store import RagIndexStore, make_index_key
+
+EMBEDDINGS = DeterministicFakeEmbedding(size=8)
+
+
+def build_index(text):
+    return FAISS.from_texts([text], EMBEDDINGS)
+
+
+def test_index_key_depends_on_content_model_and_chunking():
+    key = make_index_key(b"whitepaper", "nomic-embed-text", 1024, 20)
+
+    assert key == make_index_key(b"whitepaper", "nomic-embed-text", 1024, 20)
+    assert len(key) == 64 + 1 + 16
+    assert key != make_index_key(b"whitepaper v2", "nomic-embed-text", 1024, 20)
+    assert key != make_index_key(b"whitepaper", "other-model", 1024, 20)
+    assert key != make_index_key(b"whitepaper", "nomic-embed-text", 512, 20)
+
+
+def test_saved_indexes_are_reloaded_and_least_recently_used_are_evicted(tmp_path):
+    store = RagIndexStore(str(tmp_path), max_bytes=10**9, max_entries=2)
+    for name in ["a", "b"]:
+        store.save(name, build_index(f"document {name}"), {"filename": f"{name}.pdf"})
+    os.utime(tmp_path / "a" / "index.json", (0, 0))
+    os.utime(tmp_path / "b" / "index.json", (1, 1))
+
+    # Loading "a" makes "b" the least recently used index
+    loaded = store.load("a", EMBEDDINGS)
+    assert loaded.similarity_search("document a", k=1)[0].page_content == "document a"
+    store.save("c", build_index("document c"), {"filename": "c.pdf"})
+
+    assert [entry.key for entry in store.entries()] == ["a", "c"]
+    assert store.load("b", EMBEDDINGS) is None
+    assert store.get_metadata("c")["filename"] == "c.pdf"
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")]
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from src.agents.rag.documents import ConversationDocuments, DocumentEntry
+from src.agents.rag.index_store import RagIndexStore
+from src.agents.rag.lexical import LexicalIndex
+from tests.rag_retrieval_benchmarks.config import Config
+from tests.rag_retrieval_benchmarks.helpers import (
+    WordHashingEmbeddings,
+    build_corpus,
+    build_queries,
+    evaluate,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    chunks = build_corpus(Config.CHUNKS, Config.DESCRIPTIVE_WORDS, Config.SEED)
+    texts = [chunk.text for chunk in chunks]
+    ids = [str(number) for number in range(len(chunks))]
+    embeddings = WordHashingEmbeddings(Config.EMBEDDING_SIZE)
+    vector_store = FAISS.from_embeddings(
+        list(zip(texts, embeddings.embed_documents(texts))),
+        embeddings,
+        metadatas=[{"chunk": chunk_id} for chunk_id in ids],
+        ids=ids,
+    )
+    lexical_index = LexicalIndex()
+    lexical_index.add(ids, texts)
+    index_store = RagIndexStore(
+        str(tmp_path_factory.mktemp("rag_indexes")), max_bytes=10**10, max_entries=10
+    )
+    return chunks, embeddings, vector_store, lexical_index, index_store
+
+
+def make_retrievers(embeddings, vector_store, lexical_index, index_store):
+    """Vector-only, BM25-only and hybrid retrievers of one document, returning chunk numbers"""
+    retrievers = {}
+    for name, hybrid in [("vector", False), ("hybrid", True)]:
+        documents = ConversationDocuments(index_store, 10, 10**10, 10, hybrid=hybrid)
+        entry = DocumentEntry(key="corpus", filename="corpus.pdf")
+        documents.add_document("benchmark", entry, vector_store, lexical_index, saved=False)
+
+        async def search(query, documents=documents):
+            results = await documents.search("benchmark", query, embeddings, Config.K)
+            return [int(document.metadata["chunk"]) for document in results]
+
+        retrievers[name] = search
+
+    async def bm25(query):
+        return [int(chunk_id) for chunk_id, _ in lexical_index.search(query, Config.K)]
+
+    retrievers["bm25"] = bm25
+    return retrievers
+
+
+def test_hybrid_retrieval_quality_and_latency(corpus):
+    chunks, embeddings, vector_store, lexical_index, index_store = corpus
+    retrievers = make_retrievers(embeddings, vector_store, lexical_index, index_store)
+    exact, semantic = build_queries(chunks, Config.QUERIES, Config.SEED)
+
+    results = {}
+    for kind, queries in [("exact", exact), ("semantic", semantic)]:
+        for name, search in retrievers.items():
+            recall, mrr, p50, p95 = asyncio.run(evaluate(search, queries, Config.K))
+            results[(kind, name)] = recall
+            logger.info(
+                f"{kind} queries, {name}: recall@{Config.K} {recall:.2f}, MRR {mrr:.2f}, "
+                f"p50 {p50:.2f}ms, p95 {p95:.2f}ms"
+            )
+            if name == "hybrid":
+                assert p95 <= Config.MAX_HYBRID_P95_MS
+
+    for kind in ["exact", "semantic"]:
+        assert results[(kind, "hybrid")] >= results[(kind, "vector")]
+    assert results[("exact", "hybrid")] >= Config.MIN_HYBRID_EXACT_RECALL
+
+
+if __name__ == "__main__":
+    pytest.main()
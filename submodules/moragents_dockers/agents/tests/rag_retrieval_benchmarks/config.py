@@ -0,0 +1,17 @@
+class Config:
+    SEED = 7
+
+    # Synthetic corpus: chunks describing token contracts, each with a random address, ticker, amount and a few
+    # descriptive words, in one uploaded document
+    CHUNKS = 3000
+    DESCRIPTIVE_WORDS = 3
+    EMBEDDING_SIZE = 256
+
+    # Queries per kind: "exact" asks about a contract address or amount, "semantic" paraphrases a chunk's words
+    QUERIES = 200
+    K = 5
+
+    # Hybrid search must recall at least this share of the chunks asked about exactly, and answer within this
+    # 95th percentile latency
+    MIN_HYBRID_EXACT_RECALL = 0.95
+    MAX_HYBRID_P95_MS = 50.0
@@ -0,0 +1,157 @@
+import hashlib
+import math
+import random
+import re
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+TOPICS = [
+    "staking",
+    "lending",
+    "bridge",
+    "governance",
+    "liquidity",
+    "vesting",
+    "oracle",
+    "treasury",
+]
+TEMPLATE = (
+    "The {topic} contract for {ticker} is deployed at {address}. "
+    "It currently holds {amount} {ticker} and is described as {words}. "
+    "Operators should review the {topic} parameters before upgrading."
+)
+WORDS = [
+    f"{prefix}{suffix}"
+    for prefix in [
+        "amber",
+        "brisk",
+        "cobalt",
+        "dusky",
+        "ember",
+        "frost",
+        "gilded",
+        "hollow",
+        "ivory",
+        "jade",
+    ]
+    for suffix in [
+        "falcon",
+        "harbor",
+        "meadow",
+        "summit",
+        "lantern",
+        "canyon",
+        "orchard",
+        "beacon",
+        "glacier",
+        "reef",
+    ]
+]
+
+
+@dataclass
+class Chunk:
+    text: str
+    address: str
+    amount: str
+    words: List[str]
+    topic: str
+
+
+@dataclass
+class Query:
+    text: str
+    relevant: int
+
+
+class WordHashingEmbeddings(Embeddings):
+    """
+    Local stand-in for a dense embedding model: hashed bag of alphabetic words, L2-normalized.
+
+    Like real embedding models it captures which words a text uses but not the exact characters of
+    identifiers: hex addresses and numbers do not contribute to the vector at all.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for word in re.findall(r"\b[a-z]{3,}\b", text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.size] += 1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def build_corpus(count: int, descriptive_words: int, seed: int) -> List[Chunk]:
+    """Random contract descriptions; addresses, tickers and amounts are unique per chunk"""
+    rng = random.Random(seed)
+    chunks = []
+    for number in range(count):
+        topic = rng.choice(TOPICS)
+        words = rng.sample(WORDS, descriptive_words)
+        address = "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(40))
+        amount = f"{rng.randint(1, 999)},{rng.randint(0, 999):03d},{rng.randint(0, 999):03d}"
+        ticker = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(4)) + str(number)
+        text = TEMPLATE.format(
+            topic=topic, ticker=ticker, address=address, amount=amount, words=" ".join(words)
+        )
+        chunks.append(Chunk(text=text, address=address, amount=amount, words=words, topic=topic))
+    return chunks
+
+
+def build_queries(
+    chunks: Sequence[Chunk], count: int, seed: int
+) -> Tuple[List[Query], List[Query]]:
+    """Exact queries naming an address or amount, and semantic ones paraphrasing a chunk"""
+    rng = random.Random(seed + 1)
+    exact, semantic = [], []
+    for relevant in rng.sample(range(len(chunks)), count):
+        chunk = chunks[relevant]
+        if rng.random() < 0.5:
+            exact.append(Query(f"What does the contract at {chunk.address} do?", relevant))
+        else:
+            exact.append(Query(f"Which contract holds {chunk.amount} tokens?", relevant))
+        words = list(chunk.words)
+        rng.shuffle(words)
+        semantic.append(
+            Query(f"Find the {chunk.topic} pool that is {' and '.join(words)}", relevant)
+        )
+    return exact, semantic
+
+
+async def evaluate(
+    search: Callable[[str], Awaitable[List[int]]], queries: Sequence[Query], k: int
+) -> Tuple[float, float, float, float]:
+    """
+    Run queries against a retriever.
+
+    Returns:
+        Tuple[float, float, float, float]: Recall@k, mean reciprocal rank, p50 and p95 latency in
+            milliseconds
+    """
+    hits, reciprocal_ranks, latencies = 0, 0.0, []
+    for query in queries:
+        start = time.perf_counter()
+        results = (await search(query.text))[:k]
+        latencies.append((time.perf_counter() - start) * 1000)
+        if query.relevant in results:
+            hits += 1
+            reciprocal_ranks += 1 / (results.index(query.relevant) + 1)
+    quantiles = statistics.quantiles(latencies, n=20)
+    return (
+        hits / len(queries),
+        reciprocal_ranks / len(queries),
+        statistics.median(latencies),
+        quantiles[18],
+    )
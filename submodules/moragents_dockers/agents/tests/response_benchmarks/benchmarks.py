@@ -0,0 +1,40 @@
+import gzip
+import logging
+
+import pytest
+from src.models.core import AgentResponse
+from src.stores.chat_manager import ChatManager
+from tests.response_benchmarks.config import Config
+from tests.response_benchmarks.helpers import (
+    legacy_response_path,
+    serialize_once_response_path,
+    time_per_call,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.parametrize("kind", list(Config.RESPONSES))
+def test_response_serialization_overhead(kind):
+    # Keep ChatManager's per-message logs out of the measurement
+    logging.getLogger("src.stores.chat_manager").setLevel(logging.WARNING)
+    agent_response = AgentResponse(**Config.RESPONSES[kind])
+    iterations = Config.ITERATIONS if kind == "text" else Config.ITERATIONS // 20
+
+    legacy = time_per_call(legacy_response_path, agent_response, iterations, Config.REPEATS)
+    serialize_once = time_per_call(
+        serialize_once_response_path, agent_response, iterations, Config.REPEATS
+    )
+    body = serialize_once_response_path(ChatManager(), agent_response)
+    logger.info(
+        f"{kind} response ({len(body)} bytes, {len(gzip.compress(body))} gzipped): "
+        f"legacy {legacy:.1f}us, serialize-once {serialize_once:.1f}us "
+        f"({serialize_once / legacy:.2f}x)"
+    )
+
+    assert serialize_once <= legacy * Config.MAX_TIME_RATIO
+
+
+if __name__ == "__main__":
+    pytest.main()
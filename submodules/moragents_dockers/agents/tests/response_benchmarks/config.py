@@ -0,0 +1,27 @@
+import base64
+import os
+
+
+class Config:
+    ITERATIONS = 2000
+    REPEATS = 5
+
+    # A plain text answer and an image answer carrying a base64 payload in its metadata, like ImagenAgent's
+    RESPONSES = {
+        "text": {
+            "response_type": "success",
+            "content": "The price of ETH is $3,456.78. " * 20,
+            "metadata": {"coin": "ETH", "price": 3456.78},
+        },
+        "image": {
+            "response_type": "success",
+            "content": "Here is your image.",
+            "metadata": {
+                "success": True,
+                "image": base64.b64encode(os.urandom(512 * 1024)).decode(),
+            },
+        },
+    }
+
+    # The serialize-once path must take at most this fraction of the legacy path's time
+    MAX_TIME_RATIO = 0.8
@@ -0,0 +1,38 @@
+import json
+import timeit
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+from src.models.core import AgentResponse
+from src.services.responses import FastJSONResponse
+from src.stores.chat_manager import ChatManager
+
+
+def legacy_response_path(chat_manager: ChatManager, agent_response: AgentResponse) -> bytes:
+    """Response handling of /chat before serialize-once: three .dict() calls, default encoding"""
+    chat_manager.add_response(agent_response.dict(), "default", "benchmark")
+    f"Sending response: {agent_response.dict()}"
+    content = agent_response.dict()
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def serialize_once_response_path(chat_manager: ChatManager, agent_response: AgentResponse) -> bytes:
+    """Response handling of /chat now: history from the model, one .dict() rendered by orjson"""
+    chat_manager.add_response(agent_response, "default", "benchmark")
+    return FastJSONResponse(agent_response.dict()).body
+
+
+def time_per_call(
+    path: Callable[[ChatManager, AgentResponse], bytes],
+    agent_response: AgentResponse,
+    iterations: int,
+    repeats: int,
+) -> float:
+    """Best time of a response path over several repeats, in microseconds per response"""
+    chat_manager = ChatManager(max_messages=10)
+    best = min(
+        timeit.repeat(lambda: path(chat_manager, agent_response), number=iterations, repeat=repeats)
+    )
+    return best / iterations * 1e6
@@ -0,0 +1,119 @@
+from fastapi.testclient import TestClient
+from src import app as app_module
+from src.stores import chat_manager_instance
+
+CONVERSATION_ID = "messages_cursor_test"
+
+
+def test_messages_since_cursor_with_etag():
+    client = TestClient(app_module.app)
+    params = {"conversation_id": CONVERSATION_ID}
+    try:
+        for i in range(3):
+            chat_manager_instance.add_message(
+                {"role": "user", "content": f"message {i}"}, CONVERSATION_ID
+            )
+
+        response = client.get("/chat/messages", params={**params, "limit": 2})
+        first_page = response.json()
+        assert len(first_page["messages"]) == 2
+        assert first_page["has_more"]
+
+        # A validator of the first page does not hide the next one
+        rest = client.get(
+            "/chat/messages",
+            params={**params, "since": first_page["cursor"]},
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        assert rest.status_code == 200
+        assert [message["content"] for message in rest.json()["messages"]] == [
+            "message 1",
+            "message 2",
+        ]
+        assert not rest.json()["has_more"]
+
+        # Unchanged conversations are not serialized again
+        etag = rest.headers["ETag"]
+        unchanged = client.get(
+            "/chat/messages",
+            params={**params, "since": first_page["cursor"]},
+            headers={"If-None-Match": etag},
+        )
+        assert unchanged.status_code == 304
+
+        chat_manager_instance.add_message({"role": "user", "content": "message 3"}, CONVERSATION_ID)
+        changed = client.get(
+            "/chat/messages",
+            params={**params, "since": rest.json()["cursor"]},
+            headers={"If-None-Match": etag},
+        )
+        assert changed.status_code == 200
+        assert [message["content"] for message in changed.json()["messages"]] == ["message 3"]
+        assert not changed.json()["reset"]
+    finally:
+        chat_manager_instance.delete_conversation(CONVERSATION_ID)
+
+
+def test_polling_past_a_clear_resets_the_history():
+    client = TestClient(app_module.app)
+    params = {"conversation_id": CONVERSATION_ID}
+    try:
+        chat_manager_instance.add_message({"role": "user", "content": "before"}, CONVERSATION_ID)
+        cursor = client.get("/chat/messages", params=params).json()["cursor"]
+        client.get("/chat/clear", params=params)
+        chat_manager_instance.add_message({"role": "user", "content": "after"}, CONVERSATION_ID)
+
+        page = client.get("/chat/messages", params={**params, "since": cursor}).json()
+        assert page["reset"]
+        assert [message["content"] for message in page["messages"][1:]] == ["after"]
+
+        page = client.get("/chat/messages", params={**params, "since": page["cursor"]}).json()
+        assert (page["reset"], page["messages"]) == (False, [])
+    finally:
+        chat_manager_instance.delete_conversation(CONVERSATION_ID)
+
+
+def test_search_ranks_matches_and_filters_by_conversation():
+    client = TestClient(app_module.app)
+    other_id = f"{CONVERSATION_ID}_other"
+    try:
+        chat_manager_instance.add_message(
+            {"role": "user", "content": "Swap ETH for USDC on Base"}, CONVERSATION_ID
+        )
+        chat_manager_instance.add_message(
+            {"role": "user", "content": "What is the ETH price?"}, CONVERSATION_ID
+        )
+        chat_manager_instance.add_message(
+            {"role": "user", "content": "Swap my swap tokens"}, other_id
+        )
+
+        results = client.get("/chat/search", params={"q": "swap"}).json()["results"]
+        assert [result["conversation_id"] for result in results] == [other_id, CONVERSATION_ID]
+        assert results[0]["snippet"] == "Swap my swap tokens"
+
+        results = client.get(
+            "/chat/search", params={"q": "eth swap", "conversation_id": CONVERSATION_ID}
+        ).json()
+        assert [result["content"] for result in results["results"]] == [
+            "Swap ETH for USDC on Base",
+            "What is the ETH price?",
+        ]
+
+        chat_manager_instance.clear_messages(CONVERSATION_ID)
+        chat_manager_instance.delete_conversation(other_id)
+        assert client.get("/chat/search", params={"q": "swap"}).json()["results"] == []
+    finally:
+        chat_manager_instance.delete_conversation(CONVERSATION_ID)
+        chat_manager_instance.delete_conversation(other_id)
+
+
+def test_created_conversations_get_unique_ids():
+    client = TestClient(app_module.app)
+    first = client.post("/chat/conversations").json()["conversation_id"]
+    client.delete(f"/chat/conversations/{first}")
+    second = client.post("/chat/conversations").json()["conversation_id"]
+    try:
+        assert first != second
+        assert second in client.get("/chat/conversations").json()["conversation_ids"]
+    finally:
+        client.delete(f"/chat/conversations/{second}")
@@ -0,0 +1,144 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain.schema import AIMessage, HumanMessage
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from src import app as app_module
+from src.agents.agent_core.agent import AgentCore
+from src.agents.agent_core.streaming import get_token_sink
+from src.config import Config
+from src.models.core import AgentResponse, ChatMessage, ChatRequest
+from src.services.admission import admission_controller
+from src.stores import agent_manager_instance, chat_manager_instance
+
+CONVERSATION_ID = "chat_stream_test"
+AGENT_CONFIGS = [
+    {
+        "name": "streamer",
+        "description": "Streams its answer",
+        "command": "streamer",
+        "upload_required": False,
+    }
+]
+
+
+class StreamingAgent(AgentCore):
+    """Answers with the streamed reply of its model, optionally waiting forever afterwards"""
+
+    def __init__(self, reply, hold=False):
+        super().__init__({"name": "streamer"}, GenericFakeChatModel(messages=iter([reply])), None)
+        self.hold = hold
+        self.holding = asyncio.Event()
+        self.cancelled = False
+
+    async def _process_request(self, request):
+        result = await self._invoke_llm(self.llm, [HumanMessage(content=request.prompt.content)])
+        if self.hold:
+            self.holding.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+        return AgentResponse.success(content=result.content)
+
+    async def _execute_tool(self, func_name, args):
+        raise NotImplementedError
+
+
+class FailingAgent:
+    async def chat(self, request):
+        raise ValueError("bad prompt")
+
+
+@pytest.fixture
+def use_agent(monkeypatch):
+    monkeypatch.setattr(agent_manager_instance, "config", {"agents": AGENT_CONFIGS})
+    monkeypatch.setattr(agent_manager_instance, "selected_agents", ["streamer"])
+    # Commands skip admission by default; take a slot so its release can be checked
+    monkeypatch.setattr(Config, "ADMISSION_BYPASS_COMMANDS", False)
+
+    def use(agent):
+        monkeypatch.setattr(agent_manager_instance, "agents", {"streamer": agent})
+
+    yield use
+    chat_manager_instance.delete_conversation(CONVERSATION_ID)
+    agent_manager_instance.clear_active_agent(CONVERSATION_ID)
+
+
+def make_request(content):
+    return {
+        "prompt": {"role": "user", "content": content},
+        "chain_id": "1",
+        "wallet_address": "0x0",
+        "conversation_id": CONVERSATION_ID,
+    }
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_stream_sends_tokens_then_the_response(use_agent):
+    use_agent(StreamingAgent(AIMessage(content="MOR emissions decay daily")))
+
+    response = TestClient(app_module.app).post(
+        "/chat/stream", json=make_request("/streamer How do emissions work?")
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    names = [name for name, _ in events]
+    assert names == ["token"] * (len(names) - 1) + ["response"]
+    assert len(names) > 2
+    tokens = "".join(data["content"] for name, data in events if name == "token")
+    assert tokens == "MOR emissions decay daily"
+    final = events[-1][1]
+    assert (final["agentName"], final["content"]) == ("streamer", tokens)
+    assert chat_manager_instance.get_last_message(CONVERSATION_ID)["content"] == tokens
+
+
+def test_stream_reports_agent_failures_as_an_error_event(use_agent):
+    use_agent(FailingAgent())
+    in_flight = admission_controller.in_flight
+
+    response = TestClient(app_module.app).post("/chat/stream", json=make_request("/streamer hi"))
+
+    assert parse_events(response.text) == [("error", {"status_code": 400, "detail": "bad prompt"})]
+    assert admission_controller.in_flight == in_flight
+
+
+def test_disconnecting_mid_stream_stops_the_agent_and_frees_its_slot(use_agent):
+    agent = StreamingAgent(AIMessage(content="partial answer"), hold=True)
+    use_agent(agent)
+    in_flight = admission_controller.in_flight
+
+    async def disconnect_after_first_token():
+        response = await app_module.chat_stream(
+            ChatRequest(
+                prompt=ChatMessage(role="user", content="/streamer hi"),
+                chain_id="1",
+                wallet_address="0x0",
+                conversation_id=CONVERSATION_ID,
+            )
+        )
+        assert admission_controller.in_flight == in_flight + 1
+        first_event = await response.body_iterator.__anext__()
+        await agent.holding.wait()
+        await response.body_iterator.aclose()
+        # Let the cancelled chat unwind
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert first_event.startswith("event: token")
+        assert agent.cancelled
+        assert admission_controller.in_flight == in_flight
+
+    asyncio.run(disconnect_after_first_token())
+    assert get_token_sink() is None
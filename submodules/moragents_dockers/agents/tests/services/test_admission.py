@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from src import app as app_module
+from src.models.core import AgentResponse
+from src.services.admission import AdmissionController, AdmissionRejected, admission_controller
+from src.stores import agent_manager_instance
+
+
+def test_controller_queues_then_rejects_when_saturated():
+    async def scenario():
+        controller = AdmissionController(
+            max_in_flight=1, max_queue=1, queue_timeout=0.05, retry_after=3
+        )
+        first = await controller.acquire()
+
+        # The second request queues behind the first one, the third finds the queue full
+        queued = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as queue_full:
+            await controller.acquire()
+        assert queue_full.value.status_code == 429
+        assert queue_full.value.retry_after == 3
+
+        # Releasing the first slot hands it over to the queued request
+        first.release()
+        second = await queued
+        assert controller.in_flight == 1
+
+        # A queued request that cannot start before the deadline is rejected
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await controller.acquire()
+        assert timed_out.value.status_code == 503
+
+        second.release()
+        second.release()
+        assert controller.in_flight == 0
+        assert controller.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+class EchoAgent:
+    async def chat(self, request):
+        return AgentResponse.success(content=request.prompt.content)
+
+
+def test_chat_rejects_with_retry_after_and_commands_bypass(monkeypatch):
+    agent_configs = [
+        {"name": "echo", "description": "Echoes", "command": "echo", "upload_required": False}
+    ]
+    monkeypatch.setattr(agent_manager_instance, "config", {"agents": agent_configs})
+    monkeypatch.setattr(agent_manager_instance, "selected_agents", ["echo"])
+    monkeypatch.setattr(agent_manager_instance, "agents", {"echo": EchoAgent()})
+    monkeypatch.setattr(admission_controller, "max_in_flight", 0)
+    monkeypatch.setattr(admission_controller, "max_queue", 0)
+    client = TestClient(app_module.app)
+    request = {"chain_id": "1", "wallet_address": "0x0", "conversation_id": "admission_test"}
+
+    try:
+        rejected = client.post(
+            "/chat", json={**request, "prompt": {"role": "user", "content": "hello"}}
+        )
+        assert rejected.status_code == 429
+        assert rejected.headers["Retry-After"] == str(admission_controller.retry_after)
+
+        command = client.post(
+            "/chat", json={**request, "prompt": {"role": "user", "content": "/echo hello"}}
+        )
+        assert command.status_code == 200
+        assert command.json()["content"] == "hello"
+    finally:
+        app_module.chat_manager_instance.delete_conversation("admission_test")
+        agent_manager_instance.clear_active_agent("admission_test")
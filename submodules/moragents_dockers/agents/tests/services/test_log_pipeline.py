@@ -0,0 +1,77 @@
+import json
+import logging
+import logging.handlers
+import queue
+
+from src.services import metrics
+from src.services.log_pipeline import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    TruncatingQueueListener,
+    truncate_payload,
+)
+
+
+def test_long_strings_are_truncated_with_a_hash_of_the_full_value():
+    image = "iVBORw0KGgo" * 1000
+    truncated = truncate_payload(
+        {"content": "short", "metadata": {"images": [image]}}, max_chars=20
+    )
+
+    assert truncated["content"] == "short"
+    assert truncated["metadata"]["images"][0].startswith(
+        image[:20] + "... [truncated 11000 chars, sha256:"
+    )
+    assert truncated == truncate_payload(
+        {"content": "short", "metadata": {"images": [image]}}, max_chars=20
+    )
+
+
+def test_records_are_written_as_truncated_json_lines(tmp_path):
+    path = tmp_path / "app.log"
+    file_handler = logging.FileHandler(path)
+    file_handler.setFormatter(JsonFormatter())
+    log_queue = queue.Queue(maxsize=10)
+    listener = TruncatingQueueListener(log_queue, file_handler, max_field_chars=10)
+    logger = logging.getLogger("test_log_pipeline")
+    logger.propagate = False
+    logger.addHandler(NonBlockingQueueHandler(log_queue))
+
+    listener.start()
+    logger.warning(
+        "Sending response to %s", "conversation_1", extra={"content": "x" * 100, "agent": "default"}
+    )
+    listener.stop()
+    logger.handlers.clear()
+    file_handler.close()
+
+    entry = json.loads(path.read_text())
+    assert entry["level"] == "WARNING" and entry["logger"] == "test_log_pipeline"
+    assert entry["message"].startswith("Sending re... [truncated 34 chars, sha256:")
+    assert entry["agent"] == "default"
+    assert entry["content"].startswith("xxxxxxxxxx... [truncated 100 chars")
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    dropped = metrics.log_records_dropped.get(reason="queue_full")
+
+    for _ in range(3):
+        handler.handle(logging.LogRecord("test", logging.INFO, __file__, 0, "message", None, None))
+
+    assert metrics.log_records_dropped.get(reason="queue_full") == dropped + 2
+
+
+def test_sampling_keeps_warnings_and_uses_the_closest_logger_rate():
+    sampling_filter = SamplingFilter({"src.stores": 0.0, "src.stores.agent_manager": 1.0})
+
+    def kept(name, level=logging.INFO):
+        return sampling_filter.filter(
+            logging.LogRecord(name, level, __file__, 0, "message", None, None)
+        )
+
+    assert not kept("src.stores.chat_manager")
+    assert kept("src.stores.chat_manager", logging.WARNING)
+    assert kept("src.stores.agent_manager")
+    assert kept("src.delegator")
@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+from src import app as app_module
+from src.services.metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry(prefix="test_")
+    requests = registry.counter("upstream_requests", "Upstream calls", ["upstream", "status_code"])
+    latency = registry.histogram("latency_seconds", "Latency", ["agent"], buckets=(0.1, 1.0))
+    in_flight = registry.gauge("in_flight", "In flight")
+
+    requests.inc(upstream="coingecko", status_code=200)
+    requests.inc(2, upstream="coingecko", status_code=200)
+    latency.observe(0.05, agent="crypto data")
+    latency.observe(0.5, agent="crypto data")
+    latency.observe(5, agent="crypto data")
+    with in_flight.track_in_progress():
+        assert in_flight.get() == 1
+
+    lines = registry.render().splitlines()
+    assert "# TYPE test_upstream_requests_total counter" in lines
+    assert 'test_upstream_requests_total{upstream="coingecko",status_code="200"} 3' in lines
+    assert 'test_latency_seconds_bucket{agent="crypto data",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{agent="crypto data",le="1"} 2' in lines
+    assert 'test_latency_seconds_bucket{agent="crypto data",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{agent="crypto data"} 3' in lines
+    assert "test_in_flight 0" in lines
+
+
+def test_metrics_endpoint_reports_requests_per_route():
+    client = TestClient(app_module.app)
+    client.get("/chat/conversations")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/chat/conversations",status_code="200"' in response.text
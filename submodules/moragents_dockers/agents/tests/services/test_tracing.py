@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from src import app as app_module
+from src.models.core import AgentResponse
+from src.services.tracing import tracer
+from src.stores import agent_manager_instance, chat_manager_instance
+
+CONVERSATION_ID = "tracing_test"
+AGENT_CONFIGS = [
+    {
+        "name": "traced",
+        "description": "Answers through a traced upstream call",
+        "command": "traced",
+        "upload_required": False,
+    }
+]
+
+
+class TracedAgent:
+    """Calls a traced upstream and leaves follow-up work running after the response"""
+
+    def __init__(self):
+        self.background = None
+        self.background_parent = None
+        self.background_span = None
+
+    async def chat(self, request):
+        with tracer.span("agent.lookup", source="test"):
+            with tracer.span("upstream.http"):
+                await asyncio.sleep(0)
+        self.background = tracer.detached_context().run(asyncio.create_task, self._follow_up())
+        return AgentResponse.success(content="done")
+
+    async def _follow_up(self):
+        self.background_parent = tracer.current_span()
+        with tracer.trace("background.follow_up") as span:
+            self.background_span = span
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    agent = TracedAgent()
+    monkeypatch.setattr(agent_manager_instance, "config", {"agents": AGENT_CONFIGS})
+    monkeypatch.setattr(agent_manager_instance, "selected_agents", ["traced"])
+    monkeypatch.setattr(agent_manager_instance, "agents", {"traced": agent})
+    yield agent
+    chat_manager_instance.delete_conversation(CONVERSATION_ID)
+    agent_manager_instance.clear_active_agent(CONVERSATION_ID)
+
+
+def chat(headers=None):
+    return TestClient(app_module.app).post(
+        "/chat",
+        json={
+            "prompt": {"role": "user", "content": "/traced hi"},
+            "chain_id": "1",
+            "wallet_address": "0x0",
+            "conversation_id": CONVERSATION_ID,
+        },
+        headers=headers,
+    )
+
+
+def span_path(tree, name):
+    """Get the names of the spans from the root down to the first span with the given name"""
+    if tree["name"] == name:
+        return [name]
+    for child in tree.get("children", []):
+        path = span_path(child, name)
+        if path:
+            return [tree["name"], *path]
+    return []
+
+
+def test_every_request_gets_its_own_trace_id(agent):
+    first, second = chat(), chat()
+
+    assert first.status_code == second.status_code == 200
+    assert len(first.headers["X-Trace-Id"]) == 32
+    assert first.headers["X-Trace-Id"] != second.headers["X-Trace-Id"]
+    assert "X-Trace-Tree" not in first.headers
+
+
+def test_agent_spans_nest_under_the_request_span(agent):
+    response = chat(headers={"X-Debug-Trace": "1"})
+
+    tree = json.loads(response.headers["X-Trace-Tree"])
+    assert tree["name"] == "POST /chat"
+    assert tree["attributes"]["status_code"] == 200
+    path = span_path(tree, "upstream.http")
+    assert "chat.process" in path
+    assert path[-2:] == ["agent.lookup", "upstream.http"]
+
+
+def test_detached_work_does_not_join_the_request_trace(agent):
+    response = chat(headers={"X-Debug-Trace": "1"})
+
+    assert agent.background.done()
+    assert agent.background_parent is None
+    assert agent.background_span.parent_id is None
+    assert agent.background_span.trace_id != response.headers["X-Trace-Id"]
+    assert span_path(json.loads(response.headers["X-Trace-Tree"]), "background.follow_up") == []
@@ -0,0 +1,51 @@
+import time
+
+from src.config import Config
+from src.stores.agent_manager import AgentManager
+
+
+def test_active_agents_are_per_conversation_and_expire(monkeypatch):
+    agent_manager = AgentManager(Config.AGENTS_CONFIG, active_agent_ttl=60)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+
+    agent_manager.set_active_agent("crypto data", "alice")
+    agent_manager.set_active_agent("mor claims", "bob")
+    assert agent_manager.get_active_agent("alice") == "crypto data"
+    assert agent_manager.get_active_agent("bob") == "mor claims"
+    assert agent_manager.get_active_agent("carol") is None
+
+    agent_manager.clear_active_agent("alice")
+    assert agent_manager.get_active_agent("alice") is None
+    assert agent_manager.get_active_agent("bob") == "mor claims"
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert agent_manager.get_active_agent("bob") is None
+
+
+def test_expired_active_agents_are_purged_and_deselected_agents_cleared(monkeypatch):
+    agent_manager = AgentManager(Config.AGENTS_CONFIG, active_agent_ttl=60)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    for i in range(3):
+        agent_manager.set_active_agent("default", f"abandoned_{i}")
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    agent_manager.set_active_agent("crypto data", "alice")
+    agent_manager.set_active_agent("default", "bob")
+    assert list(agent_manager._active_agents) == ["alice", "bob"]
+
+    agent_manager.set_selected_agents(["default"])
+    assert agent_manager.get_active_agent("alice") is None
+    assert agent_manager.get_active_agent("bob") == "default"
+
+
+def test_command_agents_are_cleared_by_the_next_request_but_sticky_agents_stay():
+    agent_manager = AgentManager(Config.AGENTS_CONFIG, active_agent_ttl=60)
+    agent_manager.set_active_agent("crypto data", "alice")
+    agent_manager.set_active_agent("mor claims", "bob", sticky=True)
+
+    agent_manager.clear_command_agent("alice")
+    agent_manager.clear_command_agent("bob")
+    assert agent_manager.get_active_agent("alice") is None
+    assert agent_manager.get_active_agent("bob") == "mor claims"
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+
+from src.models.core import ChatMessage
+from src.stores.chat_manager import ChatManager
+from src.stores.chat_persistence import SQLiteChatPersistence
+
+
+def add_user_message(chat_manager, content, conversation_id):
+    chat_manager.add_message({"role": "user", "content": content}, conversation_id)
+
+
+def test_least_recently_used_conversations_are_evicted():
+    chat_manager = ChatManager(max_conversations=2)
+    for conversation_id in ["a", "b"]:
+        add_user_message(chat_manager, "hello", conversation_id)
+
+    # Touch "a" so that "b" becomes the least recently used conversation
+    chat_manager.get_messages("a")
+    add_user_message(chat_manager, "hello", "c")
+
+    assert set(asyncio.run(chat_manager.get_all_conversation_ids())) == {"default", "a", "c"}
+
+
+def test_messages_beyond_cap_are_trimmed_keeping_the_disclaimer():
+    chat_manager = ChatManager(max_messages=3)
+    for i in range(5):
+        add_user_message(chat_manager, f"message {i}", "a")
+
+    messages = chat_manager.get_messages("a")
+    assert [message["content"] for message in messages[1:]] == ["message 3", "message 4"]
+    assert messages[0]["content"] == chat_manager.default_message.content
+
+
+def test_idle_conversations_are_swept_except_default():
+    chat_manager = ChatManager(idle_ttl=60)
+    add_user_message(chat_manager, "hello", "idle")
+    add_user_message(chat_manager, "hello", "active")
+    chat_manager._last_accessed["active"] += 120
+
+    evicted = chat_manager.sweep_idle_conversations(now=chat_manager._last_accessed["idle"] + 61)
+
+    assert evicted == 1
+    assert set(asyncio.run(chat_manager.get_all_conversation_ids())) == {"default", "active"}
+
+
+def test_history_survives_restart_with_sqlite_persistence(tmp_path):
+    path = str(tmp_path / "chat.db")
+    chat_manager = ChatManager(
+        max_messages=3, persistence=SQLiteChatPersistence(path, flush_interval=0.01)
+    )
+    for i in range(4):
+        add_user_message(chat_manager, f"message {i}", "a")
+    chat_manager.set_uploaded_file(True, "a")
+    add_user_message(chat_manager, "hello", "deleted")
+    chat_manager.delete_conversation("deleted")
+    chat_manager.close()
+
+    # A new process loads conversations lazily from the database, only the newest into memory
+    restarted = ChatManager(max_messages=3, persistence=SQLiteChatPersistence(path))
+    assert "a" not in restarted.conversations
+    assert set(asyncio.run(restarted.get_all_conversation_ids())) == {"default", "a"}
+    messages = restarted.get_messages("a")
+    assert [message["content"] for message in messages[1:]] == ["message 2", "message 3"]
+    assert restarted.get_uploaded_file_status("a")
+
+    # The cap only bounds memory: older messages are read back from the database
+    add_user_message(restarted, "message 4", "a")
+    page, cursor, has_more = asyncio.run(restarted.get_messages_page("a", limit=3))
+    assert [message["content"] for message in page[1:]] == ["message 0", "message 1"]
+    assert has_more
+    page, _, has_more = asyncio.run(restarted.get_messages_page("a", since=cursor))
+    assert [message["content"] for message in page] == ["message 2", "message 3", "message 4"]
+    assert not has_more
+    older = asyncio.run(restarted.get_messages_between("a", 0, page[0]["sequence"]))
+    assert [message.content for message in older] == ["message 0", "message 1", "message 2"]
+    restarted.close()
+
+
+def test_stored_history_is_read_off_the_event_loop(tmp_path, monkeypatch):
+    path = str(tmp_path / "chat.db")
+    chat_manager = ChatManager(
+        max_messages=2, persistence=SQLiteChatPersistence(path, flush_interval=0.01)
+    )
+    for i in range(3):
+        add_user_message(chat_manager, f"message {i}", "a")
+    chat_manager.close()
+
+    restarted = ChatManager(max_messages=2, persistence=SQLiteChatPersistence(path))
+    reading_threads = []
+    for name in ("load_conversation", "load_messages", "get_conversation_ids"):
+        read = getattr(restarted.persistence, name)
+
+        def record_thread(*args, read=read):
+            reading_threads.append(threading.current_thread())
+            return read(*args)
+
+        monkeypatch.setattr(restarted.persistence, name, record_thread)
+
+    async def read_history():
+        await restarted.load_conversation("a")
+        page, _, _ = await restarted.get_messages_page("a")
+        return page, await restarted.get_all_conversation_ids()
+
+    page, conversation_ids = asyncio.run(read_history())
+
+    assert [message["content"] for message in page[1:]] == ["message 0", "message 1", "message 2"]
+    assert set(conversation_ids) == {"default", "a"}
+    assert len(reading_threads) == 3
+    assert threading.main_thread() not in reading_threads
+    restarted.close()
+
+
+def test_sequence_numbers_and_clears_survive_restart(tmp_path):
+    path = str(tmp_path / "chat.db")
+    chat_manager = ChatManager(persistence=SQLiteChatPersistence(path, flush_interval=0.01))
+    add_user_message(chat_manager, "before", "a")
+    chat_manager.clear_messages("a")
+    cleared_sequence = chat_manager.get_cleared_sequence("a")
+    add_user_message(chat_manager, "hello", "deleted")
+    cursor = chat_manager.get_last_message("deleted")["sequence"]
+    chat_manager.delete_conversation("deleted")
+    chat_manager.close()
+
+    restarted = ChatManager(persistence=SQLiteChatPersistence(path))
+    assert restarted.get_cleared_sequence("a") == cleared_sequence
+    # Cursors handed out before the restart stay behind new messages and recreated conversations
+    add_user_message(restarted, "after", "a")
+    assert restarted.get_last_message("a")["sequence"] > cursor
+    assert restarted.get_cleared_sequence("deleted") >= cursor
+    restarted.close()
+
+
+def test_messages_are_returned_in_chat_message_shape_with_shared_disclaimer():
+    chat_manager = ChatManager()
+    message = ChatMessage(
+        role="assistant", content="hi", agentName="Crypto Data Agent", metadata={"a": 1}
+    )
+    add_user_message(chat_manager, "hello", "a")
+    chat_manager.add_message(message.dict(), "a")
+    add_user_message(chat_manager, "hello", "b")
+
+    stored = chat_manager.get_messages("a")[-1]
+    assert stored.keys() == message.dict().keys()
+    assert stored["metadata"] == {"a": 1} and stored["agentName"] == "Crypto Data Agent"
+    assert (
+        chat_manager.conversations["a"].messages[0] is chat_manager.conversations["b"].messages[0]
+    )
@@ -0,0 +1,32 @@
+from src.stores.chat_manager import ChatManager
+from src.stores.chat_search import ChatSearchIndex
+
+
+def test_removing_messages_restores_the_index_state():
+    index = ChatSearchIndex()
+    index.add("a", 1, "The ETH price is up")
+    index.add("b", 2, "Swap ETH for USDC")
+    index.add("b", 3, "Claim MOR rewards")
+
+    index.remove("b", 2, "Swap ETH for USDC")
+    assert index.search("swap") == []
+    assert [
+        (conversation_id, sequence) for conversation_id, sequence, _ in index.search("eth")
+    ] == [("a", 1)]
+
+    index.remove_conversation("a")
+    index.remove_conversation("b")
+    assert index.document_count == 0
+    assert not index._postings and not index._document_frequency and index._total_length == 0
+
+
+def test_trimmed_messages_are_no_longer_found():
+    chat_manager = ChatManager(max_messages=3)
+    for content in ["bitcoin halving", "eth merge", "sol outage", "base launch"]:
+        chat_manager.add_message({"role": "user", "content": content}, "a")
+
+    assert chat_manager.search_messages("bitcoin eth") == []
+    assert [result["content"] for result in chat_manager.search_messages("sol base")] == [
+        "base launch",
+        "sol outage",
+    ]